@@ -2,6 +2,8 @@
 Django settings para Prova Técnica Vólus.
 """
 
+import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -35,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',  # Primeiro: mede a requisição inteira
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS deve vir antes de CommonMiddleware
@@ -43,6 +47,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'core.middleware.ExceptionHandlerMiddleware',
 ]
 
@@ -67,12 +72,59 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
+# Perfil escolhido pela variável de ambiente DATABASE_PROFILE (padrão: sqlite).
+# Conexões persistentes (CONN_MAX_AGE) reaproveitadas entre requisições de
+# cada worker e verificadas antes do reuso (CONN_HEALTH_CHECKS).
+DATABASE_PROFILES = {
+    # Arquivo local; os PRAGMAs de SQLITE_PRAGMAS são aplicados em cada conexão
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 5,  # espera (s) pelo lock de escrita antes de "database is locked"
+        },
+    },
+    # PostgreSQL configurado pelas variáveis POSTGRES_*. Atrás de um PgBouncer
+    # em modo transaction, defina POSTGRES_PGBOUNCER=1 (sem cursores no servidor)
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'volus'),
+        'USER': os.environ.get('POSTGRES_USER', 'volus'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('POSTGRES_PGBOUNCER') == '1',
+        'OPTIONS': {
+            'connect_timeout': 5,
+            # Detecta conexões mortas (failover, firewall) em vez de travar
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 3,
+        },
+    },
+}
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+DATABASES = {
+    'default': DATABASE_PROFILES[DATABASE_PROFILE],
+}
+# PRAGMAs aplicados a cada nova conexão SQLite (ver core.db): WAL deixa leitores
+# e o escritor trabalharem ao mesmo tempo; busy_timeout em milissegundos.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,  # ~20 MB
+    'mmap_size': 268435456,  # 256 MB
+    'temp_store': 'MEMORY',
 }
+# Transações de escrita no SQLite pegam o lock logo no início (core.db.begin_write):
+# escritores esperam o lock (busy_timeout) em vez de falhar com "database is locked".
+SQLITE_EARLY_WRITE_LOCK = True
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -117,6 +169,8 @@ LOGOUT_REDIRECT_URL = '/login/'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Sem consulta a auth_user por requisição (usuário lido das claims do token):
+        # 'core.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -124,6 +178,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON com orjson quando instalado, mesma saída do JSONRenderer/JSONParser
+    # (ver core.renderers); sem orjson, json da biblioteca padrão
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Simple JWT Settings
@@ -133,6 +198,8 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Recalcula as claims de perfil a cada refresh (ver core.authentication)
+    'TOKEN_REFRESH_SERIALIZER': 'core.authentication.ProfileTokenRefreshSerializer',
 }
 
 # CORS Settings (para desenvolvimento com Vite)
@@ -165,3 +232,99 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
 ]
+
+# Árvore de categorias em memória (/api/categories/)
+# Tempo máximo (segundos) antes de reconstruir a cópia a partir do banco;
+# cobre escritas feitas por outros processos. None desativa a expiração.
+CATEGORY_TREE_MAX_AGE = 300
+
+# Backend de busca textual do filtro `q` de produtos (ver core.search).
+# None escolhe automaticamente: FTS5 no SQLite, tsvector no PostgreSQL.
+PRODUCT_SEARCH_BACKEND = None
+
+# Blacklist de tokens JWT (ver core.blacklist)
+# Limpeza periódica em processo dos tokens expirados (segundos); None desativa.
+# Alternativa: agendar `python manage.py prune_token_blacklist`.
+TOKEN_BLACKLIST_PRUNE_INTERVAL = None
+
+# Proteção das rotas com hashing de senha (login, registro, troca de senha)
+# Token bucket por IP e por usuário: (rajada, fichas por minuto). None em uma chave
+# desativa aquele bucket; AUTH_RATE_LIMITS = None desativa os dois.
+# Os buckets ficam em um SQLite local compartilhado pelos workers
+# (None = arquivo no diretório temporário do sistema).
+AUTH_RATE_LIMITS = {
+    'ip': (30, 30),
+    'username': (10, 5),
+}
+AUTH_RATE_LIMIT_STORE = None
+# Pool de threads para o hashing, ex.: {'workers': 2, 'max_queue': 8}.
+# Com a fila cheia a requisição recebe 503 na hora. None = hashing na thread da requisição.
+AUTH_HASH_POOL = None
+
+# Leituras assíncronas de produtos e categorias (ver core.async_views).
+# Só faz sentido servindo via ASGI (config/asgi.py); sob WSGI mantenha False.
+ASYNC_READ_API = False
+
+# Perfil por requisição (ver core.middleware.ProfilingMiddleware); só em desenvolvimento
+REQUEST_PROFILING = DEBUG
+# Cabeçalho Server-Timing com total, banco, serialização e restante (ms)
+SERVER_TIMING_HEADER = DEBUG
+# Quem recebe o Server-Timing (expõe tempo de banco e consultas): estes IPs e
+# usuários staff. None = qualquer cliente.
+SERVER_TIMING_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Log estruturado (logger core.profiling) acima destes limites; None desativa cada um
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_QUERIES = 50
+# Quantas consultas mais lentas entram no log
+SLOW_REQUEST_TOP_QUERIES = 5
+# Fração das requisições (síncronas) perfiladas com cProfile, ex.: 0.01.
+# Arquivos .prof em REQUEST_PROFILE_DIR (None = diretório temporário do sistema).
+REQUEST_PROFILE_SAMPLE_RATE = 0.0
+REQUEST_PROFILE_DIR = None
+
+# Métricas Prometheus em /metrics (ver core.metrics)
+METRICS_ENABLED = True
+# Arquivo SQLite compartilhado pelos workers (None = BASE_DIR/var, um arquivo por settings/banco)
+METRICS_STORE = None
+# Intervalo (segundos) de gravação dos contadores de cada processo no arquivo
+METRICS_FLUSH_INTERVAL = 1.0
+# IPs autorizados a ler /metrics; None libera para qualquer origem
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Réplica de leitura (ver core.routers). Com DATABASE_REPLICA definido, ela entra
+# em DATABASES como 'replica' e recebe as leituras seguras (GET/HEAD/OPTIONS) das
+# views de REPLICA_READ_VIEWS. Localmente, um segundo arquivo SQLite atualizado
+# por `python manage.py sync_replica` faz o papel da réplica, ex.:
+# DATABASE_REPLICA = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'db.replica.sqlite3'}
+DATABASE_REPLICA = None
+if DATABASE_REPLICA:
+    DATABASES['replica'] = DATABASE_REPLICA
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_READ_VIEWS = [
+    'core.views.ProductViewSet',
+    'core.views.CategoryListAPIView',
+    'core.views.UserProfileAPIView',
+    'core.async_views.AsyncProductReadView',
+    'core.async_views.AsyncCategoryListView',
+]
+# Janela (segundos) em que um usuário que gravou lê só do primário
+# (read-your-writes), guardada no cache ROUTER_PIN_CACHE. Esse cache precisa
+# ser compartilhado entre os workers (Redis, Memcached, arquivo): com réplica,
+# LocMem/Dummy são recusados na inicialização.
+REPLICA_PIN_SECONDS = 5
+ROUTER_PIN_CACHE = 'replica_pins'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'replica_pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'volus-replica-pins'),
+    },
+}
+
+# Razão de estoque (ver core.ledger): os movimentos pendentes são somados em
+# Product.stock por `python manage.py compact_stock_movements --interval 5`
+# (um processo à parte). Opcional: intervalo (segundos) de uma tarefa em cada
+# processo web, iniciada na primeira requisição; None desativa.
+STOCK_COMPACTION_INTERVAL = None
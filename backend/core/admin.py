@@ -2,7 +2,7 @@
 Configuração do Django Admin.
 """
 from django.contrib import admin
-from .models import Product
+from .models import Product, StockMovement, StockSettings
 
 
 @admin.register(Product)
@@ -31,3 +31,30 @@ class ProductAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(StockSettings)
+class StockSettingsAdmin(admin.ModelAdmin):
+    """
+    Admin das faixas de estoque por usuário.
+    """
+    list_display = ('user', 'low_stock_max', 'medium_stock_max', 'updated_at')
+    search_fields = ('user__username',)
+    readonly_fields = (
+        'low_stock_min', 'medium_stock_min', 'high_stock_min', 'high_stock_max', 'created_at', 'updated_at'
+    )
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """
+    Admin do razão de estoque (somente leitura: movimentos não são editados).
+    """
+    list_display = ('product', 'delta', 'reason', 'user', 'created_at', 'applied_at')
+    list_filter = ('reason', 'created_at')
+    search_fields = ('product__code', 'product__name', 'note')
+    raw_id_fields = ('product', 'user')
+    ordering = ('-id',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
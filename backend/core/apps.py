@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .routers import check_pin_cache
+
+        check_pin_cache()
@@ -0,0 +1,217 @@
+"""
+Leituras assíncronas da API (ASGI) para produtos e categorias.
+
+Sob ASGI, cada view síncrona do DRF ocupa uma thread durante toda a
+requisição. As views deste módulo atendem ``GET``/``HEAD`` de
+``/api/products/``, ``/api/products/{id}/`` e ``/api/categories/`` como
+corrotinas, com os mesmos filtros, autenticação, permissões, paginação,
+ETags e formato de resposta das views síncronas:
+
+- filtros e ordenação vêm do próprio ``ProductViewSet`` (montar o queryset
+  não consulta o banco);
+- ETag com ``aaggregate``, páginas com ``acount``/iteração assíncrona e
+  detalhe com ``aget``;
+- demais métodos (POST, PUT, PATCH, DELETE, OPTIONS) são repassados à view
+  síncrona de sempre.
+
+Ativadas por ``ASYNC_READ_API`` (ver ``core.urls``). Sob WSGI não há ganho:
+cada view assíncrona roda em um loop próprio por requisição.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404, HttpResponse
+from rest_framework import exceptions
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .authentication import aauthenticate
+from .categories import category_tree
+from .conditional import (
+    acollection_etag,
+    conditional_response,
+    make_etag,
+    row_validators,
+    set_validators,
+)
+from .ledger import acurrent_stock, aledger_version, apply_pending_stock, last_pending_at
+from .models import Product
+from .profiling import timing
+from .search import aget_search_backend
+from .views import ProductViewSet, ordering_columns, product_rows
+
+
+class AsyncReadAPIView(APIView):
+    """
+    APIView com ``dispatch`` assíncrono para leituras.
+
+    Reproduz ``APIView.dispatch``/``initial`` com autenticação assíncrona;
+    métodos sem handler assíncrono vão para ``sync_view``, se informada.
+    """
+    sync_view = None
+    read_methods = ('GET', 'HEAD')
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in self.read_methods and self.sync_view is not None:
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method not in self.read_methods or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.render_response(self.response)
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        # Mesmo laço de Request._authenticate, com aauthenticate
+        for authenticator in request.authenticators:
+            try:
+                user_auth_tuple = await aauthenticate(authenticator, request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    @staticmethod
+    def render_response(response):
+        """
+        Renderiza no próprio loop: o handler ASGI renderizaria a ``Response``
+        do DRF via ``sync_to_async``, em uma thread compartilhada.
+        """
+        if not isinstance(response, Response):
+            return response
+        with timing('serialize'):
+            response.render()
+        return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+
+class AsyncProductReadView(AsyncReadAPIView):
+    """
+    Base das leituras de produtos: reutiliza o ``ProductViewSet``.
+    """
+    authentication_classes = ProductViewSet.authentication_classes
+    permission_classes = ProductViewSet.permission_classes
+
+    async def get_viewset(self, request, action):
+        viewset = ProductViewSet(
+            request=request, args=self.args, kwargs=self.kwargs,
+            format_kwarg=self.format_kwarg, action=action,
+        )
+        if request.query_params.get('q'):
+            # Detecta o backend de busca antes de montar o queryset
+            await aget_search_backend(viewset.queryset.db)
+        if 'stock' in request.query_params.get(viewset.filter_backends[-1].ordering_param, ''):
+            # ordering=stock: estoque atual (ver ProductViewSet.filter_queryset)
+            viewset.stock_expression = await acurrent_stock()
+        return viewset
+
+
+class AsyncProductListView(AsyncProductReadView):
+    """
+    GET /api/products/ (mesmos parâmetros e formatos de ProductViewSet.list).
+    """
+    renderer_classes = ProductViewSet.list_renderer_classes
+
+    async def get(self, request, *args, **kwargs):
+        viewset = await self.get_viewset(request, 'list')
+        representation = viewset.get_representation()
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        parts = [await aledger_version()] if viewset.reads_stock(representation, queryset) else []
+        etag = await acollection_etag(request, queryset, *parts, *viewset.fieldset_parts(representation))
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        rows = product_rows(queryset, representation, *ordering_columns(queryset, viewset))
+        paginator = viewset.paginator
+        page = None
+        if paginator is not None:
+            page = await paginator.apaginate_queryset(rows, request, view=viewset)
+        if page is not None:
+            with timing('serialize'):
+                data = representation.represent(apply_pending_stock(page))
+            response = paginator.get_paginated_response(data)
+        else:
+            rows = [row async for row in rows]
+            with timing('serialize'):
+                data = representation.represent(apply_pending_stock(rows))
+            response = Response(data)
+        return set_validators(response, etag)
+
+
+class AsyncProductDetailView(AsyncProductReadView):
+    """
+    GET /api/products/{id}/ (mesma resposta de ProductViewSet.retrieve).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        viewset = await self.get_viewset(request, 'retrieve')
+        representation = viewset.get_representation()
+        queryset = product_rows(
+            viewset.filter_queryset(viewset.get_queryset()), representation, 'id', 'updated_at'
+        )
+        if 'stock' in representation.columns:
+            queryset = queryset.annotate(pending_at=last_pending_at())
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        try:
+            row = await queryset.aget(**{viewset.lookup_field: kwargs[lookup_url_kwarg]})
+        # Mesmas respostas de rest_framework.generics.get_object_or_404
+        except ObjectDoesNotExist:
+            raise Http404('No %s matches the given query.' % Product._meta.object_name)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        viewset.check_object_permissions(request, row)
+
+        modified = max(row['updated_at'], row.pop('pending_at', None) or row['updated_at'])
+        etag, last_modified = row_validators(
+            request, Product, row['id'], modified, *viewset.fieldset_parts(representation)
+        )
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        with timing('serialize'):
+            data = representation.represent_one(apply_pending_stock([row])[0])
+        return set_validators(Response(data), etag, last_modified)
+
+
+class AsyncCategoryListView(AsyncReadAPIView):
+    """
+    GET /api/categories/ (mesma resposta de CategoryListAPIView).
+    """
+    permission_classes = [AllowAny]
+
+    async def get(self, request, *args, **kwargs):
+        categories, version = await category_tree.asnapshot()
+        etag = make_etag(request, 'categories', version)
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(Response({'categories': categories}), etag)
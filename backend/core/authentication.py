@@ -0,0 +1,177 @@
+"""
+Autenticação JWT sem consulta ao banco por requisição.
+
+Os tokens emitidos por login, registro e refresh carregam na claim
+``profile`` os dados de ``UserSerializer`` (incluindo ``is_admin``) e as
+flags ``is_staff``/``is_superuser``. ``StatelessJWTAuthentication`` monta o
+usuário a partir dessas claims (``ClaimsUser``), sem o ``SELECT`` em
+``auth_user`` que ``JWTAuthentication`` faz a cada requisição.
+
+As claims são recalculadas a partir do banco a cada refresh
+(``ProfileTokenRefreshSerializer``), então alterações de perfil ou de
+permissão valem no máximo após ``ACCESS_TOKEN_LIFETIME``. Para ativar,
+troque a classe em ``REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']``.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .serializers import UserSerializer
+
+PROFILE_CLAIM = 'profile'
+
+
+def profile_claims(user):
+    """
+    Dados do usuário gravados no token (formato de UserSerializer).
+    """
+    claims = dict(UserSerializer(user).data)
+    claims['is_staff'] = user.is_staff
+    claims['is_superuser'] = user.is_superuser
+    return claims
+
+
+def load_user(user):
+    """
+    Instância do modelo para operações que precisam do banco (ex.: senha).
+    """
+    if isinstance(user, ClaimsUser):
+        return get_user_model().objects.get(pk=user.pk)
+    return user
+
+
+class ProfileRefreshToken(RefreshToken):
+    """
+    Refresh token com a claim de perfil (copiada para o access token).
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[PROFILE_CLAIM] = profile_claims(user)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuário autenticado montado apenas a partir das claims do token.
+    """
+
+    @cached_property
+    def profile(self):
+        """
+        Representação de UserSerializer gravada no token.
+        """
+        return {
+            key: value for key, value in self.token[PROFILE_CLAIM].items()
+            if key not in ('is_staff', 'is_superuser')
+        }
+
+    @cached_property
+    def username(self):
+        return self.token[PROFILE_CLAIM].get('username', '')
+
+    @cached_property
+    def email(self):
+        return self.token[PROFILE_CLAIM].get('email', '')
+
+    @cached_property
+    def first_name(self):
+        return self.token[PROFILE_CLAIM].get('first_name', '')
+
+    @cached_property
+    def last_name(self):
+        return self.token[PROFILE_CLAIM].get('last_name', '')
+
+    @cached_property
+    def is_staff(self):
+        return self.token[PROFILE_CLAIM].get('is_staff', False)
+
+    @cached_property
+    def is_superuser(self):
+        return self.token[PROFILE_CLAIM].get('is_superuser', False)
+
+    @cached_property
+    def is_active(self):
+        return self.token[PROFILE_CLAIM].get('is_active', True)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que não consulta ``auth_user``.
+
+    Tokens emitidos antes da claim de perfil seguem o caminho com banco
+    até expirarem.
+    """
+
+    def get_user(self, validated_token):
+        if PROFILE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('O token não identifica o usuário.')
+
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed('Usuário inativo.', code='user_inactive')
+        return user
+
+
+async def aauthenticate(authenticator, request):
+    """
+    Versão assíncrona de ``authenticator.authenticate(request)``.
+
+    Com JWT, a validação do token roda direto no loop; só a busca do
+    usuário (quando necessária) vai para uma thread. Com
+    ``StatelessJWTAuthentication`` e a claim de perfil, nada consulta o banco.
+    """
+    if not isinstance(authenticator, JWTAuthentication):
+        return await sync_to_async(authenticator.authenticate)(request)
+
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = authenticator.get_validated_token(raw_token)
+
+    if isinstance(authenticator, StatelessJWTAuthentication) and PROFILE_CLAIM in validated_token:
+        return authenticator.get_user(validated_token), validated_token
+    return await sync_to_async(authenticator.get_user)(validated_token), validated_token
+
+
+class ProfileTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh que recalcula a claim de perfil a partir do banco antes de
+    emitir o novo access token (e o novo refresh, com rotação).
+    """
+    token_class = ProfileRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('Usuário inativo ou inexistente.', code='user_inactive')
+        refresh[PROFILE_CLAIM] = profile_claims(user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
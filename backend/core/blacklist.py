@@ -0,0 +1,113 @@
+"""
+Blacklist de tokens JWT (``rest_framework_simplejwt.token_blacklist``).
+
+Com rotação e blacklist após rotação, cada refresh e cada logout grava em
+``OutstandingToken``/``BlacklistedToken`` e nada remove as linhas expiradas.
+``prune_expired_tokens`` remove tokens expirados em lotes curtos (uma
+transação por lote), usada pelo comando ``prune_token_blacklist`` e pela
+tarefa periódica opcional ``TOKEN_BLACKLIST_PRUNE_INTERVAL``. A consulta à
+blacklist no refresh é a do simplejwt (busca pelo ``jti``, indexado).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, router, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .db import begin_write
+
+logger = logging.getLogger(__name__)
+
+
+def prune_expired_tokens(batch_size=5000, pause=0.0, now=None):
+    """
+    Remove tokens expirados (e suas entradas na blacklist) em lotes.
+
+    Cada lote é uma transação curta com dois ``DELETE`` por chave primária;
+    ``pause`` (segundos) entre lotes deixa outros escritores avançarem.
+    Retorna ``(outstanding, blacklisted)`` removidos.
+    """
+    now = now or timezone.now()
+    using = router.db_for_write(OutstandingToken)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    outstanding_table = quote(OutstandingToken._meta.db_table)
+    blacklisted_table = quote(BlacklistedToken._meta.db_table)
+    token_column = quote(BlacklistedToken._meta.get_field('token').column)
+    # Um parâmetro por id no IN (...): respeita o limite do banco
+    batch_size = min(batch_size, connection.features.max_query_params or batch_size)
+
+    removed_outstanding = removed_blacklisted = 0
+    while True:
+        with transaction.atomic(using=using):
+            begin_write(using)
+            ids = list(
+                OutstandingToken.objects.using(using)
+                .filter(expires_at__lte=now)
+                .order_by()
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {blacklisted_table} WHERE {token_column} IN ({placeholders})', ids
+                )
+                removed_blacklisted += cursor.rowcount
+                cursor.execute(f'DELETE FROM {outstanding_table} WHERE id IN ({placeholders})', ids)
+                removed_outstanding += cursor.rowcount
+        if pause:
+            time.sleep(pause)
+    return removed_outstanding, removed_blacklisted
+
+
+class PruneThread(threading.Thread):
+    """
+    Tarefa em processo que executa ``prune_expired_tokens`` periodicamente.
+    """
+
+    def __init__(self, interval, batch_size=5000):
+        super().__init__(name='token-blacklist-prune', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                removed, _ = prune_expired_tokens(batch_size=self.batch_size, pause=0.05)
+                if removed:
+                    logger.info('Blacklist de tokens: %d tokens expirados removidos.', removed)
+            except DatabaseError:
+                logger.exception('Falha ao limpar a blacklist de tokens.')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_prune_thread = None
+_prune_thread_lock = threading.Lock()
+
+
+def start_periodic_pruning(**kwargs):
+    """
+    Inicia a tarefa periódica (uma por processo) se
+    ``TOKEN_BLACKLIST_PRUNE_INTERVAL`` estiver definido.
+
+    Conectada a ``request_started`` para rodar apenas em processos que
+    atendem requisições (e não em comandos como ``migrate``).
+    """
+    global _prune_thread
+    interval = getattr(settings, 'TOKEN_BLACKLIST_PRUNE_INTERVAL', None)
+    if not interval or _prune_thread is not None:
+        return
+    with _prune_thread_lock:
+        if _prune_thread is None:
+            _prune_thread = PruneThread(interval)
+            _prune_thread.start()
@@ -0,0 +1,195 @@
+"""
+Árvore de categorias (Categoria → Subcategorias → Itens) mantida em memória.
+
+A árvore é construída com uma única consulta ordenada sobre
+``values_list('id', 'category', 'subcategory', 'name')`` e depois mantida
+incrementalmente pelos sinais ``post_save``/``post_delete`` de ``Product``
+(ver ``core.signals``), sem reconstrução completa a cada escrita.
+
+Cada leitura confere a versão do catálogo no banco (``COUNT`` e
+``MAX(updated_at)``, pelo índice ``product_updated_idx``). As escritas
+locais atualizam a versão esperada junto com a árvore. Escritas de outros
+processos, ou sem sinais (``QuerySet.update``, ``bulk_create``), mudam a
+versão e forçam a reconstrução. ``CATEGORY_TREE_MAX_AGE`` (segundos) limita a
+vida da cópia para escritas que não tocam ``updated_at``.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .metrics import cache_result
+from .models import Product
+
+
+class CategoryTree:
+    """
+    Cópia pré-computada da estrutura usada pelo filtro cascata.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = None       # pk -> (category, subcategory, name)
+        self._tree = None       # category -> subcategory -> Counter(name)
+        self._rendered = None   # resposta serializável em cache
+        self._etag = None       # hash de _rendered (requisições condicionais)
+        self._version = None    # (count, max updated_at) correspondente a _rows
+        self._built_at = 0.0
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'CATEGORY_TREE_MAX_AGE', 300)
+
+    def get(self):
+        """
+        Retorna a lista de categorias no formato de /api/categories/.
+        """
+        return self.snapshot()[0]
+
+    def snapshot(self):
+        """
+        Retorna ``(categorias, etag)`` de uma mesma versão da árvore.
+        """
+        version = self._source_version(Product.objects.aggregate(count=Count('pk'), last=Max('updated_at')))
+        with self._lock:
+            stale = self._is_stale(version)
+            if stale:
+                self._build(self._source_rows().iterator(chunk_size=5000), version)
+            cache_result('category_tree', hit=not stale)
+            return self._snapshot()
+
+    async def asnapshot(self):
+        """
+        Versão assíncrona de ``snapshot()``: a reconstrução lê as linhas com
+        iteração assíncrona fora do lock e só então monta a árvore.
+        """
+        version = self._source_version(
+            await Product.objects.aaggregate(count=Count('pk'), last=Max('updated_at'))
+        )
+        with self._lock:
+            if not self._is_stale(version):
+                cache_result('category_tree', hit=True)
+                return self._snapshot()
+        cache_result('category_tree', hit=False)
+        # Escritas entre a versão e a leitura das linhas mudam a versão de
+        # novo: a próxima leitura reconstrói
+        # async for (uma ida à thread do ORM) em vez de aiterator(): no Django 4.2,
+        # aiterator() de values_list() executa a consulta no próprio loop
+        rows = [row async for row in self._source_rows()]
+        with self._lock:
+            self._build(rows, version)
+            return self._snapshot()
+
+    def invalidate(self):
+        """
+        Descarta a cópia em memória; a próxima leitura reconstrói a árvore.
+        """
+        with self._lock:
+            self._rows = None
+            self._tree = None
+            self._rendered = None
+            self._version = None
+
+    def upsert(self, pk, category, subcategory, name, updated_at, created=False):
+        """
+        Aplica a criação/alteração de um produto na árvore e na versão
+        esperada (``updated_at`` gravado passa a ser o máximo).
+        """
+        with self._lock:
+            if self._rows is None:
+                return
+            self._discard(pk)
+            self._add(pk, category, subcategory, name)
+            self._rendered = None
+            if self._version is not None:
+                count, last = self._version
+                self._version = (count + created, max(last, updated_at) if last else updated_at)
+
+    def remove(self, pk, updated_at):
+        """
+        Remove um produto da árvore. Se ele tinha o maior ``updated_at``, o
+        novo máximo é desconhecido e a próxima leitura reconstrói.
+        """
+        with self._lock:
+            if self._rows is None:
+                return
+            self._discard(pk)
+            self._rendered = None
+            if self._version is not None:
+                count, last = self._version
+                self._version = (count - 1, last) if last and updated_at < last else None
+
+    def _is_stale(self, version):
+        expired = self.max_age is not None and time.monotonic() - self._built_at > self.max_age
+        return self._rows is None or expired or version != self._version
+
+    @staticmethod
+    def _source_version(summary):
+        return summary['count'], summary['last']
+
+    def _snapshot(self):
+        if self._rendered is None:
+            self._rendered = self._render()
+            content = json.dumps(self._rendered, ensure_ascii=False, separators=(',', ':'))
+            self._etag = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return self._rendered, self._etag
+
+    @staticmethod
+    def _source_rows():
+        return Product.objects.order_by('category', 'subcategory', 'name').values_list(
+            'id', 'category', 'subcategory', 'name'
+        )
+
+    def _build(self, rows, version):
+        self._rows = {}
+        self._tree = {}
+        for pk, category, subcategory, name in rows:
+            self._add(pk, category, subcategory, name)
+        self._rendered = None
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _add(self, pk, category, subcategory, name):
+        self._rows[pk] = (category, subcategory, name)
+        subcategories = self._tree.setdefault(category, {})
+        subcategories.setdefault(subcategory, Counter())[name] += 1
+
+    def _discard(self, pk):
+        previous = self._rows.pop(pk, None)
+        if previous is None:
+            return
+        category, subcategory, name = previous
+        subcategories = self._tree[category]
+        names = subcategories[subcategory]
+        names[name] -= 1
+        if names[name] <= 0:
+            del names[name]
+        if not names:
+            del subcategories[subcategory]
+        if not subcategories:
+            del self._tree[category]
+
+    def _render(self):
+        labels = dict(Product.CATEGORIES)
+        return [
+            {
+                'name': category,
+                'display_name': labels.get(category, category),
+                'subcategories': [
+                    {
+                        'name': subcategory,
+                        'items': sorted(names.elements()),
+                    }
+                    for subcategory, names in sorted(subcategories.items())
+                    if subcategory  # Ignorar vazios
+                ],
+            }
+            for category, subcategories in sorted(self._tree.items())
+        ]
+
+
+category_tree = CategoryTree()
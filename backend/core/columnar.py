@@ -0,0 +1,59 @@
+"""
+Formato colunar das coleções de produtos.
+
+Em vez de uma lista de objetos (as dez chaves repetidas em cada item), a
+coleção vira um objeto com uma lista por campo::
+
+    {
+        "fields": ["id", "name", ..., "category", "category_display", ...],
+        "columns": {"id": [1, 2], "name": ["Notebook", "Mesa"], "category": [0, 1], ...},
+        "dictionaries": {"category": ["eletronicos", "moveis"], ...}
+    }
+
+Campos de ``DICTIONARY_FIELDS`` são codificados por dicionário: a coluna traz
+índices em ``dictionaries[campo]`` (valores na ordem da primeira aparição).
+Para remontar o item ``i``: ``columns[campo][i]``, ou
+``dictionaries[campo][columns[campo][i]]`` para os campos do dicionário.
+
+Usado pelos renderers ``columnar``/``columnar-msgpack`` (``core.renderers``)
+na listagem e, em blocos, na exportação (``core.export``).
+"""
+
+# Poucos valores distintos repetidos em todas as linhas
+DICTIONARY_FIELDS = ('category', 'category_display', 'subcategory')
+
+
+def columnar_records(fields, records):
+    """
+    Bloco colunar a partir de tuplas na ordem de ``fields``.
+    """
+    columns = dict(zip(fields, map(list, zip(*records)))) if records else {field: [] for field in fields}
+    dictionaries = {}
+    for field in DICTIONARY_FIELDS:
+        if field in columns:
+            index = {}
+            columns[field] = [index.setdefault(value, len(index)) for value in columns[field]]
+            dictionaries[field] = list(index)
+    return {'fields': list(fields), 'columns': columns, 'dictionaries': dictionaries}
+
+
+def columnar_items(items):
+    """
+    Bloco colunar a partir de itens já serializados (dicionários com as
+    mesmas chaves na mesma ordem, como os de ``ValuesRepresentation.represent``).
+    """
+    fields = list(items[0]) if items else []
+    return columnar_records(fields, [tuple(item.values()) for item in items])
+
+
+def columnar_collection(data):
+    """
+    Converte a coleção de uma resposta: a lista inteira ou ``results`` da
+    página (os demais campos da paginação são mantidos). Outros dados (erros,
+    objetos avulsos) voltam inalterados.
+    """
+    if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        return columnar_items(data)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': columnar_items(data['results'])}
+    return data
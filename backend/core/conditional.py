@@ -0,0 +1,94 @@
+"""
+Requisições condicionais (ETag / Last-Modified) nas leituras da API.
+
+Os validadores saem de dados que já existem, sem serializar nada:
+
+- detalhe: ``updated_at`` do próprio produto;
+- coleções: ``COUNT`` + ``MAX(updated_at)`` do queryset filtrado (uma
+  consulta agregada, coberta pelo índice de ``updated_at``), mais as partes
+  extras informadas pela view (ex.: versão do razão de estoque);
+- categorias: hash da árvore mantida em memória (``core.categories``).
+
+Quando ``If-None-Match``/``If-Modified-Since`` confere, a view responde
+``304`` antes de paginar ou serializar. ``Last-Modified`` só é enviado no
+detalhe: em coleções, uma exclusão não altera ``MAX(updated_at)`` e o
+validador por data poderia gerar um 304 desatualizado (o ETag cobre o caso
+pela contagem).
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .metrics import cache_result
+
+# Incrementar quando o formato das respostas mudar (invalida os ETags emitidos)
+REPRESENTATION_VERSION = 1
+
+
+def make_etag(request, *parts):
+    """
+    ETag forte a partir das partes informadas e do formato negociado.
+    """
+    media_type = getattr(request, 'accepted_media_type', '')
+    payload = '|'.join(str(part) for part in (REPRESENTATION_VERSION, media_type, *parts))
+    return '"%s"' % hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def collection_etag(request, queryset, *parts):
+    """
+    ETag de uma coleção: quantidade de linhas, última alteração e ``parts``.
+    """
+    summary = queryset.order_by().aggregate(count=Count('pk'), last=Max('updated_at'))
+    return _summary_etag(request, queryset, summary, parts)
+
+
+async def acollection_etag(request, queryset, *parts):
+    """
+    Versão assíncrona de ``collection_etag`` (views de ``core.async_views``).
+    """
+    summary = await queryset.order_by().aaggregate(count=Count('pk'), last=Max('updated_at'))
+    return _summary_etag(request, queryset, summary, parts)
+
+
+def _summary_etag(request, queryset, summary, parts):
+    last = summary['last'].isoformat() if summary['last'] else ''
+    return make_etag(request, queryset.model._meta.label, summary['count'], last, *parts)
+
+
+def row_validators(request, model, pk, updated_at, *parts):
+    """
+    ETag e Last-Modified de um registro a partir do seu ``updated_at`` (e
+    das partes extras informadas pela view).
+    """
+    etag = make_etag(request, model._meta.label, pk, updated_at.isoformat(), *parts)
+    return etag, updated_at.timestamp()
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Aplica os validadores à resposta; o cliente deve sempre revalidar.
+    O ETag depende do formato negociado, daí o ``Vary: Accept``.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    Retorna a resposta 304 (ou 412) quando as pré-condições permitem;
+    caso contrário, ``None`` e a view segue normalmente.
+    """
+    carrier = set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=carrier
+    )
+    # "Cache" do cliente: acerto quando a resposta sai sem corpo (304/412)
+    cache_result('http_conditional', hit=response is not carrier)
+    return None if response is carrier else response
@@ -0,0 +1,49 @@
+"""
+Ajustes das conexões com o banco.
+
+Cada nova conexão SQLite recebe os PRAGMAs de ``SQLITE_PRAGMAS`` (WAL,
+``synchronous``, ``busy_timeout``, cache e mmap), aplicados pelo sinal
+``connection_created`` (ver ``core.signals``). Com ``CONN_MAX_AGE`` as
+conexões são reaproveitadas entre requisições, então o custo fica restrito
+à abertura de cada conexão.
+
+``begin_write`` pega o lock de escrita do SQLite no início das transações
+que leem e depois gravam (ex.: PATCH de estoque, ajuste em lote,
+compactação, importação). Numa transação comum (``BEGIN`` adiado), a
+promoção do lock no meio do caminho falha na hora com "database is locked"
+se outro escritor gravou antes, sem esperar o ``busy_timeout``. Uma escrita
+nula (``UPDATE ... WHERE 0``) como primeira instrução tem o efeito do
+``BEGIN IMMEDIATE``: espera a vez. Só essas transações pegam o lock; as
+demais (``atomic`` de leitura, sinais) continuam com o ``BEGIN`` padrão.
+``SQLITE_EARLY_WRITE_LOCK = False`` desliga o comportamento.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.recorder import MigrationRecorder
+
+
+def apply_sqlite_pragmas(connection):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def begin_write(using=DEFAULT_DB_ALIAS):
+    """
+    Pega o lock de escrita do SQLite até o fim da transação corrente. Deve
+    ser a primeira instrução dentro do ``atomic``: depois de uma leitura, a
+    promoção pode falhar do mesmo jeito. Sem efeito fora de transação e nos
+    outros bancos (que travam por linha ou por lock consultivo).
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not connection.in_atomic_block:
+        return
+    if not getattr(settings, 'SQLITE_EARLY_WRITE_LOCK', True):
+        return
+    # Tabela que sempre existe; nenhuma linha é alterada
+    table = connection.ops.quote_name(MigrationRecorder.Migration._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'UPDATE {table} SET id = id WHERE 0')
@@ -0,0 +1,224 @@
+"""
+Exportação em streaming do catálogo de produtos (CSV, NDJSON, colunar ou
+MessagePack).
+
+As linhas saem de ``values_list().iterator()`` em blocos, são formatadas como
+na API (preço como string, datas ISO 8601 no fuso configurado) e enviadas por
+``StreamingHttpResponse``: a memória fica constante e o primeiro byte (o
+cabeçalho) sai antes da primeira consulta terminar.
+
+Sob ASGI o conteúdo é entregue por um iterador assíncrono que busca cada bloco
+via ``sync_to_async``; um iterador síncrono faria o Django acumular a
+resposta inteira em memória antes de enviá-la.
+
+Os formatos colunares (ver ``core.columnar``) saem em blocos de linhas:
+``columnar`` é um único documento JSON ``{"blocks": [bloco, ...]}`` e
+``columnar-msgpack`` uma sequência de blocos MessagePack concatenados. Já
+``msgpack`` é uma sequência de objetos, um por produto (o NDJSON em binário).
+
+``fields`` (subconjunto de ``EXPORT_FIELDS``, ver ``?fields=``/``?exclude=``
+da API) limita as colunas lidas do banco e as exportadas.
+"""
+import csv
+import io
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.fields import DateTimeField
+
+from .columnar import columnar_records
+from .ledger import pending_stock
+from .models import Product
+from .renderers import msgpack
+
+EXPORT_FIELDS = [
+    'id',
+    'name',
+    'code',
+    'price',
+    'category',
+    'category_display',
+    'subcategory',
+    'stock',
+    'created_at',
+    'updated_at',
+]
+DB_FIELDS = [field for field in EXPORT_FIELDS if field != 'category_display']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'columnar': 'application/vnd.volus.columnar+json; charset=utf-8',
+    'msgpack': 'application/msgpack',
+    'columnar-msgpack': 'application/vnd.volus.columnar+msgpack',
+}
+EXTENSIONS = {
+    'columnar': 'json',
+    'columnar-msgpack': 'msgpack',
+}
+
+
+def iter_records(queryset, fields=EXPORT_FIELDS, chunk_size=2000):
+    """
+    Gera tuplas na ordem de ``fields``, já formatadas como na API.
+    """
+    if fields == EXPORT_FIELDS:
+        yield from _iter_all_records(queryset, chunk_size)
+        return
+
+    labels = dict(Product.CATEGORIES)
+    format_datetime = DateTimeField().to_representation
+    wanted = set(fields)
+    if 'category_display' in wanted:
+        wanted.add('category')
+    columns = [field for field in DB_FIELDS if field in wanted]
+    if 'stock' in wanted:
+        # Sem ``stock`` no recorte, a subconsulta do razão nem entra na consulta
+        queryset = queryset.annotate(pending_stock=pending_stock())
+        columns.append('pending_stock')
+    position = {column: index for index, column in enumerate(columns)}
+
+    def getter(field):
+        if field == 'category_display':
+            index = position['category']
+            return lambda row: labels.get(row[index], row[index])
+        index = position[field]
+        if field == 'stock':
+            pending = position['pending_stock']
+            return lambda row: row[index] + row[pending]
+        if field == 'price':
+            return lambda row: str(row[index])
+        if field in ('created_at', 'updated_at'):
+            return lambda row: format_datetime(row[index])
+        return lambda row: row[index]
+
+    getters = [getter(field) for field in fields]
+    for row in queryset.values_list(*columns).iterator(chunk_size=chunk_size):
+        yield tuple(get(row) for get in getters)
+
+
+def _iter_all_records(queryset, chunk_size):
+    # Exportação completa (o caso comum): desempacota cada linha direto
+    labels = dict(Product.CATEGORIES)
+    format_datetime = DateTimeField().to_representation
+    # Estoque atual: snapshot + movimentos pendentes (ver core.ledger)
+    rows = (
+        queryset.annotate(pending_stock=pending_stock())
+        .values_list(*DB_FIELDS, 'pending_stock')
+        .iterator(chunk_size=chunk_size)
+    )
+    for pk, name, code, price, category, subcategory, stock, created_at, updated_at, pending in rows:
+        yield (
+            pk,
+            name,
+            code,
+            str(price),
+            category,
+            labels.get(category, category),
+            subcategory,
+            stock + pending,
+            format_datetime(created_at),
+            format_datetime(updated_at),
+        )
+
+
+def iter_csv(records, fields=EXPORT_FIELDS, rows_per_chunk=1000):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(fields)
+    yield flush()
+
+    pending = 0
+    for record in records:
+        writer.writerow(record)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield flush()
+            pending = 0
+    if pending:
+        yield flush()
+
+
+def iter_ndjson(records, fields=EXPORT_FIELDS, rows_per_chunk=1000):
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    lines = []
+    for record in records:
+        lines.append(dumps(dict(zip(fields, record))))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _blocks(records, size):
+    records = iter(records)
+    while block := list(itertools.islice(records, size)):
+        yield block
+
+
+def iter_columnar(records, fields=EXPORT_FIELDS, rows_per_chunk=1000):
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    yield '{"blocks":['
+    separator = ''
+    for block in _blocks(records, rows_per_chunk):
+        yield separator + dumps(columnar_records(fields, block))
+        separator = ','
+    yield ']}'
+
+
+def iter_msgpack(records, fields=EXPORT_FIELDS, rows_per_chunk=1000):
+    pack = msgpack.Packer().pack
+    for block in _blocks(records, rows_per_chunk):
+        yield b''.join(pack(dict(zip(fields, record))) for record in block)
+
+
+def iter_columnar_msgpack(records, fields=EXPORT_FIELDS, rows_per_chunk=1000):
+    pack = msgpack.Packer().pack
+    for block in _blocks(records, rows_per_chunk):
+        yield pack(columnar_records(fields, block))
+
+
+ENCODERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'columnar': iter_columnar,
+    'msgpack': iter_msgpack,
+    'columnar-msgpack': iter_columnar_msgpack,
+}
+
+
+async def _aiter(iterator):
+    """
+    Consome um iterador síncrono (que acessa o banco) a partir do loop ASGI.
+    """
+    next_chunk = sync_to_async(lambda: next(iterator, None), thread_sensitive=True)
+    while True:
+        chunk = await next_chunk()
+        if chunk is None:
+            break
+        yield chunk
+
+
+def export_response(request, queryset, file_format, fields=EXPORT_FIELDS):
+    """
+    Monta a ``StreamingHttpResponse`` da exportação (WSGI ou ASGI).
+    """
+    content = ENCODERS[file_format](iter_records(queryset, fields), fields)
+    if isinstance(request, ASGIRequest):
+        content = _aiter(content)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="produtos.{EXTENSIONS.get(file_format, file_format)}"'
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,153 @@
+"""
+Execução do hashing de senhas (PBKDF2) fora do caminho das demais rotas.
+
+Login, registro e troca de senha calculam um PBKDF2 completo. Com
+``AUTH_HASH_POOL`` definido, esse trabalho roda em um pool de threads de
+tamanho fixo com fila limitada: no máximo ``workers`` hashes simultâneos por
+processo e, com a fila cheia, a requisição é recusada na hora (503) em vez de
+ocupar mais um worker. Sem a configuração, o hashing roda na própria thread
+da requisição, como antes.
+
+``auth_metrics`` acumula o tempo de hashing e as recusas (limite de taxa e
+fila cheia) no processo; os mesmos eventos vão para ``/metrics``
+(``core.metrics``), somados entre os workers.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import metrics
+
+# Limites dos buckets do histograma de tempo de hashing (segundos)
+HASH_TIME_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class HashingOverloaded(Exception):
+    """
+    Fila do pool de hashing cheia.
+    """
+
+
+class AuthMetrics:
+    """
+    Contadores em memória (por processo) do hashing de senhas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hash_count = 0
+            self.hash_seconds = 0.0
+            self.hash_max_seconds = 0.0
+            self.hash_buckets = [0] * (len(HASH_TIME_BUCKETS) + 1)
+            self.rejections = {}
+
+    def observe_hash(self, seconds):
+        metrics.PASSWORD_HASH_DURATION.observe(seconds)
+        with self._lock:
+            self.hash_count += 1
+            self.hash_seconds += seconds
+            self.hash_max_seconds = max(self.hash_max_seconds, seconds)
+            for index, limit in enumerate(HASH_TIME_BUCKETS):
+                if seconds <= limit:
+                    break
+            else:
+                index = len(HASH_TIME_BUCKETS)
+            self.hash_buckets[index] += 1
+
+    def reject(self, reason):
+        metrics.AUTH_REJECTIONS.inc(reason=reason)
+        with self._lock:
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'hash_count': self.hash_count,
+                'hash_seconds': self.hash_seconds,
+                'hash_max_seconds': self.hash_max_seconds,
+                'hash_buckets': dict(zip([*HASH_TIME_BUCKETS, float('inf')], self.hash_buckets)),
+                'hash_pending': hashing_pool.pending,
+                'rejections': dict(self.rejections),
+            }
+
+
+auth_metrics = AuthMetrics()
+
+
+class HashingPool:
+    """
+    Pool de threads com fila limitada para as operações de hashing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._config = None
+        self.pending = 0
+
+    def get_config(self):
+        # {'workers': int, 'max_queue': int} ou None (hashing na thread da requisição)
+        return getattr(settings, 'AUTH_HASH_POOL', None)
+
+    def run(self, function, *args, **kwargs):
+        """
+        Executa ``function`` (que calcula um hash) e registra o tempo gasto.
+
+        Levanta ``HashingOverloaded`` quando a fila do pool está cheia.
+        """
+        config = self.get_config()
+        if not config:
+            return self._timed(function, args, kwargs)
+
+        with self._lock:
+            if self._executor is None or self._config != config:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=config['workers'], thread_name_prefix='password-hashing'
+                )
+                self._config = dict(config)
+            if self.pending >= config['workers'] + config['max_queue']:
+                auth_metrics.reject('hash_queue_full')
+                raise HashingOverloaded()
+            self.pending += 1
+            executor = self._executor
+
+        # Roteamento de leitura (pin no primário), profiler e métricas da
+        # requisição vivem em ContextVars: a thread do pool roda no contexto dela
+        context = contextvars.copy_context()
+        try:
+            return executor.submit(context.run, self._in_pool, function, args, kwargs).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _in_pool(self, function, args, kwargs):
+        try:
+            return self._timed(function, args, kwargs)
+        finally:
+            # Conexões abertas pelas threads do pool seguem CONN_MAX_AGE
+            close_old_connections()
+
+    @staticmethod
+    def _timed(function, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            auth_metrics.observe_hash(time.perf_counter() - started)
+
+
+hashing_pool = HashingPool()
+
+
+def run_hashing(function, *args, **kwargs):
+    return hashing_pool.run(function, *args, **kwargs)
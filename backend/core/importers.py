@@ -0,0 +1,287 @@
+"""
+Importação em lote de produtos (CSV ou NDJSON).
+
+As linhas são lidas em streaming, validadas em lotes (coluna a coluna, com
+as mesmas regras de ``Product.clean``) e gravadas com ``bulk_create`` em modo
+upsert pelo ``code``, uma transação por lote. O resultado traz contadores e
+os erros por linha.
+
+Usado pelo comando ``import_products`` e por ``POST /api/products/import/``.
+"""
+import codecs
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .categories import category_tree
+from .db import begin_write
+from .ledger import supersede_pending
+from .models import INTEGER_MAX, Product
+
+UPDATE_FIELDS = ['name', 'price', 'category', 'subcategory', 'stock', 'updated_at']
+
+CATEGORY_CHOICES = frozenset(key for key, _ in Product.CATEGORIES)
+NAME_MAX_LENGTH = Product._meta.get_field('name').max_length
+CODE_MAX_LENGTH = Product._meta.get_field('code').max_length
+SUBCATEGORY_MAX_LENGTH = Product._meta.get_field('subcategory').max_length
+PRICE_DECIMAL_PLACES = Product._meta.get_field('price').decimal_places
+PRICE_LIMIT = Decimal(10) ** (Product._meta.get_field('price').max_digits - PRICE_DECIMAL_PLACES)
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(name='', content_type=''):
+    """
+    Descobre o formato pelo content-type ou pela extensão do arquivo.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    name = (name or '').lower()
+    if content_type in ('application/x-ndjson', 'application/jsonl') or name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if content_type == 'text/csv' or name.endswith('.csv'):
+        return 'csv'
+    return None
+
+
+def iter_text_lines(stream, encoding='utf-8-sig'):
+    """
+    Decodifica um stream binário linha a linha (sem ler o arquivo inteiro).
+    """
+    return codecs.iterdecode(iter(stream), encoding)
+
+
+def read_csv(lines):
+    """
+    Gera (número da linha, dados) a partir de linhas CSV com cabeçalho.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(lines):
+    """
+    Gera (número da linha, dados) a partir de linhas NDJSON.
+
+    Linhas com JSON inválido geram ``(linha, None)`` e são reportadas como erro.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield line_number, data if isinstance(data, dict) else None
+
+
+class ImportReport:
+    """
+    Resultado da importação: contadores e erros por linha.
+    """
+
+    def __init__(self, max_errors=1000):
+        self.max_errors = max_errors
+        self.total = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, code, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'code': code, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+
+class ProductImporter:
+    """
+    Valida e grava produtos em lotes (upsert por ``code``).
+    """
+
+    def __init__(self, batch_size=2000, dry_run=False, max_errors=1000):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.report = ImportReport(max_errors=max_errors)
+
+    def run(self, rows):
+        """
+        Consome um iterável de ``(linha, dados)`` e retorna o ``ImportReport``.
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.report.total += len(batch)
+            self.import_batch(batch)
+
+        if not self.dry_run and (self.report.created or self.report.updated):
+            # bulk_create não dispara sinais; a árvore é reconstruída na próxima leitura
+            category_tree.invalidate()
+        return self.report
+
+    def import_batch(self, batch):
+        lines = [line for line, _ in batch]
+        data = [row if isinstance(row, dict) else None for _, row in batch]
+        errors = [{} if row is not None else {'non_field_errors': 'Linha inválida.'} for row in data]
+
+        def column(field):
+            return [
+                '' if row is None or row.get(field) is None else str(row.get(field)).strip()
+                for row in data
+            ]
+
+        names = column('name')
+        codes = column('code')
+        categories = column('category')
+        subcategories = column('subcategory')
+        prices = [self.parse_price(value) for value in column('price')]
+        stocks = [self.parse_stock(value) for value in column('stock')]
+
+        for index in range(len(batch)):
+            row_errors = errors[index]
+            if data[index] is None:
+                continue
+            name, code, price, stock = names[index], codes[index], prices[index], stocks[index]
+
+            if not name:
+                row_errors['name'] = 'Este campo é obrigatório.'
+            elif len(name) > NAME_MAX_LENGTH:
+                row_errors['name'] = f'Máximo de {NAME_MAX_LENGTH} caracteres.'
+
+            if not code:
+                row_errors['code'] = 'Este campo é obrigatório.'
+            elif len(code) > CODE_MAX_LENGTH:
+                row_errors['code'] = f'Máximo de {CODE_MAX_LENGTH} caracteres.'
+            else:
+                digit_sum = sum(int(c) for c in code if c.isdigit())
+                if digit_sum % 3 != 0:
+                    row_errors['code'] = (
+                        f'Código inválido (checksum incorreto). '
+                        f'A soma dos dígitos deve ser divisível por 3. '
+                        f'Soma atual: {digit_sum}'
+                    )
+
+            if price is None:
+                row_errors['price'] = 'Preço inválido.'
+            elif price <= 0:
+                row_errors['price'] = 'O preço deve ser maior que zero.'
+            elif price >= PRICE_LIMIT:
+                row_errors['price'] = 'Preço acima do limite permitido.'
+            elif -price.as_tuple().exponent > PRICE_DECIMAL_PLACES:
+                # Como o ProductSerializer: sem arredondar em silêncio
+                row_errors['price'] = f'Máximo de {PRICE_DECIMAL_PLACES} casas decimais.'
+
+            if stock is None:
+                row_errors['stock'] = 'Estoque inválido.'
+            elif stock < 0:
+                row_errors['stock'] = 'O estoque não pode ser negativo.'
+            elif stock > INTEGER_MAX:
+                # Fora da faixa o banco recusaria o lote inteiro (ou estouraria no driver)
+                row_errors['stock'] = f'O estoque deve ser no máximo {INTEGER_MAX}.'
+
+            if categories[index] not in CATEGORY_CHOICES:
+                row_errors['category'] = f'Categoria inválida: "{categories[index]}".'
+
+            if len(subcategories[index]) > SUBCATEGORY_MAX_LENGTH:
+                row_errors['subcategory'] = f'Máximo de {SUBCATEGORY_MAX_LENGTH} caracteres.'
+
+        # Último valor vence quando o mesmo código aparece mais de uma vez no lote
+        valid = {}
+        for index in range(len(batch)):
+            if errors[index]:
+                self.report.add_error(lines[index], codes[index] or None, errors[index])
+            else:
+                valid[codes[index]] = index
+
+        if not valid:
+            return
+
+        if self.dry_run:
+            existing = set(
+                Product.objects.filter(code__in=list(valid)).values_list('code', flat=True)
+            )
+            self.report.updated += len(existing)
+            self.report.created += len(valid) - len(existing)
+            return
+
+        now = timezone.now()
+        products = [
+            Product(
+                name=names[index],
+                code=code,
+                price=prices[index],
+                category=categories[index],
+                subcategory=subcategories[index],
+                stock=stocks[index],
+                created_at=now,
+                updated_at=now,
+            )
+            for code, index in valid.items()
+        ]
+
+        try:
+            with transaction.atomic():
+                begin_write()
+                existing = dict(
+                    Product.objects.filter(code__in=list(valid)).values_list('code', 'id')
+                )
+                # O estoque importado é valor absoluto: substitui os movimentos
+                # pendentes do razão (ver core.ledger)
+                supersede_pending(
+                    {pk: stocks[valid[code]] for code, pk in existing.items()}, now=now
+                )
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=['code'],
+                    update_fields=UPDATE_FIELDS,
+                )
+        except DatabaseError as exc:
+            for code, index in valid.items():
+                self.report.add_error(lines[index], code, {'non_field_errors': f'Erro ao gravar: {exc}'})
+            return
+
+        self.report.updated += len(existing)
+        self.report.created += len(valid) - len(existing)
+
+    @staticmethod
+    def parse_price(value):
+        # Só notação decimal simples (vírgula ou ponto); expoente ("1e3") é inválido
+        if not value or 'e' in value.lower():
+            return None
+        try:
+            price = Decimal(value.replace(',', '.'))
+        except InvalidOperation:
+            return None
+        return price if price.is_finite() else None
+
+    @staticmethod
+    def parse_stock(value):
+        if value == '':
+            return 0
+        if 'e' in value.lower():
+            return None
+        try:
+            stock = Decimal(value)
+        except InvalidOperation:
+            return None
+        if not stock.is_finite() or stock != stock.to_integral_value():
+            return None
+        return int(stock)
@@ -0,0 +1,300 @@
+"""
+Razão de estoque (``StockMovement``) e compactação em ``Product.stock``.
+
+Escritas relativas (venda, compra, perda...) só incluem um movimento: não
+atualizam a linha do produto, que deixa de ser um ponto de disputa entre
+escritores do mesmo SKU. O estoque atual é o snapshot (``Product.stock``)
+mais a soma dos movimentos pendentes (``applied_at`` nulo), lida na mesma
+consulta dos dados do produto por uma subconsulta coberta pelo índice
+parcial ``stockmove_pending_product_idx``.
+
+A compactação (``compact_stock_movements``, comando
+``compact_stock_movements --interval N`` ou, opcionalmente, a tarefa em
+processo de ``STOCK_COMPACTION_INTERVAL``) soma os pendentes no snapshot e os
+marca como aplicados na mesma transação, de modo que nenhuma leitura conta um
+movimento duas vezes nem o perde. Sem pendentes, não abre transação (no
+SQLite, ``core.db.begin_write`` pegaria o lock de escrita à toa).
+
+Gravações de valor absoluto (PUT/PATCH com ``stock``, ``set`` do ajuste em
+lote, importação) substituem os pendentes: ``supersede_pending`` registra a
+diferença como um movimento de correção já aplicado.
+
+Ordenação, filtros e agregados por estoque (``ordering=stock``, faixas,
+``/stats/``) usam ``current_stock``: a coluna ``stock`` (e seus índices)
+quando não há pendentes, senão snapshot + pendentes. Sem compactação, os
+pendentes só crescem e essas consultas passam a somar o razão por produto.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Case, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .db import begin_write
+from .models import Product, StockMovement
+
+logger = logging.getLogger(__name__)
+
+# Produtos por UPDATE na compactação (limita o CASE e o número de parâmetros)
+UPDATE_CHUNK_SIZE = 2000
+
+
+class InsufficientStock(Exception):
+    """
+    Movimento recusado: deixaria o estoque atual negativo.
+    """
+
+    def __init__(self, available):
+        super().__init__('Estoque insuficiente.')
+        self.available = available
+
+
+def _chunks(items, size=UPDATE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def pending_movements():
+    return StockMovement.objects.filter(applied_at__isnull=True)
+
+
+def pending_stock(product='pk'):
+    """
+    Soma dos movimentos pendentes do produto (subconsulta correlacionada).
+    """
+    total = (
+        pending_movements()
+        .filter(product=OuterRef(product))
+        .order_by()
+        .values('product')
+        .annotate(total=Sum('delta'))
+        .values('total')
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def current_stock():
+    """
+    Expressão do estoque atual para filtros, ordenação e contagens.
+
+    Sem movimentos pendentes (compactação em dia) é a própria coluna
+    ``stock`` e as consultas seguem nos índices; com pendentes, snapshot +
+    pendentes por produto.
+    """
+    if pending_movements().exists():
+        return F('stock') + pending_stock()
+    return F('stock')
+
+
+async def acurrent_stock():
+    if await pending_movements().aexists():
+        return F('stock') + pending_stock()
+    return F('stock')
+
+
+def last_pending_at(product='pk'):
+    """
+    Data do movimento pendente mais recente do produto (validadores HTTP).
+    """
+    latest = pending_movements().filter(product=OuterRef(product)).order_by('-id').values('created_at')[:1]
+    return Subquery(latest)
+
+
+def with_pending_stock(rows):
+    """
+    Anota ``pending_stock`` nas linhas de ``values()``; ``apply_pending_stock``
+    soma o valor em ``stock`` depois da paginação.
+    """
+    return rows.annotate(pending_stock=pending_stock())
+
+
+def apply_pending_stock(rows):
+    # Linhas sem a anotação (projeções sem estoque) ficam como estão
+    for row in rows:
+        if 'pending_stock' in row:
+            row['stock'] += row.pop('pending_stock')
+    return rows
+
+
+def ledger_version():
+    """
+    Último movimento incluído: entra no ETag das coleções de produtos.
+    """
+    return StockMovement.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+async def aledger_version():
+    return (await StockMovement.objects.aaggregate(last=Max('id')))['last'] or 0
+
+
+def live_stock(product_ids):
+    """
+    Estoque atual (snapshot + pendentes) por produto.
+    """
+    current = {}
+    for chunk in _chunks(list(product_ids)):
+        current.update(
+            Product.objects.filter(id__in=chunk).order_by()
+            .values_list('id')
+            .annotate(live=F('stock') + pending_stock())
+        )
+    return current
+
+
+def lock_stock(product_ids):
+    """
+    Serializa, até o fim da transação, as conferências de estoque dos
+    produtos: movimentos (``record_movement``) e ajustes em lote
+    (``core.stock``) usam o mesmo lock. No PostgreSQL é um lock consultivo
+    por id de produto, sem bloquear a linha do produto nem os leitores. No
+    SQLite é o lock de escrita do banco (``core.db.begin_write``): chamado
+    antes de qualquer leitura da transação.
+    """
+    if connection.vendor == 'sqlite':
+        begin_write()
+        return
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for pk in sorted(product_ids):
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [pk])
+
+
+def record_movement(product_id, delta, reason='adjustment', user=None, note=''):
+    """
+    Inclui um movimento pendente. Baixas conferem o estoque atual antes e
+    levantam ``InsufficientStock`` se ele ficaria negativo.
+    """
+    with transaction.atomic():
+        if delta < 0:
+            lock_stock([product_id])
+            available = live_stock([product_id]).get(product_id, 0)
+            if available + delta < 0:
+                raise InsufficientStock(available)
+        return StockMovement.objects.create(
+            product_id=product_id,
+            delta=delta,
+            reason=reason,
+            note=note,
+            user_id=getattr(user, 'pk', None),
+        )
+
+
+def supersede_pending(values, user=None, now=None):
+    """
+    Prepara gravações de valor absoluto (``{id: novo estoque}``): marca os
+    pendentes como aplicados e registra a diferença para o estoque atual como
+    movimento de correção. Deve rodar na mesma transação que grava o valor.
+    """
+    if not values:
+        return
+    now = now or timezone.now()
+    current = live_stock(values)
+    user_id = getattr(user, 'pk', None)
+    for chunk in _chunks(list(values)):
+        pending_movements().filter(product_id__in=chunk).update(applied_at=now)
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=pk, delta=stock - current[pk], reason='correction',
+            user_id=user_id, created_at=now, applied_at=now,
+        )
+        for pk, stock in values.items()
+        if pk in current and stock != current[pk]
+    ], batch_size=UPDATE_CHUNK_SIZE)
+
+
+def compact_stock_movements(batch_size=5000):
+    """
+    Soma os movimentos pendentes em ``Product.stock``, em lotes de
+    ``batch_size`` movimentos (uma transação por lote).
+
+    Retorna ``(movimentos aplicados, produtos atualizados)``.
+    """
+    applied = updated = 0
+    while True:
+        # Leitura pelo índice parcial, fora da transação de escrita
+        if not pending_movements().exists():
+            break
+        with transaction.atomic():
+            begin_write()
+            # skip_locked: compactadores concorrentes (PostgreSQL) pegam lotes distintos
+            ids = list(
+                pending_movements().select_for_update(skip_locked=True)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            batch = pending_movements().filter(id__in=ids)
+            totals = [
+                (product_id, total)
+                for product_id, total in batch.order_by().values_list('product').annotate(total=Sum('delta'))
+                if total
+            ]
+            now = timezone.now()
+            for chunk in _chunks(totals):
+                Product.objects.filter(id__in=[pk for pk, _ in chunk]).update(
+                    stock=F('stock') + Case(
+                        *[When(id=pk, then=Value(total)) for pk, total in chunk],
+                        output_field=IntegerField(),
+                    ),
+                    updated_at=now,
+                )
+            applied += batch.update(applied_at=now)
+            updated += len(totals)
+        if len(ids) < batch_size:
+            break
+    return applied, updated
+
+
+class CompactionThread(threading.Thread):
+    """
+    Tarefa em processo que executa ``compact_stock_movements`` periodicamente.
+    """
+
+    def __init__(self, interval, batch_size=5000):
+        super().__init__(name='stock-compaction', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                applied, updated = compact_stock_movements(batch_size=self.batch_size)
+                if applied:
+                    logger.info(
+                        'Razão de estoque: %d movimentos compactados em %d produtos.', applied, updated
+                    )
+            except DatabaseError:
+                logger.exception('Falha ao compactar o razão de estoque.')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_compaction_thread = None
+_compaction_thread_lock = threading.Lock()
+
+
+def start_periodic_compaction(**kwargs):
+    """
+    Inicia a tarefa periódica (uma por processo) se
+    ``STOCK_COMPACTION_INTERVAL`` estiver definido (desativada por padrão:
+    prefira o comando ``compact_stock_movements --interval``).
+
+    Conectada a ``request_started`` para rodar apenas em processos que
+    atendem requisições.
+    """
+    global _compaction_thread
+    interval = getattr(settings, 'STOCK_COMPACTION_INTERVAL', None)
+    if not interval or _compaction_thread is not None:
+        return
+    with _compaction_thread_lock:
+        if _compaction_thread is None:
+            _compaction_thread = CompactionThread(interval)
+            _compaction_thread.start()
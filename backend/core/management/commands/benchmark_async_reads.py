@@ -0,0 +1,180 @@
+"""Comando para comparar as leituras síncronas e assíncronas sob ASGI."""
+
+import asyncio
+import statistics
+import time
+import types
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from core import urls as core_urls
+from core.authentication import ProfileRefreshToken
+from core.models import Product
+
+USERNAME = "benchmark-async"
+
+
+def build_urlconf(name, patterns):
+    # Módulo (hashable) usado como ROOT_URLCONF durante a medição
+    urlconf = types.ModuleType(name)
+    urlconf.urlpatterns = [path("", include(patterns))]
+    return urlconf
+
+
+class Command(BaseCommand):
+    """Mede vazão e latência das views síncronas e de core.async_views."""
+
+    help = (
+        "Dispara requisições concorrentes (em processo, pelo handler ASGI do "
+        "Django) contra GET /api/products/, /api/products/{id}/ e "
+        "/api/categories/, primeiro com as views síncronas e depois com as "
+        "assíncronas. Confere antes que as duas respostas são idênticas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=500,
+            help="Clientes concorrentes.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Requisições por endpoint em cada modo.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="page_size da listagem.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clients"] < 1 or options["requests"] < 1 or options["page_size"] < 1:
+            raise CommandError("Parâmetros devem ser maiores que zero.")
+        first = Product.objects.order_by("id").values_list("id", flat=True).first()
+        if first is None:
+            raise CommandError("Nenhum produto cadastrado (rode setup_demo antes).")
+
+        sync_patterns = [
+            pattern for pattern in core_urls.urlpatterns
+            if pattern not in core_urls.async_read_urlpatterns
+        ]
+        modes = [
+            ("sync", build_urlconf("benchmark_sync_urls", sync_patterns)),
+            ("async", build_urlconf("benchmark_async_urls", core_urls.async_read_urlpatterns + sync_patterns)),
+        ]
+        endpoints = [
+            ("list", f"/api/products/?page_size={options['page_size']}"),
+            ("detail", f"/api/products/{first}/"),
+            ("categories", "/api/categories/"),
+        ]
+
+        user, _ = get_user_model().objects.get_or_create(username=USERNAME)
+        token = str(ProfileRefreshToken.for_user(user).access_token)
+        try:
+            self.check_parity(modes, endpoints, token)
+            self.stdout.write(
+                f"{options['clients']} clientes, {options['requests']} requisições por endpoint\n"
+                f"{'endpoint':<12}{'modo':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}"
+            )
+            for label, url in endpoints:
+                for mode, urlconf in modes:
+                    with override_settings(ROOT_URLCONF=urlconf):
+                        stats = asyncio.run(
+                            self.run_load(url, token, options["clients"], options["requests"])
+                        )
+                    self.stdout.write(
+                        f"{label:<12}{mode:<7}{stats['rps']:>9.0f}{stats['p50']:>9.1f}"
+                        f"{stats['p95']:>9.1f}{stats['p99']:>9.1f}{stats['errors']:>7}"
+                    )
+        finally:
+            user.delete()
+
+    def check_parity(self, modes, endpoints, token):
+        for label, url in endpoints:
+            responses = []
+            for _, urlconf in modes:
+                with override_settings(ROOT_URLCONF=urlconf):
+                    responses.append(asyncio.run(self.request(ASGIHandler(), url, token)))
+            (sync_status, sync_headers, sync_body), (async_status, async_headers, async_body) = responses
+            if sync_status != 200 or (sync_status, sync_body) != (async_status, async_body):
+                raise CommandError(f"Respostas diferentes em {label}: {sync_status} x {async_status}")
+            if sync_headers.get(b"etag") != async_headers.get(b"etag"):
+                raise CommandError(f"ETag diferente em {label}.")
+        self.stdout.write(self.style.SUCCESS("Respostas síncronas e assíncronas idênticas."))
+
+    async def run_load(self, url, token, clients, total):
+        application = ASGIHandler()
+        pending = iter(range(total))
+        latencies = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            for _ in pending:
+                started = time.perf_counter()
+                status, _, _ = await self.request(application, url, token)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "rps": total / elapsed,
+            "p50": quantiles[49] * 1000,
+            "p95": quantiles[94] * 1000,
+            "p99": quantiles[98] * 1000,
+            "errors": errors,
+        }
+
+    @staticmethod
+    async def request(application, url, token):
+        path_info, _, query = url.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path_info,
+            "raw_path": path_info.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"localhost"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+        received = False
+        response = {"status": None, "headers": {}, "body": []}
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = dict(message["headers"])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await application(scope, receive, send)
+        return response["status"], response["headers"], b"".join(response["body"])
@@ -0,0 +1,267 @@
+"""Comando com os micro-benchmarks dos caminhos críticos do app core."""
+
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import time
+from decimal import Decimal
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.categories import category_tree
+from core.models import Product
+from core.serializers import ProductSerializer
+from core.views import PRODUCT_VALUES, CategoryListAPIView, ProductViewSet, login_api
+
+USERNAME = "benchmark-core"
+PASSWORD = "benchmark-core-123"
+NAME_WORDS = ["Notebook", "Cadeira", "Camiseta", "Livro", "Café", "Mesa", "Fone", "Tênis", "Arroz", "Luminária"]
+# Combinações de filtros da listagem (q, category, subcategory)
+FILTERS = {"q": "Note", "category": "eletronicos", "subcategory": "Sub 3"}
+
+
+class Rollback(Exception):
+    """Desfaz o catálogo sintético ao final."""
+
+
+class Command(BaseCommand):
+    """Mede os caminhos críticos em catálogos sintéticos e compara com um baseline."""
+
+    help = (
+        "Executa micro-benchmarks de ProductSerializer (serialização e validação), "
+        "Product.clean/_validate_code_checksum, ProductViewSet.get_queryset com cada "
+        "combinação de filtros, by_category, CategoryListAPIView e login_api em "
+        "catálogos sintéticos (1k/100k/1M por padrão, descartados ao final). Grava "
+        "os resultados em JSON e, com --baseline, falha se algum caso ficar mais "
+        "lento que o limite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[1_000, 100_000, 1_000_000],
+            help="Tamanhos de catálogo medidos.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Execuções por caso (vale a mediana).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Arquivo JSON com os resultados (use como baseline futuro).",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Arquivo JSON de uma execução anterior para comparação.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Piora relativa tolerada na mediana (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(set(options["sizes"]))
+        if not sizes or sizes[0] < 1 or options["repeat"] < 1 or options["threshold"] < 0:
+            raise CommandError("Parâmetros inválidos.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as handle:
+                baseline = json.load(handle)["results"]
+
+        self.repeat = options["repeat"]
+        self.factory = APIRequestFactory()
+        self.results = {}
+        try:
+            # Limite de tentativas desligado: login_api é chamado várias vezes
+            with override_settings(AUTH_RATE_LIMITS=None), transaction.atomic():
+                self.user = get_user_model().objects.create_user(USERNAME, password=PASSWORD)
+                self.run_fixed_cases()
+                for size in sizes:
+                    self.fill_catalog(size)
+                    self.run_catalog_cases(size)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            category_tree.invalidate()
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "repeat": self.repeat,
+                "sizes": sizes,
+            },
+            "results": self.results,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+        if baseline is not None:
+            self.compare(baseline, options["threshold"])
+
+    # Catálogo sintético --------------------------------------------------
+
+    def fill_catalog(self, size):
+        missing = size - Product.objects.count()
+        if missing <= 0:
+            return
+        started = time.perf_counter()
+        categories = [key for key, _ in Product.CATEGORIES]
+        base = timezone.now() - datetime.timedelta(days=365)
+        offset = Product.objects.filter(code__startswith="BM").count()
+        for start in range(offset, offset + missing, 5000):
+            batch = []
+            for index in range(start, min(start + 5000, offset + missing)):
+                moment = base + datetime.timedelta(seconds=index * 13)
+                batch.append(Product(
+                    name=f"{NAME_WORDS[index % len(NAME_WORDS)]} {index % 997}",
+                    code=f"BM{index:08d}",
+                    price=Decimal(index % 5000) / 10 + Decimal("0.99"),
+                    category=categories[index % len(categories)],
+                    subcategory=f"Sub {index % 17}",
+                    stock=index % 120,
+                    created_at=moment,
+                    updated_at=moment,
+                ))
+            Product.objects.bulk_create(batch, batch_size=5000)
+        self.stdout.write(
+            f"catálogo: {Product.objects.count()} produtos ({time.perf_counter() - started:.1f}s)"
+        )
+
+    # Casos ---------------------------------------------------------------
+
+    def run_fixed_cases(self):
+        """Casos que não dependem do tamanho do catálogo."""
+        categories = [key for key, _ in Product.CATEGORIES]
+        products = [
+            Product(
+                id=index, name=f"Produto {index}", code=f"ABC-{index % 1000:03d}",
+                price=Decimal("19.90"), category=categories[index % len(categories)],
+                subcategory="Sub", stock=index, created_at=timezone.now(), updated_at=timezone.now(),
+            )
+            for index in range(100)
+        ]
+        valid = Product(name="Produto", code="ABC-123", price=Decimal("10.00"), category="livros", stock=1)
+
+        self.measure("serializer.serialize[100]", lambda: ProductSerializer(products, many=True).data)
+        self.measure("model.clean", valid.clean)
+        self.measure("model.validate_code_checksum", valid._validate_code_checksum)
+
+        view = login_api
+        payload = {"username": USERNAME, "password": PASSWORD}
+        self.measure(
+            "view.login_api",
+            lambda: self.ensure_ok(view(self.factory.post("/api/auth/login/", payload, format="json"))),
+        )
+
+    def run_catalog_cases(self, size):
+        data = {
+            "name": "Produto novo", "code": "ZZZ-123", "price": "10.00",
+            "category": "livros", "subcategory": "Ficção", "stock": 3,
+        }
+
+        def validate():
+            serializer = ProductSerializer(data=data)
+            if not serializer.is_valid():
+                raise CommandError(f"Validação falhou: {serializer.errors}")
+
+        self.measure("serializer.validate", validate, size)
+
+        for count in range(len(FILTERS) + 1):
+            for names in itertools.combinations(FILTERS, count):
+                params = {name: FILTERS[name] for name in names}
+                label = "+".join(names) or "sem filtro"
+                self.measure(f"get_queryset[{label}]", lambda params=params: self.list_page(params), size)
+        self.measure("get_queryset[ordering=price]", lambda: self.list_page({"ordering": "price"}), size)
+
+        by_category = ProductViewSet.as_view({"get": "by_category"})
+        self.measure("view.by_category", lambda: self.call(by_category, "/api/products/by_category/"), size)
+
+        categories = CategoryListAPIView.as_view()
+
+        def categories_cold():
+            category_tree.invalidate()
+            self.call(categories, "/api/categories/")
+
+        self.measure("view.categories[frio]", categories_cold, size)
+        self.measure("view.categories[em cache]", lambda: self.call(categories, "/api/categories/"), size)
+
+    def list_page(self, params):
+        """Queryset da listagem + primeira página (COUNT e 100 linhas)."""
+        request = self.factory.get("/api/products/", params)
+        force_authenticate(request, user=self.user)
+        viewset = ProductViewSet(action_map={"get": "list"}, args=(), kwargs={}, format_kwarg=None)
+        viewset.request = viewset.initialize_request(request)
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        queryset.count()
+        return list(PRODUCT_VALUES.values(queryset)[:100])
+
+    def call(self, view, path):
+        request = self.factory.get(path)
+        force_authenticate(request, user=self.user)
+        return self.ensure_ok(view(request))
+
+    @staticmethod
+    def ensure_ok(response):
+        if response.status_code != 200:
+            raise CommandError(f"Resposta inesperada: {response.status_code} {getattr(response, 'data', '')}")
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    # Medição e comparação ------------------------------------------------
+
+    def measure(self, name, function, size=None):
+        key = name if size is None else f"{name}@{size}"
+        function()  # aquecimento
+        runs = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            function()
+            runs.append(time.perf_counter() - started)
+        self.results[key] = {
+            "median": statistics.median(runs),
+            "min": min(runs),
+            "runs": len(runs),
+        }
+        self.stdout.write(f"{key:<48} {statistics.median(runs) * 1000:>10.3f} ms")
+
+    def compare(self, baseline, threshold):
+        self.stdout.write(f"\n{'caso':<48} {'baseline':>10} {'atual':>10} {'variação':>9}")
+        regressions = []
+        for key, result in sorted(self.results.items()):
+            previous = baseline.get(key)
+            if previous is None:
+                continue
+            change = result["median"] / previous["median"] - 1
+            line = (
+                f"{key:<48} {previous['median'] * 1000:>8.3f}ms {result['median'] * 1000:>8.3f}ms "
+                f"{change:>+8.1%}"
+            )
+            if change > threshold:
+                regressions.append(key)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} caso(s) acima do limite de {threshold:.0%}: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Nenhuma regressão acima do limite."))
@@ -0,0 +1,215 @@
+"""Comando para medir a contenção entre escritas e leituras no banco."""
+
+import copy
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.test.utils import override_settings
+
+from core.db import begin_write
+from core.models import Product
+
+# Perfil "baseline": como o projeto rodava antes dos perfis de banco
+BASELINE = {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}
+BASELINE_SQLITE = {"SQLITE_PRAGMAS": {"journal_mode": "DELETE"}, "SQLITE_EARLY_WRITE_LOCK": False}
+
+
+class Command(BaseCommand):
+    """Compara escritas de estoque concorrentes com leituras da listagem."""
+
+    help = (
+        "Roda escritores (leitura + gravação de estoque em transação, como a "
+        "tela de controle de estoque) e leitores (COUNT + página da listagem) "
+        "em paralelo, primeiro com o perfil antigo (sem WAL/PRAGMAs, sem lock "
+        "de escrita antecipado, sem conexões persistentes) e depois com o perfil configurado, "
+        "e compara vazão, latência e erros 'database is locked'. No SQLite "
+        "cada perfil roda sobre uma cópia do banco."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=4,
+            help="Threads escritoras.",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=8,
+            help="Threads leitoras.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Duração (segundos) de cada perfil.",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=1000,
+            help="Quantidade de produtos disputados pelos escritores.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["writers"], options["readers"], options["products"]) < 1 or options["duration"] <= 0:
+            raise CommandError("Parâmetros inválidos.")
+
+        base = connections.settings[DEFAULT_DB_ALIAS]
+        configured = {
+            "SQLITE_PRAGMAS": getattr(settings, "SQLITE_PRAGMAS", None),
+            "SQLITE_EARLY_WRITE_LOCK": getattr(settings, "SQLITE_EARLY_WRITE_LOCK", True),
+        }
+        self.stdout.write(
+            f"Banco: {connections[DEFAULT_DB_ALIAS].vendor}; {options['writers']} escritores, "
+            f"{options['readers']} leitores, {options['duration']:.0f}s por perfil"
+        )
+        results = {}
+        for profile, overrides, sqlite_settings in (
+            ("baseline", BASELINE, BASELINE_SQLITE),
+            ("configurado", {}, configured),
+        ):
+            database = {**copy.deepcopy(base), **overrides}
+            with override_settings(**sqlite_settings):
+                results[profile] = self.run_profile(f"contention_{profile}", database, options)
+            self.report(profile, results[profile])
+
+        before, after = results["baseline"], results["configurado"]
+        self.stdout.write("")
+        for kind in ("writes", "reads"):
+            gain = after[kind] / before[kind] if before[kind] else float("inf")
+            self.stdout.write(
+                self.style.SUCCESS(f"{'Escritas' if kind == 'writes' else 'Leituras'}/s: {gain:.2f}x")
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Erros de lock: {before['errors']} -> {after['errors']}")
+        )
+
+    def run_profile(self, alias, database, options):
+        temp_dir = None
+        if database["ENGINE"].endswith("sqlite3"):
+            # Cópia consistente (inclui o conteúdo ainda no WAL)
+            temp_dir = tempfile.mkdtemp(prefix="volus-contention-")
+            path = os.path.join(temp_dir, "db.sqlite3")
+            source = sqlite3.connect(database["NAME"])
+            target = sqlite3.connect(path)
+            with target:
+                source.backup(target)
+            source.close()
+            target.close()
+            database["NAME"] = path
+
+        connections.settings[alias] = database
+        try:
+            queryset = Product.objects.using(alias)
+            ids = list(queryset.order_by("id").values_list("id", flat=True)[: options["products"]])
+            if not ids:
+                raise CommandError("Nenhum produto no banco; rode setup_demo antes.")
+            original = dict(queryset.filter(id__in=ids).values_list("id", "stock"))
+            categories = [key for key, _ in Product.CATEGORIES]
+
+            deadline = time.perf_counter() + options["duration"]
+            stats = {"writes": [], "reads": [], "errors": 0}
+            lock = threading.Lock()
+            threads = [
+                threading.Thread(target=self.worker, args=(alias, self.write, ids, deadline, stats, lock))
+                for _ in range(options["writers"])
+            ] + [
+                threading.Thread(target=self.worker, args=(alias, self.read, categories, deadline, stats, lock))
+                for _ in range(options["readers"])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            if temp_dir is None:
+                # Banco real: devolve o estoque original
+                queryset.filter(id__in=ids).update(stock=Case(
+                    *[When(id=pk, then=Value(stock)) for pk, stock in original.items()],
+                    output_field=IntegerField(),
+                ))
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return {
+            "writes": len(stats["writes"]) / options["duration"],
+            "reads": len(stats["reads"]) / options["duration"],
+            "write_p50": self.percentile(stats["writes"], 50),
+            "write_p95": self.percentile(stats["writes"], 95),
+            "read_p50": self.percentile(stats["reads"], 50),
+            "read_p95": self.percentile(stats["reads"], 95),
+            "errors": stats["errors"],
+        }
+
+    @staticmethod
+    def worker(alias, operation, choices, deadline, stats, lock):
+        kind = "writes" if operation.__name__ == "write" else "reads"
+        rng = random.Random()
+        latencies = []
+        errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    operation(alias, rng.choice(choices), rng)
+                    latencies.append(time.perf_counter() - started)
+                except OperationalError:
+                    errors += 1
+                # Fim da "requisição": fecha a conexão se não for persistente
+                connections[alias].close_if_unusable_or_obsolete()
+        finally:
+            connections[alias].close()
+            with lock:
+                stats[kind].extend(latencies)
+                stats["errors"] += errors
+
+    @staticmethod
+    def write(alias, pk, rng):
+        """Mesmo padrão do PATCH de estoque: lê o produto e grava na transação."""
+        with transaction.atomic(using=alias):
+            begin_write(alias)
+            product = Product.objects.using(alias).get(pk=pk)
+            product.stock = max(0, product.stock + rng.choice((-1, 1)))
+            product.save(using=alias, update_fields=["stock", "updated_at"])
+
+    @staticmethod
+    def read(alias, category, rng):
+        """COUNT + primeira página da listagem filtrada por categoria."""
+        queryset = Product.objects.using(alias).filter(category=category)
+        queryset.count()
+        list(queryset.values("id", "name", "code", "price", "stock")[:100])
+
+    @staticmethod
+    def percentile(values, percent):
+        if not values:
+            return 0.0
+        if len(values) == 1:
+            return values[0] * 1000
+        return statistics.quantiles(values, n=100)[percent - 1] * 1000
+
+    def report(self, profile, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nPerfil {profile}"))
+        self.stdout.write(
+            f"  escritas: {result['writes']:8.1f}/s  p50 {result['write_p50']:7.2f} ms  "
+            f"p95 {result['write_p95']:7.2f} ms"
+        )
+        self.stdout.write(
+            f"  leituras: {result['reads']:8.1f}/s  p50 {result['read_p50']:7.2f} ms  "
+            f"p95 {result['read_p95']:7.2f} ms"
+        )
+        self.stdout.write(f"  erros 'database is locked': {result['errors']}")
@@ -0,0 +1,125 @@
+"""Comando para comparar o JSON do DRF com FastJSONRenderer/FastJSONParser e os formatos compactos."""
+
+import datetime
+import gzip
+import io
+import json
+import statistics
+import time
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import COLLECTION_RENDERER_CLASSES, FastJSONRenderer, msgpack, orjson
+from core.synthetic import FIELDS, SyntheticCatalog
+from core.views import PRODUCT_VALUES
+
+
+class Command(BaseCommand):
+    """Mede renderização, parsing e tamanho de páginas de produtos em cada formato."""
+
+    help = (
+        "Renderiza e interpreta páginas de produtos sintéticos (100/1k/10k por "
+        "padrão) com o JSONRenderer/JSONParser do DRF e com "
+        "core.renderers.FastJSONRenderer/core.parsers.FastJSONParser. Confere "
+        "antes que a saída é idêntica byte a byte, tanto na página já "
+        "serializada (preço como string, datas ISO 8601, category_display) "
+        "quanto com Decimal/datetime crus (encoder do DRF). Depois compara "
+        "tamanho (puro e com gzip), renderização e decodificação dos formatos "
+        "da listagem (JSON, colunar e MessagePack)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[100, 1_000, 10_000],
+            help="Produtos por payload.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Execuções por caso (vale a mediana).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(set(options["sizes"]))
+        if not sizes or sizes[0] < 1 or options["repeat"] < 1:
+            raise CommandError("Parâmetros inválidos.")
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                "orjson não instalado: FastJSONRenderer/FastJSONParser usam a biblioteca padrão."
+            ))
+
+        self.repeat = options["repeat"]
+        self.stdout.write(
+            f"{'produtos':>8}  {'caso':<16} {'DRF':>10} {'rápido':>10} {'ganho':>7} {'tamanho':>10}"
+        )
+        for size in sizes:
+            rows = self.make_rows(size)
+            page = {"count": size, "next": None, "previous": None, "results": PRODUCT_VALUES.represent(rows)}
+            # Valores crus (como em respostas montadas à mão): Decimal e datetime pelo encoder do DRF
+            raw = {"count": size, "results": rows}
+
+            for name, data in (("render", page), ("render (cru)", raw)):
+                expected = JSONRenderer().render(data)
+                if FastJSONRenderer().render(data) != expected:
+                    raise CommandError(f"Saída diferente do JSONRenderer em '{name}' ({size} produtos).")
+                self.compare(size, name, JSONRenderer().render, FastJSONRenderer().render, data, len(expected))
+
+            body = JSONRenderer().render(page["results"])
+            if FastJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(io.BytesIO(body)):
+                raise CommandError(f"Parsing diferente do JSONParser ({size} produtos).")
+            self.compare(
+                size, "parse",
+                lambda data: JSONParser().parse(io.BytesIO(data)),
+                lambda data: FastJSONParser().parse(io.BytesIO(data)),
+                body, len(body),
+            )
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'produtos':>8}  {'formato':<18} {'tamanho':>10} {'gzip':>10} {'render':>10} {'decodificar':>12}"
+        )
+        for size in sizes:
+            rows = self.make_rows(size)
+            page = {"count": size, "next": None, "previous": None, "results": PRODUCT_VALUES.represent(rows)}
+            for renderer_class in (FastJSONRenderer, *COLLECTION_RENDERER_CLASSES):
+                render = renderer_class().render
+                body = render(page)
+                decode = msgpack.unpackb if "msgpack" in renderer_class.format else json.loads
+                self.stdout.write(
+                    f"{size:>8}  {renderer_class.format:<18} {len(body) / 1024:>6.0f} KiB "
+                    f"{len(gzip.compress(body)) / 1024:>6.0f} KiB {self.measure(render, page) * 1000:>7.2f} ms "
+                    f"{self.measure(decode, body) * 1000:>9.2f} ms"
+                )
+
+    @staticmethod
+    def make_rows(size):
+        rows = []
+        for index, values in enumerate(SyntheticCatalog(size, seed=size).rows(0, size), 1):
+            row = dict(zip(FIELDS, values), id=index)
+            row["created_at"] = row["created_at"].replace(tzinfo=datetime.timezone.utc)
+            row["updated_at"] = row["updated_at"].replace(tzinfo=datetime.timezone.utc)
+            rows.append(row)
+        return rows
+
+    def measure(self, function, data):
+        runs = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            function(data)
+            runs.append(time.perf_counter() - started)
+        return statistics.median(runs)
+
+    def compare(self, size, name, baseline, fast, data, length):
+        before = self.measure(baseline, data)
+        after = self.measure(fast, data)
+        self.stdout.write(
+            f"{size:>8}  {name:<16} {before * 1000:>7.2f} ms {after * 1000:>7.2f} ms "
+            f"{before / after:>6.1f}x {length / 1024:>7.0f} KiB"
+        )
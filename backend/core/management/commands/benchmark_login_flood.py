@@ -0,0 +1,184 @@
+"""Comando para medir a latência da listagem de produtos durante uma rajada de logins."""
+
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from core.authentication import ProfileRefreshToken
+from core.models import Product
+
+USERNAME = "benchmark-flood"
+DEFAULT_POOL = {"workers": 1, "max_queue": 2}
+
+
+class Command(BaseCommand):
+    """Compara a latência de GET /api/products/ sem carga, sob flood sem proteção e com proteção."""
+
+    help = (
+        "Leitores autenticados fazem GET /api/products/ enquanto threads "
+        "atacantes enviam logins inválidos (usuários aleatórios, senha errada) "
+        "a POST /api/auth/login/. Roda quatro cenários: sem flood, flood sem "
+        "proteção (AUTH_RATE_LIMITS=None, hashing na thread da requisição), "
+        "flood com os limites configurados e flood com limites + AUTH_HASH_POOL. "
+        "Informa p50/p95/p99 das leituras, se o p99 fica dentro de --slo-ms e "
+        "as respostas do login. Tudo roda em threads de um processo (como um "
+        "worker com threads); os buckets de cada cenário ficam em um arquivo "
+        "temporário."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=2,
+            help="Threads leitoras da listagem.",
+        )
+        parser.add_argument(
+            "--attackers",
+            type=int,
+            default=8,
+            help="Threads enviando logins inválidos.",
+        )
+        parser.add_argument(
+            "--attacker-ips",
+            type=int,
+            default=1,
+            help="Quantidade de IPs de origem dos logins inválidos.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Duração (segundos) de cada cenário.",
+        )
+        parser.add_argument(
+            "--slo-ms",
+            type=float,
+            default=250.0,
+            help="Meta de p99 (ms) da listagem.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["readers"], options["attackers"], options["attacker_ips"]) < 1 or options["duration"] <= 0:
+            raise CommandError("Parâmetros inválidos.")
+        if not Product.objects.exists():
+            raise CommandError("Nenhum produto no banco; rode setup_demo antes.")
+
+        limits = getattr(settings, "AUTH_RATE_LIMITS", None)
+        if limits is None:
+            raise CommandError("AUTH_RATE_LIMITS desativado; não há cenário protegido para comparar.")
+        pool = getattr(settings, "AUTH_HASH_POOL", None) or DEFAULT_POOL
+
+        user, _ = get_user_model().objects.get_or_create(username=USERNAME)
+        self.token = str(ProfileRefreshToken.for_user(user).access_token)
+        self.options = options
+        self.stdout.write(
+            f"{options['readers']} leitores, {options['attackers']} atacantes "
+            f"({options['attacker_ips']} IPs), {options['duration']:.0f}s por cenário, "
+            f"SLO p99 {options['slo_ms']:.0f} ms"
+        )
+        self.stdout.write(
+            f"{'cenário':<24} {'leituras/s':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'SLO':>5}  login"
+        )
+        try:
+            # Sem o log de requisições lentas: cada login do flood passaria do limite
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], SLOW_REQUEST_MS=None, SLOW_REQUEST_QUERIES=None
+            ):
+                for label, attackers, overrides in (
+                    ("sem flood", 0, {}),
+                    ("flood sem proteção", options["attackers"], {"AUTH_RATE_LIMITS": None, "AUTH_HASH_POOL": None}),
+                    ("flood com limites", options["attackers"], {"AUTH_HASH_POOL": None}),
+                    ("flood com limites+pool", options["attackers"], {"AUTH_HASH_POOL": pool}),
+                ):
+                    self.run_scenario(label, attackers, overrides)
+        finally:
+            user.delete()
+
+    def run_scenario(self, label, attackers, overrides):
+        store_dir = tempfile.mkdtemp(prefix="volus-flood-")
+        store = os.path.join(store_dir, "ratelimit.sqlite3")
+        stop = threading.Event()
+        reads = []
+        logins = Counter()
+        lock = threading.Lock()
+        try:
+            with override_settings(AUTH_RATE_LIMIT_STORE=store, **overrides):
+                threads = [
+                    threading.Thread(target=self.attacker, args=(index, stop, logins, lock))
+                    for index in range(attackers)
+                ] + [
+                    threading.Thread(target=self.reader, args=(stop, reads, lock))
+                    for _ in range(self.options["readers"])
+                ]
+                for thread in threads:
+                    thread.start()
+                time.sleep(self.options["duration"])
+                stop.set()
+                for thread in threads:
+                    thread.join()
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+        p99 = self.percentile(reads, 99)
+        within = "ok" if reads and p99 <= self.options["slo_ms"] else "fora"
+        answered = " ".join(f"{code}:{count}" for code, count in sorted(logins.items())) or "-"
+        self.stdout.write(
+            f"{label:<24} {len(reads) / self.options['duration']:>10.1f} "
+            f"{self.percentile(reads, 50):>6.1f} ms {self.percentile(reads, 95):>6.1f} ms "
+            f"{p99:>6.1f} ms {within:>5}  {answered}"
+        )
+
+    def reader(self, stop, reads, lock):
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        latencies = []
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = client.get("/api/products/")
+                if response.status_code != 200:
+                    raise CommandError(f"Listagem respondeu {response.status_code}.")
+                latencies.append(time.perf_counter() - started)
+        finally:
+            connections.close_all()
+            with lock:
+                reads.extend(latencies)
+
+    def attacker(self, index, stop, logins, lock):
+        source = index % self.options["attacker_ips"]
+        client = Client(REMOTE_ADDR=f"10.0.{source // 256}.{source % 256}")
+        rng = random.Random(index)
+        answered = Counter()
+        try:
+            while not stop.is_set():
+                response = client.post(
+                    "/api/auth/login/",
+                    {"username": f"flood-{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}", "password": "x" * 12},
+                    content_type="application/json",
+                )
+                answered[response.status_code] += 1
+        finally:
+            connections.close_all()
+            with lock:
+                logins.update(answered)
+
+    @staticmethod
+    def percentile(values, percent):
+        if not values:
+            return 0.0
+        if len(values) == 1:
+            return values[0] * 1000
+        return statistics.quantiles(values, n=100)[percent - 1] * 1000
@@ -0,0 +1,235 @@
+"""Comando para medir escritas concorrentes de estoque em um único SKU."""
+
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Max
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.ledger import compact_stock_movements, live_stock
+from core.models import Product, StockMovement
+from core.views import ProductViewSet
+
+USERNAME = "benchmark-ledger"
+# Estoque inicial do SKU disputado (as baixas nunca esgotam o produto)
+INITIAL_STOCK = 1_000_000
+
+RETRIEVE = ProductViewSet.as_view({"get": "retrieve"})
+PATCH = ProductViewSet.as_view({"patch": "partial_update"})
+MOVEMENTS = ProductViewSet.as_view({"post": "movements"})
+
+
+class Command(BaseCommand):
+    """Compara o PATCH de estoque com a inclusão no razão em um SKU disputado."""
+
+    help = (
+        "Dispara escritores concorrentes contra um único produto, primeiro "
+        "pelo caminho da tela de estoque (GET do produto + PATCH com o novo "
+        "valor) e depois incluindo movimentos no razão (POST "
+        "/api/products/{id}/movements/, com a compactação rodando em paralelo). "
+        "Compara vazão, latência, erros e atualizações perdidas. No SQLite roda "
+        "sobre uma cópia do banco; nos demais, restaura o produto ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=16,
+            help="Threads escritoras no mesmo SKU.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Duração (segundos) de cada caminho.",
+        )
+        parser.add_argument(
+            "--compaction-interval",
+            type=float,
+            default=1.0,
+            help="Intervalo (segundos) da compactação durante o caminho do razão.",
+        )
+
+    def handle(self, *args, **options):
+        if options["writers"] < 1 or options["duration"] <= 0 or options["compaction_interval"] <= 0:
+            raise CommandError("Parâmetros inválidos.")
+
+        database = connections.settings[DEFAULT_DB_ALIAS]
+        original_name = database["NAME"]
+        temp_dir = None
+        if database["ENGINE"].endswith("sqlite3"):
+            temp_dir = tempfile.mkdtemp(prefix="volus-ledger-")
+            path = os.path.join(temp_dir, "db.sqlite3")
+            source = sqlite3.connect(original_name)
+            target = sqlite3.connect(path)
+            with target:
+                source.backup(target)
+            source.close()
+            target.close()
+            # Conexões abertas a partir daqui (inclusive nas threads) usam a cópia
+            connections[DEFAULT_DB_ALIAS].close()
+            database["NAME"] = path
+
+        try:
+            product = Product.objects.order_by("id").first()
+            if product is None:
+                raise CommandError("Nenhum produto no banco; rode setup_demo antes.")
+            original_stock = product.stock
+            last_movement = StockMovement.objects.aggregate(last=Max("id"))["last"] or 0
+            user, created_user = get_user_model().objects.get_or_create(username=USERNAME)
+            self.stdout.write(
+                f"Banco: {connections[DEFAULT_DB_ALIAS].vendor}; produto {product.code} "
+                f"(id {product.pk}); {options['writers']} escritores, {options['duration']:.0f}s por caminho"
+            )
+
+            results = {}
+            for path_name, operation in (("patch", self.write_patch), ("razão", self.write_ledger)):
+                compact_stock_movements()
+                Product.objects.filter(pk=product.pk).update(stock=INITIAL_STOCK)
+                results[path_name] = self.run_path(path_name, operation, product.pk, user, options)
+                self.report(path_name, results[path_name])
+        finally:
+            if temp_dir is not None:
+                connections[DEFAULT_DB_ALIAS].close()
+                database["NAME"] = original_name
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            else:
+                # Banco real: remove os movimentos do benchmark e devolve o estoque
+                StockMovement.objects.filter(id__gt=last_movement).delete()
+                Product.objects.filter(pk=product.pk).update(stock=original_stock)
+                if created_user:
+                    user.delete()
+
+        before, after = results["patch"], results["razão"]
+        gain = after["writes"] / before["writes"] if before["writes"] else float("inf")
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"Escritas/s: {gain:.2f}x"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Atualizações perdidas: {before['lost']} -> {after['lost']}; "
+            f"erros: {before['errors']} -> {after['errors']}"
+        ))
+
+    def run_path(self, name, operation, pk, user, options):
+        factory = APIRequestFactory()
+        deadline = time.perf_counter() + options["duration"]
+        stats = {"latencies": [], "net": 0, "errors": 0, "rejected": 0}
+        lock = threading.Lock()
+        stop_compaction = threading.Event()
+        threads = [
+            threading.Thread(target=self.worker, args=(operation, factory, pk, user, deadline, stats, lock))
+            for _ in range(options["writers"])
+        ]
+        if operation == self.write_ledger:
+            threads.append(threading.Thread(
+                target=self.compactor, args=(options["compaction_interval"], stop_compaction)
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads[:options["writers"]]:
+            thread.join()
+        stop_compaction.set()
+        for thread in threads[options["writers"]:]:
+            thread.join()
+
+        pending = StockMovement.objects.filter(product_id=pk, applied_at__isnull=True).count()
+        final = live_stock([pk])[pk]
+        return {
+            "writes": len(stats["latencies"]) / options["duration"],
+            "p50": self.percentile(stats["latencies"], 50),
+            "p95": self.percentile(stats["latencies"], 95),
+            "errors": stats["errors"],
+            "rejected": stats["rejected"],
+            "lost": abs(INITIAL_STOCK + stats["net"] - final),
+            "pending": pending,
+        }
+
+    @staticmethod
+    def worker(operation, factory, pk, user, deadline, stats, lock):
+        rng = random.Random()
+        latencies = []
+        net = errors = rejected = 0
+        try:
+            while time.perf_counter() < deadline:
+                delta = rng.choice((-1, 1))
+                started = time.perf_counter()
+                try:
+                    status_code = operation(factory, pk, user, delta)
+                except OperationalError:
+                    errors += 1
+                    continue
+                if status_code in (200, 201):
+                    latencies.append(time.perf_counter() - started)
+                    net += delta
+                elif status_code == 409:
+                    rejected += 1
+                else:
+                    errors += 1
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+            with lock:
+                stats["latencies"].extend(latencies)
+                stats["net"] += net
+                stats["errors"] += errors
+                stats["rejected"] += rejected
+
+    @staticmethod
+    def compactor(interval, stopped):
+        try:
+            while not stopped.wait(interval):
+                try:
+                    compact_stock_movements()
+                except OperationalError:
+                    pass
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+
+    @staticmethod
+    def write_patch(factory, pk, user, delta):
+        """Caminho da tela de estoque: lê o produto e grava o novo valor absoluto."""
+        request = factory.get(f"/api/products/{pk}/")
+        force_authenticate(request, user=user)
+        response = RETRIEVE(request, pk=pk)
+        if response.status_code != 200:
+            return response.status_code
+        request = factory.patch(
+            f"/api/products/{pk}/", {"stock": response.data["stock"] + delta}, format="json"
+        )
+        force_authenticate(request, user=user)
+        return PATCH(request, pk=pk).status_code
+
+    @staticmethod
+    def write_ledger(factory, pk, user, delta):
+        """Inclusão no razão: um POST com a variação."""
+        request = factory.post(
+            f"/api/products/{pk}/movements/", {"delta": delta, "reason": "adjustment"}, format="json"
+        )
+        force_authenticate(request, user=user)
+        return MOVEMENTS(request, pk=pk).status_code
+
+    @staticmethod
+    def percentile(values, percent):
+        if not values:
+            return 0.0
+        if len(values) == 1:
+            return values[0] * 1000
+        return statistics.quantiles(values, n=100)[percent - 1] * 1000
+
+    def report(self, name, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nCaminho {name}"))
+        self.stdout.write(
+            f"  escritas: {result['writes']:8.1f}/s  p50 {result['p50']:7.2f} ms  p95 {result['p95']:7.2f} ms"
+        )
+        self.stdout.write(
+            f"  erros: {result['errors']}  recusadas (409): {result['rejected']}  "
+            f"atualizações perdidas: {result['lost']}  pendentes ao final: {result['pending']}"
+        )
@@ -0,0 +1,165 @@
+"""Comando para medir o refresh de JWT com uma blacklist grande."""
+
+import datetime
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from core.authentication import ProfileRefreshToken
+from core.blacklist import prune_expired_tokens
+
+JTI_PREFIX = "bench-"
+USERNAME = "benchmark-refresh"
+
+
+class Command(BaseCommand):
+    """Popula a blacklist com tokens históricos e mede refreshes por segundo."""
+
+    help = (
+        "Cria N tokens históricos (já na blacklist, a maioria expirados) e mede "
+        "a vazão de POST /api/auth/refresh/ antes e depois de prune_token_blacklist. "
+        "Os dados sintéticos são removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tokens",
+            type=int,
+            default=10_000_000,
+            help="Quantidade de tokens históricos.",
+        )
+        parser.add_argument(
+            "--live-ratio",
+            type=float,
+            default=0.02,
+            help="Fração dos tokens históricos ainda não expirados.",
+        )
+        parser.add_argument(
+            "--refreshes",
+            type=int,
+            default=1000,
+            help="Refreshes medidos em cada cenário.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50_000,
+            help="Linhas inseridas por transação ao popular.",
+        )
+
+    def handle(self, *args, **options):
+        if options["tokens"] < 0 or options["refreshes"] < 1 or not 0 <= options["live_ratio"] <= 1:
+            raise CommandError("Parâmetros inválidos.")
+
+        user, _ = get_user_model().objects.get_or_create(username=USERNAME)
+        self.chain = []
+        try:
+            self.seed(options["tokens"], options["live_ratio"], options["chunk_size"])
+            self.run_scenario("antes do prune", user, options["refreshes"])
+
+            started = time.perf_counter()
+            removed, _ = prune_expired_tokens()
+            self.stdout.write(f"prune: {removed} tokens removidos em {time.perf_counter() - started:.1f}s")
+            self.run_scenario("após prune", user, options["refreshes"])
+        finally:
+            self.cleanup(user)
+
+    def seed(self, total, live_ratio, chunk_size):
+        if not total:
+            return
+        outstanding = connection.ops.quote_name(OutstandingToken._meta.db_table)
+        blacklisted = connection.ops.quote_name(BlacklistedToken._meta.db_table)
+        now = timezone.now()
+        live = int(total * live_ratio)
+        started = time.perf_counter()
+
+        for offset in range(0, total, chunk_size):
+            rows = []
+            for index in range(offset, min(offset + chunk_size, total)):
+                if index < total - live:
+                    # Histórico espalhado pelos últimos 180 dias, já expirado
+                    created = now - datetime.timedelta(days=187, seconds=-(index % (180 * 86400)))
+                else:
+                    created = now - datetime.timedelta(seconds=index % 86400)
+                rows.append((
+                    f"{JTI_PREFIX}{uuid.uuid4().hex}",
+                    "",
+                    created,
+                    created + datetime.timedelta(days=7),
+                ))
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {outstanding}")
+                last_id = cursor.fetchone()[0]
+                cursor.executemany(
+                    f"INSERT INTO {outstanding} (jti, token, created_at, expires_at) VALUES (%s, %s, %s, %s)",
+                    rows,
+                )
+                cursor.execute(
+                    f"INSERT INTO {blacklisted} (token_id, blacklisted_at) "
+                    f"SELECT id, created_at FROM {outstanding} WHERE id > %s",
+                    [last_id],
+                )
+            self.stdout.write(f"\r{min(offset + chunk_size, total)}/{total} tokens históricos", ending="")
+            self.stdout.flush()
+        self.stdout.write(f"\npopulado em {time.perf_counter() - started:.1f}s")
+
+    def run_scenario(self, label, user, refreshes):
+        view = TokenRefreshView.as_view()
+        factory = APIRequestFactory()
+        refresh = str(ProfileRefreshToken.for_user(user))
+        self.chain.append(refresh)
+        blacklisted_table = BlacklistedToken._meta.db_table
+        probes = []
+
+        def count_probes(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith("SELECT") and blacklisted_table in sql:
+                probes.append(sql)
+            return execute(sql, params, many, context)
+
+        # Primeira chamada fora da medição
+        started = time.perf_counter()
+        response = view(factory.post("/api/auth/refresh/", {"refresh": refresh}, format="json"))
+        warmup = time.perf_counter() - started
+        refresh = response.data["refresh"]
+        self.chain.append(refresh)
+
+        with connection.execute_wrapper(count_probes):
+            started = time.perf_counter()
+            for _ in range(refreshes):
+                response = view(factory.post("/api/auth/refresh/", {"refresh": refresh}, format="json"))
+                if response.status_code != 200:
+                    raise CommandError(f"Refresh falhou ({label}): {response.data}")
+                refresh = response.data["refresh"]
+                self.chain.append(refresh)
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label:<22} {refreshes / elapsed:>8.0f} refresh/s  "
+            f"{elapsed / refreshes * 1000:>6.2f} ms/refresh  "
+            f"consultas à blacklist: {len(probes)}  (1ª chamada: {warmup * 1000:.0f} ms)"
+        )
+
+    def cleanup(self, user):
+        # Tokens sintéticos ainda válidos e a cadeia de refresh medida
+        outstanding = connection.ops.quote_name(OutstandingToken._meta.db_table)
+        blacklisted = connection.ops.quote_name(BlacklistedToken._meta.db_table)
+        chain = [ProfileRefreshToken(token, verify=False)["jti"] for token in self.chain]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {blacklisted} WHERE token_id IN "
+                f"(SELECT id FROM {outstanding} WHERE jti LIKE %s)",
+                [f"{JTI_PREFIX}%"],
+            )
+            cursor.execute(f"DELETE FROM {outstanding} WHERE jti LIKE %s", [f"{JTI_PREFIX}%"])
+            for start in range(0, len(chain), 500):
+                jtis = chain[start:start + 500]
+                BlacklistedToken.objects.filter(token__jti__in=jtis).delete()
+                OutstandingToken.objects.filter(jti__in=jtis).delete()
+            user.delete()
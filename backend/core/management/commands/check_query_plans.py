@@ -0,0 +1,62 @@
+"""Comando para detectar regressões de plano de consulta na API de produtos."""
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+
+from core.query_plans import SUPPORTED_VENDORS, capture_plans, inspect
+
+
+class Command(BaseCommand):
+    """
+    Executa EXPLAIN para as consultas da API de produtos e falha em full scans.
+
+    As asserções vivem em ``core.tests.test_query_plans``; o comando só
+    roda os mesmos cenários contra um banco real (ex.: com dados de produção).
+    """
+
+    help = (
+        "Captura o plano (EXPLAIN QUERY PLAN) de cada consulta feita pelas "
+        "rotas de produtos, by_category, stock-levels e categorias, e falha quando alguma "
+        "delas faz varredura completa da tabela de produtos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Alias do banco a ser inspecionado.",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Também falha quando a ordenação exige B-tree temporária.",
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Exibe o plano completo de cada consulta.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(
+                f"Banco '{connection.vendor}' não suportado (use SQLite ou PostgreSQL)."
+            )
+
+        failures = []
+        for label, sql, plan in capture_plans(connection):
+            problems = inspect(connection.vendor, plan, options["strict"])
+            status = self.style.ERROR("FALHA") if problems else self.style.SUCCESS("ok")
+            self.stdout.write(f"[{status}] {label}")
+            if problems or options["verbose_plans"]:
+                self.stdout.write(f"    SQL: {sql}")
+                for line in plan:
+                    self.stdout.write(f"      {line}")
+            failures.extend(f"{label}: {problem}" for problem in problems)
+
+        if failures:
+            raise CommandError(
+                "Regressão de plano de consulta:\n" + "\n".join(f"- {item}" for item in failures)
+            )
+        self.stdout.write(self.style.SUCCESS("Nenhuma varredura completa encontrada."))
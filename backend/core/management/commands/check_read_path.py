@@ -0,0 +1,111 @@
+"""Comando para validar e medir o caminho de leitura rápido de produtos."""
+
+import datetime
+import time
+from decimal import Decimal
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Product
+from core.serializers import ProductSerializer
+from core.views import PRODUCT_VALUES
+
+
+class Rollback(Exception):
+    """Desfaz os produtos sintéticos criados para a medição."""
+
+
+class Command(BaseCommand):
+    """
+    Mede ProductSerializer contra core.projections.
+
+    A paridade da saída (listagem, detalhe, ``fields``/``exclude`` e páginas
+    de cursor) é verificada em ``core.tests.test_read_path``.
+    """
+
+    help = (
+        "Mede o ganho de tempo da leitura via values() (core.projections) "
+        "sobre o ProductSerializer em listas de 100, 1.000 e 10.000 produtos. "
+        "Produtos sintéticos são criados em uma transação desfeita ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[100, 1000, 10000],
+            help="Tamanhos de lista medidos.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Repetições por medição (vale a melhor).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["sizes"])
+        if not sizes or sizes[0] < 1 or options["repeat"] < 1:
+            raise CommandError("--sizes e --repeat devem ser maiores que zero.")
+
+        try:
+            with transaction.atomic():
+                missing = sizes[-1] - Product.objects.count()
+                if missing > 0:
+                    self.create_products(missing)
+                self.benchmark(sizes, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_products(self, count):
+        """Produtos variados: preços extremos, subcategoria vazia, datas em DST/UTC."""
+        categories = [key for key, _ in Product.CATEGORIES]
+        base = datetime.datetime(2018, 2, 17, 23, 30, tzinfo=datetime.timezone.utc)
+        prices = [Decimal("0.01"), Decimal("0.10"), Decimal("19.90"), Decimal("1234.50"), Decimal("99999999.99")]
+        products = []
+        for index in range(count):
+            moment = base + datetime.timedelta(hours=7 * index, microseconds=index % 1000)
+            products.append(Product(
+                name=f"Produto de medição {index} – ç/ã \"aspas\"",
+                code=f"RP{index:08d}"[:10],
+                price=prices[index % len(prices)],
+                category=categories[index % len(categories)],
+                subcategory="" if index % 7 == 0 else f"Sub {index % 13}",
+                stock=index % 50,
+                created_at=moment,
+                updated_at=moment,
+            ))
+        Product.objects.bulk_create(products, batch_size=2000)
+        self.stdout.write(f"{count} produtos sintéticos criados (serão descartados).")
+
+    def benchmark(self, sizes, repeat):
+        render = JSONRenderer().render
+        queryset = Product.objects.order_by("-created_at", "-id")
+
+        def serializer_path(size):
+            return render(ProductSerializer(list(queryset[:size]), many=True).data)
+
+        def values_path(size):
+            return render(PRODUCT_VALUES.represent(list(PRODUCT_VALUES.values(queryset)[:size])))
+
+        self.stdout.write(f"{'linhas':>8} {'serializer':>12} {'values':>10} {'ganho':>7}")
+        for size in sizes:
+            slow = self.measure(serializer_path, size, repeat)
+            fast = self.measure(values_path, size, repeat)
+            self.stdout.write(
+                f"{size:>8} {slow * 1000:>10.1f}ms {fast * 1000:>8.1f}ms {slow / fast:>6.1f}x"
+            )
+
+    @staticmethod
+    def measure(function, size, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(size)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,46 @@
+"""Comando para compactar o razão de estoque em Product.stock."""
+
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from core.ledger import compact_stock_movements
+
+
+class Command(BaseCommand):
+    """Soma os movimentos de estoque pendentes no snapshot dos produtos."""
+
+    help = (
+        "Soma os movimentos pendentes do razão de estoque (StockMovement) em "
+        "Product.stock e os marca como aplicados, em lotes (uma transação por "
+        "lote). Com --interval, repete periodicamente (forma recomendada de "
+        "manter o snapshot em dia; a tarefa em processo de STOCK_COMPACTION_INTERVAL é opcional)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Movimentos aplicados por lote/transação.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Segundos entre compactações (padrão: compacta uma vez e sai).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or (options["interval"] is not None and options["interval"] <= 0):
+            raise CommandError("--batch-size e --interval devem ser maiores que zero.")
+
+        while True:
+            started = time.perf_counter()
+            applied, updated = compact_stock_movements(batch_size=options["batch_size"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{applied} movimentos compactados em {updated} produtos ({elapsed * 1000:.0f} ms)."
+            ))
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
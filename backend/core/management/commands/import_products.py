@@ -0,0 +1,87 @@
+"""Comando para importar produtos em lote a partir de CSV ou NDJSON."""
+
+import sys
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from core.importers import FORMATS, ProductImporter, detect_format, iter_text_lines, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    """Importa (upsert por código) produtos de um arquivo CSV ou NDJSON."""
+
+    help = (
+        "Importa produtos em lote de um arquivo CSV (com cabeçalho) ou NDJSON, "
+        "fazendo upsert pelo código. Use '-' para ler da entrada padrão."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Caminho do arquivo (ou '-' para stdin).",
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FORMATS,
+            help="Formato do arquivo (padrão: detectado pela extensão).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Quantidade de linhas por lote/transação.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas valida, sem gravar no banco.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=50,
+            help="Quantidade máxima de erros exibidos.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or detect_format(name=path)
+        if file_format is None:
+            raise CommandError("Não foi possível detectar o formato; use --format csv|ndjson.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        reader = read_csv if file_format == "csv" else read_ndjson
+        importer = ProductImporter(
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            max_errors=options["max_errors"],
+        )
+
+        started = time.perf_counter()
+        if path == "-":
+            report = importer.run(reader(iter_text_lines(sys.stdin.buffer)))
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    report = importer.run(reader(iter_text_lines(stream)))
+            except OSError as exc:
+                raise CommandError(f"Não foi possível ler '{path}': {exc}")
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors:
+            self.stdout.write(
+                self.style.WARNING(f"Linha {error['line']} ({error['code']}): {error['errors']}")
+            )
+
+        rate = report.total / elapsed if elapsed else report.total
+        prefix = "Simulação: " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{report.total} linhas em {elapsed:.2f}s ({rate:,.0f} linhas/s): "
+                f"{report.created} criados, {report.updated} atualizados, "
+                f"{report.error_count} com erro."
+            )
+        )
@@ -0,0 +1,45 @@
+"""Comando para remover tokens JWT expirados da blacklist em lotes."""
+
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from core.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    """Remove OutstandingToken/BlacklistedToken expirados sem travas longas."""
+
+    help = (
+        "Remove tokens expirados das tabelas da blacklist do simplejwt em "
+        "lotes curtos (uma transação por lote), ao contrário de "
+        "flushexpiredtokens, que apaga tudo em um único DELETE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Tokens removidos por lote/transação (limitado pelo banco).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Pausa em segundos entre lotes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["pause"] < 0:
+            raise CommandError("--batch-size deve ser maior que zero e --pause não pode ser negativo.")
+
+        started = time.perf_counter()
+        outstanding, blacklisted = prune_expired_tokens(
+            batch_size=options["batch_size"], pause=options["pause"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{outstanding} tokens expirados removidos "
+            f"({blacklisted} da blacklist) em {elapsed:.1f}s."
+        ))
@@ -1,11 +1,14 @@
 """Comando para preparar o ambiente de demonstração."""
 
+import time
 from pathlib import Path
 
 from django.contrib.auth import get_user_model
-from django.core.management import BaseCommand, call_command
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError, call_command
 
 from core.models import Product
+from core.synthetic import SyntheticCatalog, bulk_load, insert_rows, next_sequence
 
 
 class Command(BaseCommand):
@@ -13,7 +16,9 @@ class Command(BaseCommand):
 
     help = (
         "Prepara o ambiente de demonstração aplicando migrações, carregando "
-        "fixtures (se necessário) e garantindo um usuário padrão."
+        "fixtures (se necessário) e garantindo um usuário padrão. Com --products "
+        "e --users, gera também um catálogo sintético e usuários extras para "
+        "testes de carga."
     )
 
     def add_arguments(self, parser):
@@ -42,6 +47,58 @@ class Command(BaseCommand):
             action="store_true",
             help="Não carrega fixtures de produtos.",
         )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=0,
+            help="Quantidade de produtos sintéticos a gerar (além dos existentes).",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=0,
+            help="Quantidade de usuários extras (<prefixo>-00001...), com a mesma senha.",
+        )
+        parser.add_argument(
+            "--users-prefix",
+            default="demo",
+            help="Prefixo do username dos usuários extras.",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.0,
+            help="Expoente de Zipf de categorias e subcategorias (0 = uniforme).",
+        )
+        parser.add_argument(
+            "--price-sigma",
+            type=float,
+            default=0.8,
+            help="Desvio (log) dos preços em torno da mediana de cada categoria.",
+        )
+        parser.add_argument(
+            "--out-of-stock",
+            type=float,
+            default=0.08,
+            help="Fração de produtos sintéticos com estoque zerado.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=730,
+            help="Período (em dias) coberto pelas datas de criação.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Semente do gerador (catálogo reprodutível).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="Produtos por lote de inserção.",
+        )
 
     def handle(self, *args, **options):
         username = options["username"]
@@ -79,6 +136,11 @@ class Command(BaseCommand):
                         self.style.WARNING("Fixture de produtos não encontrada.")
                     )
 
+        if options["products"]:
+            self.generate_products(options)
+        if options["users"]:
+            self.generate_users(options["users"], options["users_prefix"], password)
+
         user_model = get_user_model()
         user, created = user_model.objects.get_or_create(
             username=username,
@@ -110,4 +172,51 @@ class Command(BaseCommand):
                 )
             )
 
+    def generate_products(self, options):
+        total = options["products"]
+        if total < 0 or options["batch_size"] < 1 or options["days"] < 1:
+            raise CommandError("--products, --batch-size e --days devem ser positivos.")
+        if options["skew"] < 0 or options["price_sigma"] < 0 or not 0 <= options["out_of_stock"] <= 1:
+            raise CommandError("Parâmetros de distribuição inválidos.")
+        try:
+            catalog = SyntheticCatalog(
+                total,
+                first=next_sequence(),
+                skew=options["skew"],
+                price_sigma=options["price_sigma"],
+                out_of_stock=options["out_of_stock"],
+                days=options["days"],
+                seed=options["seed"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Gerando {total} produtos sintéticos"))
+        started = time.perf_counter()
+        done = 0
+        with bulk_load(rows=total):
+            for rows in catalog.batches(options["batch_size"]):
+                insert_rows(rows)
+                done += len(rows)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"  {done}/{total}")
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} produtos gerados em {elapsed:.1f}s ({rate:,.0f} produtos/s).")
+        )
 
+    def generate_users(self, count, prefix, password):
+        if count < 0:
+            raise CommandError("--users deve ser positivo.")
+        user_model = get_user_model()
+        # Um único hash para todos: o hashing custa centenas de ms por senha
+        hashed = make_password(password)
+        users = [
+            user_model(username=f"{prefix}-{index:05d}", email=f"{prefix}-{index:05d}@volus.dev", password=hashed)
+            for index in range(1, count + 1)
+        ]
+        user_model.objects.bulk_create(users, batch_size=1000, ignore_conflicts=True)
+        self.stdout.write(
+            self.style.SUCCESS(f"Usuários extras: {prefix}-00001 a {prefix}-{count:05d} (senha informada).")
+        )
@@ -0,0 +1,64 @@
+"""Comando para atualizar a réplica SQLite local a partir do banco principal."""
+
+import sqlite3
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import REPLICA_ALIAS, replica_enabled
+
+
+class Command(BaseCommand):
+    """Copia o SQLite principal para o arquivo da réplica (uma vez ou em laço)."""
+
+    help = (
+        "Atualiza a réplica de leitura local (DATABASE_REPLICA em SQLite) com uma "
+        "cópia consistente do banco principal, via API de backup do SQLite. Com "
+        "--interval, repete a cópia periodicamente, simulando o atraso de uma "
+        "replicação real."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Segundos entre cópias (padrão: copia uma vez e sai).",
+        )
+
+    def handle(self, *args, **options):
+        if not replica_enabled():
+            raise CommandError("DATABASE_REPLICA não está configurado.")
+        primary = connections.settings[DEFAULT_DB_ALIAS]
+        replica = connections.settings[REPLICA_ALIAS]
+        if not (primary["ENGINE"].endswith("sqlite3") and replica["ENGINE"].endswith("sqlite3")):
+            raise CommandError(
+                "sync_replica só copia SQLite; em outros bancos a réplica é mantida pela replicação do próprio banco."
+            )
+        if str(primary["NAME"]) == str(replica["NAME"]):
+            raise CommandError("A réplica aponta para o mesmo arquivo do banco principal.")
+
+        interval = options["interval"]
+        while True:
+            started = time.perf_counter()
+            self.copy(primary["NAME"], replica["NAME"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Réplica atualizada em {(time.perf_counter() - started) * 1000:.0f} ms."
+                )
+            )
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def copy(source_path, target_path):
+        source = sqlite3.connect(source_path, timeout=30)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            # Cópia de uma vez (pages=-1): leitores da réplica esperam pelo
+            # busy_timeout e passam a ver o novo conteúdo
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
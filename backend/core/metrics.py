@@ -0,0 +1,366 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (``GET /metrics``).
+
+Cada processo acumula os incrementos em memória e uma thread os grava a
+cada ``METRICS_FLUSH_INTERVAL`` segundos em um arquivo SQLite local
+(``METRICS_STORE``), compartilhado pelos workers da máquina. Por padrão o
+arquivo fica em ``BASE_DIR/var``, com nome derivado do módulo de settings e
+do banco: outro projeto, outro banco ou o banco de testes não somam nos
+mesmos contadores.
+
+Só processos que atendem requisições registram métricas: a thread começa
+na primeira requisição de um servidor WSGI/ASGI (``start_flusher``, ligado
+a ``request_started``). Comandos de gerenciamento e o ``Client`` de testes
+não gravam nada. Contadores e
+histogramas são somados no arquivo; gauges (ex.: requisições em andamento)
+são gravados por processo e somados na leitura, ignorando processos que
+pararam de atualizar. A leitura de ``/metrics`` grava antes os pendentes do
+próprio processo; os dos demais chegam com até um intervalo de atraso.
+
+Histogramas guardam a contagem de cada faixa; a exposição monta os
+``_bucket`` cumulativos.
+"""
+import atexit
+import bisect
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_definitions = {}
+
+
+class MetricsStore:
+    """
+    Arquivo SQLite com os valores agregados de todos os processos.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS metric ('
+                'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, '
+                'PRIMARY KEY (name, labels))'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS gauge ('
+                'name TEXT NOT NULL, labels TEXT NOT NULL, pid INTEGER NOT NULL, '
+                'value REAL NOT NULL, updated REAL NOT NULL, PRIMARY KEY (name, labels, pid))'
+            )
+            self._local.connection = connection
+        return connection
+
+    def write(self, increments, gauges, pid, now):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT INTO metric (name, labels, value) VALUES (?, ?, ?) '
+                'ON CONFLICT(name, labels) DO UPDATE SET value = value + excluded.value',
+                [(name, labels, value) for (name, labels), value in increments.items()],
+            )
+            connection.executemany(
+                'INSERT INTO gauge (name, labels, pid, value, updated) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(name, labels, pid) DO UPDATE SET '
+                'value = excluded.value, updated = excluded.updated',
+                [(name, labels, pid, value, now) for (name, labels), value in gauges.items()],
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+
+    def read(self, stale_before):
+        connection = self._connection()
+        connection.execute('DELETE FROM gauge WHERE updated < ?', (stale_before,))
+        values = {
+            (name, labels): value
+            for name, labels, value in connection.execute('SELECT name, labels, value FROM metric')
+        }
+        for name, labels, value in connection.execute(
+            'SELECT name, labels, SUM(value) FROM gauge GROUP BY name, labels'
+        ):
+            values[(name, labels)] = value
+        return values
+
+
+class MetricsRegistry:
+    """
+    Incrementos pendentes do processo e thread de gravação no ``MetricsStore``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._pending = {}
+        self._gauges = {}
+        self._thread = None
+        self._store = None
+
+    @property
+    def enabled(self):
+        # Só depois de ``start`` neste processo (após um fork, o filho recomeça)
+        return self._pid == os.getpid() and getattr(settings, 'METRICS_ENABLED', True)
+
+    @property
+    def interval(self):
+        return getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+
+    def get_store(self):
+        path = getattr(settings, 'METRICS_STORE', None) or default_store_path()
+        if self._store is None or self._store.path != path:
+            self._store = MetricsStore(path)
+        return self._store
+
+    def add(self, name, labels, amount):
+        with self._lock:
+            key = (name, labels)
+            self._pending[key] = self._pending.get(key, 0) + amount
+
+    def add_gauge(self, name, labels, amount):
+        with self._lock:
+            key = (name, labels)
+            self._gauges[key] = self._gauges.get(key, 0) + amount
+
+    def start(self):
+        """
+        Passa a registrar neste processo e inicia a thread de gravação
+        (uma por processo; após um fork, ex.: gunicorn --preload, o filho
+        recomeça do zero).
+        """
+        pid = os.getpid()
+        if self._pid == pid or not getattr(settings, 'METRICS_ENABLED', True):
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pending = {}
+            self._gauges = {}
+            self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except (sqlite3.Error, OSError):
+                logger.exception('Falha ao gravar métricas.')
+
+    def flush(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            pending, self._pending = self._pending, {}
+            gauges = dict(self._gauges)
+        if not pending and not gauges:
+            return
+        try:
+            self.get_store().write(pending, gauges, self._pid, time.time())
+        except BaseException:
+            # Devolve os incrementos para a próxima tentativa
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + value
+            raise
+
+    def collect(self):
+        """
+        Valores agregados de todos os processos (grava antes os deste).
+        """
+        self.flush()
+        return self.get_store().read(stale_before=time.time() - max(5.0, 5 * self.interval))
+
+
+def default_store_path():
+    """
+    ``BASE_DIR/var/metrics-<hash>.sqlite3``, com o hash do módulo de
+    settings e do banco padrão (o de testes tem outro nome).
+    """
+    database = connections[DEFAULT_DB_ALIAS].settings_dict
+    key = '|'.join(str(part) for part in (
+        getattr(settings, 'SETTINGS_MODULE', None),
+        database['ENGINE'], database.get('HOST'), database.get('PORT'), database['NAME'],
+    ))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(settings.BASE_DIR, 'var', f'metrics-{digest}.sqlite3')
+
+
+def start_flusher(sender, **kwargs):
+    """
+    Conectada a ``request_started``: inicia o registro só sob um servidor
+    WSGI/ASGI (inclui o ``runserver``), não no ``Client`` de testes usado
+    pelos comandos de benchmark.
+    """
+    if isinstance(sender, type) and issubclass(sender, (WSGIHandler, ASGIHandler)):
+        registry.start()
+
+
+registry = MetricsRegistry()
+atexit.register(lambda: registry.flush() if registry.enabled else None)
+
+
+def _labels(labelnames, values):
+    return json.dumps([[name, str(values[name])] for name in labelnames], ensure_ascii=False)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _definitions[name] = self
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if registry.enabled:
+            registry.add(self.name, _labels(self.labelnames, labels), amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        if registry.enabled:
+            registry.add_gauge(self.name, _labels(self.labelnames, labels), amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        bound = self.buckets[index] if index < len(self.buckets) else '+Inf'
+        base = [[name, str(labels[name])] for name in self.labelnames]
+        registry.add(
+            f'{self.name}_bucket', json.dumps(base + [['le', str(bound)]], ensure_ascii=False), 1
+        )
+        labels_json = json.dumps(base, ensure_ascii=False)
+        registry.add(f'{self.name}_sum', labels_json, value)
+        registry.add(f'{self.name}_count', labels_json, 1)
+
+
+# Métricas da aplicação -------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'Requisições HTTP atendidas.', ('route', 'method', 'status'),
+)
+HTTP_DURATION = Histogram(
+    'http_request_duration_seconds', 'Duração das requisições HTTP.', ('route', 'method'),
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Tamanho do corpo das respostas HTTP.', ('route',),
+    buckets=SIZE_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requisições HTTP em andamento (todos os processos).',
+)
+DB_QUERIES = Counter(
+    'db_queries_total', 'Consultas SQL executadas durante as requisições.', ('route',),
+)
+DB_SECONDS = Counter(
+    'db_query_seconds_total', 'Tempo gasto em consultas SQL durante as requisições.', ('route',),
+)
+CACHE_HITS = Counter('cache_hits_total', 'Leituras atendidas por cache.', ('cache',))
+CACHE_MISSES = Counter('cache_misses_total', 'Leituras que não encontraram o cache.', ('cache',))
+PASSWORD_HASH_DURATION = Histogram(
+    'password_hash_duration_seconds', 'Duração do hashing de senhas (login, registro, troca).',
+)
+AUTH_REJECTIONS = Counter(
+    'auth_rejections_total', 'Requisições de autenticação recusadas antes do hashing.', ('reason',),
+)
+
+
+def cache_result(cache, hit):
+    (CACHE_HITS if hit else CACHE_MISSES).inc(cache=cache)
+
+
+# Exposição -------------------------------------------------------------
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_metrics():
+    """
+    Texto no formato de exposição do Prometheus (versão 0.0.4).
+    """
+    values = registry.collect()
+    by_name = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((json.loads(labels), value))
+
+    lines = []
+    for name, metric in _definitions.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        if metric.kind != 'histogram':
+            for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+
+        counts = {}
+        for labels, value in by_name.get(f'{name}_bucket', []):
+            le = labels.pop()[1]
+            counts.setdefault(json.dumps(labels), {})[le] = value
+        sums = {json.dumps(labels): value for labels, value in by_name.get(f'{name}_sum', [])}
+        totals = {json.dumps(labels): value for labels, value in by_name.get(f'{name}_count', [])}
+        for key in sorted(totals):
+            labels = json.loads(key)
+            cumulative = 0
+            for bound in [*metric.buckets, '+Inf']:
+                cumulative += counts.get(key, {}).get(str(bound), 0)
+                lines.append(
+                    f'{name}_bucket{_format_labels(labels + [["le", str(bound)]])} {_format_value(cumulative)}'
+                )
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(sums.get(key, 0))}')
+            lines.append(f'{name}_count{_format_labels(labels)} {_format_value(totals[key])}')
+    return '\n'.join(lines) + '\n'
@@ -1,25 +1,48 @@
 """
-Middleware personalizado para tratamento de exceções.
+Middleware personalizado para tratamento de exceções, perfil por requisição,
+métricas e roteamento de leituras para a réplica.
 """
+import cProfile
+import json
 import logging
+import os
+import random
+import re
+import tempfile
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.shortcuts import render
 from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .profiling import current_profile, start_profile, stop_profile
+from .routers import (
+    SAFE_METHODS,
+    client_keys,
+    current_routing,
+    is_pinned,
+    pin_to_primary,
+    replica_enabled,
+    start_routing,
+    stop_routing,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class ExceptionHandlerMiddleware:
+class ExceptionHandlerMiddleware(MiddlewareMixin):
     """
     Middleware para capturar exceções não tratadas e exibir página amigável.
+
+    Baseado em MiddlewareMixin para funcionar também em modo assíncrono
+    (ASGI), sem forçar cada requisição a passar por uma thread.
     """
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
-    def __call__(self, request):
-        response = self.get_response(request)
-        return response
-    
     def process_exception(self, request, exception):
         """
         Captura exceções e renderiza página de erro amigável.
@@ -39,3 +62,269 @@ class ExceptionHandlerMiddleware:
         
         # Em desenvolvimento, deixar Django mostrar o erro detalhado
         return None
+
+
+class ProfilingMiddleware:
+    """
+    Mede cada requisição: tempo total, consultas SQL (quantidade e tempo)
+    e serialização (ver ``core.profiling``).
+
+    - ``Server-Timing`` na resposta (``SERVER_TIMING_HEADER``), só para os
+      IPs de ``SERVER_TIMING_ALLOWED_IPS`` e usuários staff: o cabeçalho
+      revela tempo de banco e número de consultas;
+    - log estruturado (JSON, logger ``core.profiling``) com as consultas mais
+      lentas quando ``SLOW_REQUEST_MS`` ou ``SLOW_REQUEST_QUERIES`` é atingido;
+    - cProfile por amostragem (``REQUEST_PROFILE_SAMPLE_RATE``), gravado em
+      ``REQUEST_PROFILE_DIR``. Só no modo síncrono: em um loop assíncrono o
+      perfil misturaria requisições concorrentes.
+
+    Em respostas com streaming, o total cobre até a view devolver a resposta.
+    """
+    sync_capable = True
+    async_capable = True
+    logger = logging.getLogger('core.profiling')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        else:
+            # Gancho síncrono: no modo assíncrono forçaria uma ida a thread
+            self.process_template_response = self.time_rendering
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'REQUEST_PROFILING', settings.DEBUG)
+
+    @staticmethod
+    def shows_server_timing(request):
+        if not getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG):
+            return False
+        allowed = getattr(settings, 'SERVER_TIMING_ALLOWED_IPS', None)
+        if allowed is None or request.META.get('REMOTE_ADDR') in allowed:
+            return True
+        # Usuário autenticado pela view (o DRF o repassa à HttpRequest)
+        return getattr(getattr(request, 'user', None), 'is_staff', False)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile, token = start_profile(getattr(settings, 'SLOW_REQUEST_TOP_QUERIES', 5))
+        profiler = self.sampled_profiler()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            stop_profile(token)
+        return self.finish(request, response, profile, profiler)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        profile, token = start_profile(getattr(settings, 'SLOW_REQUEST_TOP_QUERIES', 5))
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profile(token)
+        return self.finish(request, response, profile, None)
+
+    def time_rendering(self, request, response):
+        """
+        A renderização (JSON do DRF) acontece depois deste gancho; o tempo
+        até o fim dela entra em ``serialize``.
+        """
+        profile = current_profile()
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.add_timing('serialize', time.perf_counter() - started)
+            response.add_post_render_callback(rendered)
+        return response
+
+    def sampled_profiler(self):
+        rate = getattr(settings, 'REQUEST_PROFILE_SAMPLE_RATE', 0.0)
+        if rate and random.random() < rate:
+            return cProfile.Profile()
+        return None
+
+    def finish(self, request, response, profile, profiler):
+        total = profile.elapsed()
+        if self.shows_server_timing(request):
+            response['Server-Timing'] = profile.server_timing(total)
+
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        slow_queries = getattr(settings, 'SLOW_REQUEST_QUERIES', 50)
+        if (slow_ms is not None and total * 1000 >= slow_ms) or (
+            slow_queries is not None and profile.query_count >= slow_queries
+        ):
+            self.logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 1),
+                'db_ms': round(profile.db_seconds * 1000, 1),
+                'queries': profile.query_count,
+                'timings_ms': {
+                    name: round(seconds * 1000, 1) for name, seconds in profile.timings.items()
+                },
+                'slowest_queries': profile.slowest_queries(),
+            }, ensure_ascii=False))
+
+        if profiler is not None:
+            self.dump_profile(request, profiler, total)
+        return response
+
+    def dump_profile(self, request, profiler, total):
+        directory = getattr(settings, 'REQUEST_PROFILE_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'volus-profiles'
+        )
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        name = (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}-'
+            f'{request.method}-{slug}-{total * 1000:.0f}ms.prof'
+        )
+        profiler.dump_stats(os.path.join(directory, name))
+
+
+class MetricsMiddleware:
+    """
+    Registra contagem, latência e tamanho das respostas por rota, consultas
+    SQL e requisições em andamento (ver ``core.metrics``).
+
+    A rota é o nome da URL resolvida (ex.: ``api_login``, ``product-list``);
+    requisições sem rota entram como ``unmatched``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not metrics.registry.enabled:
+            return self.get_response(request)
+
+        profile, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(token)
+        self.record(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics.registry.enabled:
+            return await self.get_response(request)
+
+        profile, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(token)
+        self.record(request, response, profile)
+        return response
+
+    def start(self):
+        metrics.HTTP_IN_FLIGHT.inc()
+        # Reaproveita o perfil do ProfilingMiddleware (contagem de consultas)
+        profile = current_profile()
+        if profile is not None:
+            return profile, None
+        return start_profile(top_queries=0)
+
+    def stop(self, token):
+        metrics.HTTP_IN_FLIGHT.dec()
+        if token is not None:
+            stop_profile(token)
+
+    @staticmethod
+    def record(request, response, profile):
+        match = getattr(request, 'resolver_match', None)
+        route = (match.url_name or match.route) if match else 'unmatched'
+        metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        metrics.HTTP_DURATION.observe(profile.elapsed(), route=route, method=request.method)
+        if not response.streaming:
+            metrics.HTTP_RESPONSE_SIZE.observe(len(response.content), route=route)
+        metrics.DB_QUERIES.inc(profile.query_count, route=route)
+        metrics.DB_SECONDS.inc(profile.db_seconds, route=route)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envia as leituras seguras das views de ``REPLICA_READ_VIEWS`` para a
+    réplica e mantém no primário quem gravou há pouco (ver ``core.routers``).
+    Sem ``DATABASE_REPLICA`` configurado, não faz nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Gancho assíncrono: um process_view síncrono forçaria uma ida a thread
+            self.process_view = self.aprocess_view
+
+    @cached_property
+    def read_views(self):
+        return tuple(import_string(path) for path in getattr(settings, 'REPLICA_READ_VIEWS', ()))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not replica_enabled():
+            return self.get_response(request)
+
+        routing, token = start_routing(client_keys(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_routing(token)
+        if routing.wrote:
+            pin_to_primary(routing.clients)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_enabled():
+            return await self.get_response(request)
+
+        routing, token = start_routing(client_keys(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_routing(token)
+        if routing.wrote:
+            pin_to_primary(routing.clients)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.route(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.route(request, view_func)
+
+    def route(self, request, view_func):
+        routing = current_routing()
+        if routing is None or request.method not in SAFE_METHODS:
+            return
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None or not issubclass(view_class, self.read_views):
+            return
+        routing.use_replica = not is_pinned(routing.clients)
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.13 on 2026-10-17 21:20
+#
+# Observação: no SQLite, migrações que reconstroem core_product (_remake_table)
+# descartam os triggers abaixo; recrie-os na mesma migração se isso ocorrer.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_product_fts USING fts5(
+        name, code,
+        content='core_product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_product_fts_ai AFTER INSERT ON core_product BEGIN
+        INSERT INTO core_product_fts(rowid, name, code) VALUES (new.id, new.name, new.code);
+    END
+    """,
+    """
+    CREATE TRIGGER core_product_fts_ad AFTER DELETE ON core_product BEGIN
+        INSERT INTO core_product_fts(core_product_fts, rowid, name, code)
+        VALUES ('delete', old.id, old.name, old.code);
+    END
+    """,
+    """
+    CREATE TRIGGER core_product_fts_au AFTER UPDATE OF name, code ON core_product BEGIN
+        INSERT INTO core_product_fts(core_product_fts, rowid, name, code)
+        VALUES ('delete', old.id, old.name, old.code);
+        INSERT INTO core_product_fts(rowid, name, code) VALUES (new.id, new.name, new.code);
+    END
+    """,
+    "INSERT INTO core_product_fts(core_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_product_fts_au",
+    "DROP TRIGGER IF EXISTS core_product_fts_ad",
+    "DROP TRIGGER IF EXISTS core_product_fts_ai",
+    "DROP TABLE IF EXISTS core_product_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX core_product_search_idx ON core_product USING GIN (
+        to_tsvector('simple', coalesce("name", '') || ' ' || coalesce("code", ''))
+    )
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_product_search_idx",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_product_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.13 on 2026-10-17 23:05
+#
+# Índice em token_blacklist_outstandingtoken.expires_at para a limpeza em
+# lotes de core.blacklist.prune_expired_tokens. O modelo pertence ao app
+# token_blacklist (simplejwt), que não declara o índice: ele é criado pelo
+# schema editor sobre o modelo histórico desse app (nome da tabela e aspas
+# vêm do modelo, não de SQL fixo) e removido na reversão.
+
+from django.db import migrations, models
+
+INDEX = models.Index(fields=['expires_at'], name='core_outstandingtoken_expires_idx')
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('token_blacklist', 'OutstandingToken'), INDEX)
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('token_blacklist', 'OutstandingToken'), INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_product_updated_index'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.13 on 2026-10-17 21:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_outstanding_token_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'stock', 'id'], name='product_cat_stock_idx'),
+        ),
+    ]
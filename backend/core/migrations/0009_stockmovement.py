@@ -0,0 +1,35 @@
+# Generated by Django 4.2.13 on 2026-10-17 21:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_product_category_stock_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField(verbose_name='Variação')),
+                ('reason', models.CharField(choices=[('sale', 'Venda'), ('purchase', 'Compra'), ('return', 'Devolução'), ('loss', 'Perda'), ('adjustment', 'Ajuste'), ('correction', 'Correção (valor absoluto)')], default='adjustment', max_length=20, verbose_name='Motivo')),
+                ('note', models.CharField(blank=True, max_length=200, verbose_name='Observação')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('applied_at', models.DateTimeField(blank=True, null=True, verbose_name='Aplicado em')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='core.product')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Movimento de estoque',
+                'verbose_name_plural': 'Movimentos de estoque',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['product', 'delta'], name='stockmove_pending_product_idx'), models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['id'], name='stockmove_pending_id_idx')],
+            },
+        ),
+    ]
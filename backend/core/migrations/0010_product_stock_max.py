@@ -0,0 +1,19 @@
+# Generated by Django 4.2.13 on 2026-10-17 22:14
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_stockmovement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='stock',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MaxValueValidator(2147483647)], verbose_name='Estoque'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.13 on 2026-10-17 22:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_stockmovement_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchEntry',
+            fields=[
+                ('product', models.OneToOneField(db_column='code', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.product', to_field='code')),
+            ],
+            options={
+                'db_table': 'core_product_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,8 +1,16 @@
 """
 Models do sistema - Produtos com validações personalizadas.
 """
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.db.backends.base.operations import BaseDatabaseOperations
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
+
+# Faixa de IntegerField aceita por todos os bancos suportados: o PostgreSQL usa
+# 32 bits e o SQLite (64 bits) não limita o campo sozinho
+INTEGER_MIN, INTEGER_MAX = BaseDatabaseOperations.integer_field_ranges['IntegerField']
 
 
 class Product(models.Model):
@@ -22,12 +30,14 @@ class Product(models.Model):
     ]
     
     name = models.CharField('Nome', max_length=200)
-    code = models.CharField('Código', max_length=10, unique=True, 
-                           help_text='Formato: ABC-123 (checksum: soma dígitos % 3 == 0)')
+    code = models.CharField(
+        'Código', max_length=10, unique=True,
+        help_text='Formato: ABC-123 (checksum: soma dígitos % 3 == 0)'
+    )
     price = models.DecimalField('Preço', max_digits=10, decimal_places=2)
     category = models.CharField('Categoria', max_length=100, choices=CATEGORIES)
     subcategory = models.CharField('Subcategoria', max_length=100, blank=True)
-    stock = models.IntegerField('Estoque', default=0)
+    stock = models.IntegerField('Estoque', default=0, validators=[MaxValueValidator(INTEGER_MAX)])
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     updated_at = models.DateTimeField('Atualizado em', auto_now=True)
     
@@ -35,6 +45,22 @@ class Product(models.Model):
         verbose_name = 'Produto'
         verbose_name_plural = 'Produtos'
         ordering = ['-created_at']
+        indexes = [
+            # Ordenação/paginação keyset por (campo, id) - ver core.pagination
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            models.Index(fields=['stock', 'id'], name='product_stock_id_idx'),
+            # Filtros da listagem com ordenação padrão (-created_at)
+            models.Index(fields=['category', 'created_at'], name='product_cat_created_idx'),
+            models.Index(fields=['subcategory', 'created_at'], name='product_subcat_created_idx'),
+            # Faixas de estoque por categoria (contagens e lista por estoque)
+            models.Index(fields=['category', 'stock', 'id'], name='product_cat_stock_idx'),
+            # Árvore de categorias (filtro cascata) - índice de cobertura
+            models.Index(fields=['category', 'subcategory', 'name'], name='product_cat_subcat_name_idx'),
+            # ETag das coleções (COUNT + MAX(updated_at)) - ver core.conditional
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -68,7 +94,124 @@ class Product(models.Model):
         digits = [int(c) for c in self.code if c.isdigit()]
         if digits and sum(digits) % 3 != 0:
             raise ValidationError({
-                'code': f'Código inválido (checksum incorreto). '
-                       f'A soma dos dígitos deve ser divisível por 3. '
-                       f'Soma atual: {sum(digits)}'
+                'code': (
+                    f'Código inválido (checksum incorreto). '
+                    f'A soma dos dígitos deve ser divisível por 3. '
+                    f'Soma atual: {sum(digits)}'
+                )
+            })
+
+
+class StockSettings(models.Model):
+    """
+    Faixas de estoque (baixo/médio/alto) configuradas por usuário.
+
+    Só os limites superiores de baixo e médio são editáveis; os mínimos são
+    derivados no ``save()`` para que as faixas sejam contíguas.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_settings'
+    )
+    low_stock_min = models.PositiveIntegerField(default=0, editable=False)
+    low_stock_max = models.PositiveIntegerField(default=10)
+    medium_stock_min = models.PositiveIntegerField(default=11, editable=False)
+    medium_stock_max = models.PositiveIntegerField(default=50)
+    high_stock_min = models.PositiveIntegerField(default=51, editable=False)
+    high_stock_max = models.PositiveIntegerField(default=999999, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Faixas de estoque de {self.user_id}"
+
+    def clean(self):
+        super().clean()
+        if self.medium_stock_max <= self.low_stock_max:
+            raise ValidationError({
+                'medium_stock_max': 'O limite do estoque médio deve ser maior que o do estoque baixo.'
             })
+
+    def save(self, *args, **kwargs):
+        self.low_stock_min = 0
+        self.medium_stock_min = self.low_stock_max + 1
+        self.high_stock_min = self.medium_stock_max + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'medium_stock_min', 'high_stock_min'}
+        super().save(*args, **kwargs)
+
+
+class StockMovement(models.Model):
+    """
+    Movimento do razão de estoque (somente inclusão).
+
+    Escritores incluem movimentos sem tocar na linha do produto; a
+    compactação (``core.ledger``) soma os pendentes em ``Product.stock`` e
+    marca ``applied_at``. O estoque atual é ``Product.stock`` + movimentos
+    pendentes.
+    """
+
+    REASONS = [
+        ('sale', 'Venda'),
+        ('purchase', 'Compra'),
+        ('return', 'Devolução'),
+        ('loss', 'Perda'),
+        ('adjustment', 'Ajuste'),
+        ('correction', 'Correção (valor absoluto)'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='movements')
+    delta = models.IntegerField('Variação')
+    reason = models.CharField('Motivo', max_length=20, choices=REASONS, default='adjustment')
+    note = models.CharField('Observação', max_length=200, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='stock_movements'
+    )
+    # Sem auto_now_add: correções (core.ledger.supersede_pending) gravam o
+    # mesmo instante em created_at e applied_at
+    created_at = models.DateTimeField('Criado em', default=timezone.now, editable=False)
+    applied_at = models.DateTimeField('Aplicado em', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Movimento de estoque'
+        verbose_name_plural = 'Movimentos de estoque'
+        ordering = ['-id']
+        indexes = [
+            # Pendentes por produto (leitura do estoque atual) e em ordem (compactação);
+            # parciais: ficam pequenos mesmo com o histórico crescendo
+            models.Index(
+                fields=['product', 'delta'], name='stockmove_pending_product_idx',
+                condition=models.Q(applied_at__isnull=True),
+            ),
+            models.Index(
+                fields=['id'], name='stockmove_pending_id_idx',
+                condition=models.Q(applied_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.delta:+d} ({self.reason})"
+
+
+class ProductSearchEntry(models.Model):
+    """
+    Linha da tabela FTS5 ``core_product_fts`` (migração 0005, só SQLite).
+
+    Somente leitura (a tabela é mantida por triggers); permite que a busca
+    (``core.search.SQLiteFTSBackend``) junte produto e índice pelo ORM, com
+    MATCH e bm25() na mesma consulta. A junção usa ``code`` (único) e não o
+    rowid: o FTS5 não filtra por ``code``, então o SQLite sempre roda o
+    MATCH uma vez e busca cada produto pelo índice de código, em vez de
+    percorrer os produtos e repetir o MATCH por linha.
+    """
+
+    product = models.OneToOneField(
+        Product, on_delete=models.DO_NOTHING, primary_key=True, to_field='code', db_column='code',
+        db_constraint=False, related_name='search_entry'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'core_product_fts'
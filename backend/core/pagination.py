@@ -0,0 +1,259 @@
+"""
+Paginação da API de produtos.
+
+Modos suportados (todos respeitam ``page_size``, limitado a ``max_page_size``):
+
+- padrão: ``?page=N`` com ``count`` exato (compatível com PageNumberPagination);
+- sem contagem: ``?count=false`` evita o ``COUNT(*)`` e descobre se há próxima
+  página buscando um registro extra;
+- cursor (keyset): ``?pagination=cursor`` (ou ``?cursor=...``) navega por
+  ``(campo de ordenação, id)``, sem ``OFFSET``. Páginas profundas custam o
+  mesmo que a primeira, desde que exista índice em ``(campo, id)``. Ordens
+  calculadas (ex.: relevância da busca ``q``) não têm cursor: exigem
+  ``?ordering=`` com um dos campos ordenáveis.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ProductPagination(PageNumberPagination):
+    """
+    Paginação de produtos com page_size configurável, modo sem contagem
+    e modo cursor (keyset).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    count_query_param = 'count'
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+    cursor_ordering_message = (
+        'A paginação por cursor não segue a ordem por relevância da busca; '
+        'informe ?ordering= com um entre: {fields}.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = self.get_mode(request)
+
+        if self.mode == 'cursor':
+            return self.paginate_cursor(queryset, request, view)
+        if self.mode == 'nocount':
+            return self.paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versão assíncrona de ``paginate_queryset`` (mesmos modos e links),
+        com ``acount()`` e iteração assíncrona no lugar das leituras síncronas.
+        """
+        self.request = request
+        self.mode = self.get_mode(request)
+
+        if self.mode == 'cursor':
+            window, state = self.cursor_window(queryset, request, view)
+            return self.cursor_page([row async for row in window], request, **state)
+        if self.mode == 'nocount':
+            window, state = self.nocount_window(queryset, request)
+            return self.nocount_page([row async for row in window], request, **state)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Contagem assíncrona antecipada (Paginator.count é cached_property)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc),
+            ))
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.mode in ('cursor', 'nocount'):
+            return Response(OrderedDict([
+                ('next', self.next_link),
+                ('previous', self.previous_link),
+                ('results', data),
+            ]))
+        return super().get_paginated_response(data)
+
+    def get_mode(self, request):
+        params = request.query_params
+        if params.get(self.mode_query_param) == 'cursor' or self.cursor_query_param in params:
+            return 'cursor'
+        if params.get(self.count_query_param, '').lower() in ('false', '0', 'no'):
+            return 'nocount'
+        return 'page'
+
+    # Modo sem contagem ----------------------------------------------------
+
+    def paginate_without_count(self, queryset, request):
+        window, state = self.nocount_window(queryset, request)
+        return self.nocount_page(list(window), request, **state)
+
+    def nocount_window(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        if page_number < 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param),
+                message='Página inválida.',
+            ))
+
+        offset = (page_number - 1) * page_size
+        window = queryset[offset:offset + page_size + 1]
+        return window, {'page_number': page_number, 'page_size': page_size}
+
+    def nocount_page(self, rows, request, page_number, page_size):
+        url = request.build_absolute_uri()
+
+        self.next_link = None
+        if len(rows) > page_size:
+            self.next_link = replace_query_param(url, self.page_query_param, page_number + 1)
+        self.previous_link = None
+        if page_number > 1:
+            self.previous_link = (
+                remove_query_param(url, self.page_query_param) if page_number == 2
+                else replace_query_param(url, self.page_query_param, page_number - 1)
+            )
+        return rows[:page_size]
+
+    # Modo cursor (keyset) -------------------------------------------------
+
+    def paginate_cursor(self, queryset, request, view):
+        window, state = self.cursor_window(queryset, request, view)
+        return self.cursor_page(list(window), request, **state)
+
+    def cursor_window(self, queryset, request, view):
+        page_size = self.get_page_size(request)
+        field_name, descending = self.get_cursor_ordering(queryset, view)
+        if field_name in queryset.query.annotations:
+            model_field = queryset.query.annotations[field_name].output_field
+        else:
+            model_field = queryset.model._meta.get_field(field_name)
+
+        cursor = self.decode_cursor(request, model_field)
+        backwards = bool(cursor and cursor['reverse'])
+        # Ao voltar uma página, percorre o índice no sentido oposto
+        scan_descending = descending != backwards
+
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{field_name}', f'{prefix}id')
+        if cursor:
+            queryset = queryset.filter(
+                self.keyset_filter(field_name, cursor['value'], cursor['id'], scan_descending)
+            )
+
+        window = queryset[:page_size + 1]
+        return window, {
+            'page_size': page_size,
+            'field_name': field_name,
+            'cursor': cursor,
+            'backwards': backwards,
+        }
+
+    def cursor_page(self, rows, request, page_size, field_name, cursor, backwards):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        url = request.build_absolute_uri()
+        self.next_link = None
+        self.previous_link = None
+        if rows:
+            first, last = rows[0], rows[-1]
+            if has_more or backwards:
+                self.next_link = self.encode_cursor(url, last, field_name, reverse=False)
+            if cursor and (has_more or not backwards):
+                self.previous_link = self.encode_cursor(url, first, field_name, reverse=True)
+        return rows
+
+    def get_cursor_ordering(self, queryset, view):
+        """
+        Campo-chave do cursor: primeiro termo da ordenação aplicada (ex.:
+        pelo OrderingFilter), desde que esteja em ``view.ordering_fields``.
+        Anotações só valem se listadas em ``view.cursor_annotations`` (ex.:
+        estoque atual); as demais (``search_rank``) são recusadas com 400.
+        """
+        allowed = getattr(view, 'ordering_fields', None) or []
+        ordering = list(queryset.query.order_by) or list(getattr(view, 'ordering', None) or [])
+        ordering = ordering or list(queryset.model._meta.ordering)
+        for term in ordering[:1]:
+            if isinstance(term, str):
+                field_name = term.lstrip('-')
+                if field_name in getattr(view, 'cursor_annotations', ()):
+                    return field_name, term.startswith('-')
+                if field_name in queryset.query.annotations:
+                    raise exceptions.ValidationError({
+                        'ordering': self.cursor_ordering_message.format(fields=', '.join(allowed)),
+                    })
+                if field_name in allowed or field_name == 'id':
+                    return field_name, term.startswith('-')
+        return 'id', True
+
+    @staticmethod
+    def keyset_filter(field_name, value, pk, descending):
+        """
+        Predicado ``(campo, id) > (valor, pk)`` (ou ``<`` em ordem
+        decrescente) escrito de forma que o banco use o índice no campo.
+        """
+        if field_name == 'id':
+            return Q(id__lt=pk) if descending else Q(id__gt=pk)
+        op, tie_op = ('lte', 'lt') if descending else ('gte', 'gt')
+        return Q(**{f'{field_name}__{op}': value}) & (
+            Q(**{f'{field_name}__{tie_op}': value}) | Q(**{f'id__{tie_op}': pk})
+        )
+
+    def encode_cursor(self, url, instance, field_name, reverse):
+        # Aceita instâncias do modelo ou linhas de values() (ver core.projections)
+        if isinstance(instance, dict):
+            value, pk = instance[field_name], instance['id']
+        else:
+            value, pk = getattr(instance, field_name), instance.pk
+        payload = {
+            'v': value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            'id': pk,
+            'r': reverse,
+        }
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        url = remove_query_param(url, self.page_query_param)
+        url = replace_query_param(url, self.mode_query_param, 'cursor')
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model_field):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            return {
+                'value': model_field.to_python(payload['v']),
+                'id': int(payload['id']),
+                'reverse': bool(payload.get('r', False)),
+            }
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,57 @@
+"""
+Parsers adicionais da API REST.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+# Números com 19+ dígitos podem passar de 64 bits: o orjson os leria como float.
+# Trocar todo dígito por '0' e procurar 19 zeros seguidos é bem mais rápido que regex.
+ZERO_DIGITS = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 19
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` com orjson, quando instalado, e o mesmo resultado.
+
+    Recaem no ``JSONParser`` (biblioteca padrão): corpos em outra codificação
+    que não UTF-8, com números longos (inteiros acima de 64 bits continuam
+    ``int``) e corpos que o orjson recusa, inclusive os inválidos, que
+    respondem com a mesma mensagem de erro de sempre.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER not in body.translate(ZERO_DIGITS):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class StreamParser(BaseParser):
+    """
+    Não interpreta o corpo: devolve o stream da requisição para que a view
+    o consuma linha a linha (importação em lote sem carregar tudo em memória).
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+
+class CSVStreamParser(StreamParser):
+    media_type = 'text/csv'
+
+
+class NDJSONStreamParser(StreamParser):
+    media_type = 'application/x-ndjson'
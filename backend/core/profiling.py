@@ -0,0 +1,128 @@
+"""
+Perfil por requisição: tempo total, consultas SQL e serialização.
+
+``ProfilingMiddleware`` (``core.middleware``) abre um ``RequestProfile`` em
+uma ``ContextVar`` durante a requisição. As consultas são medidas por um
+``execute_wrapper`` instalado em cada conexão ao abri-la (sinal
+``connection_created``, ver ``core.signals``); como a ``ContextVar`` é
+copiada para as threads de ``sync_to_async``, as consultas do ORM
+assíncrono também entram no perfil da requisição certa.
+
+Trechos da própria aplicação são medidos com ``timing(nome)``; a
+serialização (montagem da representação + renderização) usa o nome
+``serialize``.
+"""
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_sequence = itertools.count()
+
+
+class RequestProfile:
+    """
+    Métricas acumuladas de uma requisição.
+    """
+
+    def __init__(self, top_queries=5):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.timings = {}
+        self.top_queries = top_queries
+        self._slowest = []  # heap mínimo de (duração, seq, sql)
+
+    def observe_query(self, sql, seconds):
+        self.query_count += 1
+        self.db_seconds += seconds
+        if not self.top_queries:
+            return
+        entry = (seconds, next(_sequence), sql)
+        if len(self._slowest) < self.top_queries:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def add_timing(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def slowest_queries(self):
+        """
+        Consultas mais lentas, da mais lenta para a mais rápida.
+        """
+        return [
+            {'ms': round(seconds * 1000, 2), 'sql': sql}
+            for seconds, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def server_timing(self, total):
+        """
+        Valor do cabeçalho ``Server-Timing`` (durações em milissegundos).
+        """
+        app = total - self.db_seconds - sum(self.timings.values())
+        metrics = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.query_count} queries"',
+        ]
+        metrics.extend(
+            f'{name};dur={seconds * 1000:.1f}' for name, seconds in sorted(self.timings.items())
+        )
+        metrics.append(f'app;dur={max(app, 0.0) * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+def start_profile(top_queries=5):
+    """
+    Ativa um perfil no contexto atual; retorna ``(perfil, token)``.
+    """
+    profile = RequestProfile(top_queries)
+    return profile, _current.set(profile)
+
+
+def stop_profile(token):
+    _current.reset(token)
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def timing(name):
+    """
+    Soma a duração do bloco em ``name`` no perfil da requisição (se houver).
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_timing(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` que mede cada consulta no perfil da requisição.
+    """
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.observe_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
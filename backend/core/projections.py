@@ -0,0 +1,190 @@
+"""
+Caminho de leitura rápido para serializers de modelo.
+
+``ValuesRepresentation`` busca as colunas com ``.values()`` e monta cada item
+com conversores pré-calculados a partir dos campos do serializer, sem
+instanciar o modelo nem chamar ``to_representation`` campo a campo. A saída
+é idêntica à do serializer: mesmas chaves na mesma ordem, Decimal quantizado
+e formatado como no ``DecimalField`` e datas no fuso corrente em ISO 8601,
+como no ``DateTimeField``. Campos sem conversor específico usam o
+``to_representation`` do próprio campo do serializer.
+
+Suporta campos ligados a colunas do modelo e ``get_<campo>_display``.
+
+``subset`` devolve a representação de só parte dos campos (``?fields=`` /
+``?exclude=`` da API): o ``values()`` busca apenas as colunas desses campos.
+"""
+import decimal
+
+from django.utils.encoding import force_str
+from rest_framework import ISO_8601, fields
+from rest_framework.settings import api_settings
+
+
+def _no_conversion():
+    # Valor do banco já sai no formato da API
+    return None
+
+
+class ValuesRepresentation:
+    """
+    Representação de um ``ModelSerializer`` a partir de ``.values()``.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        self.fields = fields
+        self._plan = None
+        self._subsets = {}
+
+    @property
+    def plan(self):
+        # Montado na primeira leitura (os campos exigem os apps carregados)
+        if self._plan is None:
+            plan = self.build_plan()
+            if self.fields is not None:
+                plan = [step for step in plan if step[0] in self.fields]
+            self._plan = plan
+        return self._plan
+
+    @property
+    def field_names(self):
+        return [name for name, _, _ in self.plan]
+
+    @property
+    def columns(self):
+        columns = []
+        for _, column, _ in self.plan:
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def values(self, queryset, *extra):
+        """
+        Queryset de dicionários com as colunas necessárias e as ``extra``
+        (ex.: chaves da paginação), que ``represent`` ignora.
+        """
+        columns = self.columns
+        return queryset.values(*columns, *[column for column in extra if column not in columns])
+
+    def subset(self, fields):
+        """
+        Representação com apenas ``fields`` (na ordem do serializer),
+        guardada para as próximas requisições com o mesmo conjunto.
+        """
+        key = frozenset(fields)
+        if key not in self._subsets:
+            self._subsets[key] = ValuesRepresentation(self.serializer_class, key)
+        return self._subsets[key]
+
+    def represent(self, rows):
+        """
+        Converte as linhas de ``values()`` na lista de itens do serializer.
+        """
+        converters = [(name, column, factory()) for name, column, factory in self.plan]
+        items = []
+        for row in rows:
+            item = {}
+            for name, column, convert in converters:
+                value = row[column]
+                item[name] = value if convert is None or value is None else convert(value)
+            items.append(item)
+        return items
+
+    def represent_one(self, row):
+        return self.represent([row])[0]
+
+    # Conversores ---------------------------------------------------------
+
+    def build_plan(self):
+        serializer = self.serializer_class()
+        opts = serializer.Meta.model._meta
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if source.startswith('get_') and source.endswith('_display'):
+                model_field = opts.get_field(source[len('get_'):-len('_display')])
+                plan.append((name, model_field.attname, self.display_converter(field, model_field)))
+            else:
+                model_field = opts.get_field(source)
+                plan.append((name, model_field.attname, self.field_converter(field, model_field)))
+        return plan
+
+    @staticmethod
+    def display_converter(field, model_field):
+        # Mesmo resultado de get_FOO_display() seguido de CharField.to_representation()
+        labels = {key: str(force_str(label, strings_only=True)) for key, label in model_field.flatchoices}
+
+        def factory():
+            return lambda value: labels.get(value, str(value))
+        return factory
+
+    def field_converter(self, field, model_field):
+        internal_type = model_field.get_internal_type()
+        if type(field) is fields.IntegerField and internal_type in (
+            'AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+            'PositiveIntegerField', 'PositiveSmallIntegerField', 'SmallIntegerField',
+        ):
+            return _no_conversion
+        if type(field) is fields.CharField and internal_type in ('CharField', 'TextField', 'SlugField'):
+            return _no_conversion
+        if type(field) is fields.ChoiceField and internal_type == 'CharField' and all(
+            isinstance(key, str) for key in field.choices
+        ):
+            return _no_conversion
+        if type(field) is fields.DecimalField:
+            return self.decimal_converter(field)
+        if type(field) is fields.DateTimeField:
+            return self.datetime_converter(field)
+
+        def factory():
+            return field.to_representation
+        return factory
+
+    @staticmethod
+    def decimal_converter(field):
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if field.decimal_places is None or field.localize or field.normalize_output:
+            def factory():
+                return field.to_representation
+            return factory
+
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+        rounding = field.rounding
+
+        def factory():
+            # Mesmo contexto que DecimalField.quantize() usa a cada chamada
+            context = decimal.getcontext().copy()
+            if field.max_digits is not None:
+                context.prec = field.max_digits
+
+            def convert(value):
+                if not isinstance(value, decimal.Decimal):
+                    return field.to_representation(value)
+                quantized = value.quantize(exponent, rounding=rounding, context=context)
+                return format(quantized, 'f') if coerce_to_string else quantized
+            return convert
+        return factory
+
+    @staticmethod
+    def datetime_converter(field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            def factory():
+                return field.to_representation
+            return factory
+
+        def factory():
+            tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if tz is None:
+                return field.to_representation
+
+            def convert(value):
+                if value.tzinfo is None:
+                    return field.to_representation(value)
+                text = value.astimezone(tz).isoformat()
+                return text[:-6] + 'Z' if text.endswith('+00:00') else text
+            return convert
+        return factory
@@ -0,0 +1,122 @@
+"""
+Verificação dos planos de consulta da API de produtos.
+
+Cada cenário chama a view de verdade (sem HTTP), captura o SQL emitido
+e roda ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` no SQLite) nas consultas que
+leem ``core_product``. ``inspect`` aponta varredura completa da tabela e,
+no modo estrito, ordenação sem índice. Usado pelo teste
+``core.tests.test_query_plans`` e pelo comando ``check_query_plans``.
+"""
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .categories import category_tree
+from .views import CategoryListAPIView, ProductViewSet
+
+TABLE = 'core_product'
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+LIST = ProductViewSet.as_view({'get': 'list'})
+RETRIEVE = ProductViewSet.as_view({'get': 'retrieve'})
+BY_CATEGORY = ProductViewSet.as_view({'get': 'by_category'})
+STOCK_LEVELS = ProductViewSet.as_view({'get': 'stock_levels'})
+CATEGORIES = CategoryListAPIView.as_view()
+
+
+def _cursor(value, pk, reverse=False):
+    payload = json.dumps({'v': value, 'id': pk, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+# (rótulo, view, kwargs da URL, query string)
+SCENARIOS = [
+    ('products list', LIST, {}, {}),
+    ('products list category', LIST, {}, {'category': 'livros'}),
+    ('products list subcategory', LIST, {}, {'subcategory': 'Ficção'}),
+    ('products list category+subcategory', LIST, {}, {'category': 'livros', 'subcategory': 'Ficção'}),
+    ('products list q', LIST, {}, {'q': 'note dell'}),
+    ('products list q+category', LIST, {}, {'q': 'ele-12', 'category': 'eletronicos'}),
+    ('products list ordering=price', LIST, {}, {'ordering': 'price'}),
+    ('products list ordering=-name', LIST, {}, {'ordering': '-name'}),
+    ('products list ordering=stock', LIST, {}, {'ordering': 'stock'}),
+    ('products list count=false', LIST, {}, {'count': 'false', 'page': '3'}),
+    ('products cursor first page', LIST, {}, {'pagination': 'cursor'}),
+    ('products cursor created_at', LIST, {}, {
+        'cursor': _cursor('2024-10-01T10:00:00+00:00', 1),
+    }),
+    ('products cursor price', LIST, {}, {
+        'ordering': '-price', 'cursor': _cursor('100.00', 1),
+    }),
+    ('products cursor previous', LIST, {}, {
+        'ordering': 'name', 'cursor': _cursor('M', 1, reverse=True),
+    }),
+    ('products retrieve', RETRIEVE, {'pk': 1}, {}),
+    ('products by_category', BY_CATEGORY, {}, {}),
+    ('products by_category category', BY_CATEGORY, {}, {'category': 'livros'}),
+    ('products stock-levels', STOCK_LEVELS, {}, {}),
+    ('products stock-levels category', STOCK_LEVELS, {}, {'category': 'livros', 'level': 'high'}),
+    ('products stock-levels cursor', STOCK_LEVELS, {}, {
+        'level': 'medium', 'cursor': _cursor('20', 1),
+    }),
+    ('categories tree', CATEGORIES, {}, {}),
+]
+
+
+def capture_plans(connection, scenarios=SCENARIOS):
+    """
+    Gera ``(rótulo, sql, plano)`` para cada SELECT em ``core_product``
+    emitido pelos cenários; o plano é a lista de linhas do ``EXPLAIN``.
+    """
+    factory = APIRequestFactory(SERVER_NAME='localhost')
+    user = get_user_model()(username='query-plan-check')
+
+    for label, view, kwargs, params in scenarios:
+        category_tree.invalidate()
+        request = factory.get('/', params)
+        force_authenticate(request, user=user)
+
+        captured = []
+
+        def capture(execute, sql, sql_params, many, context):
+            captured.append((sql, sql_params))
+            return execute(sql, sql_params, many, context)
+
+        with connection.execute_wrapper(capture):
+            view(request, **kwargs)
+
+        for sql, sql_params in captured:
+            if TABLE not in sql or not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            yield label, sql, explain(connection, sql, sql_params)
+
+
+def explain(connection, sql, params):
+    prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        rows = cursor.fetchall()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: (linha,)
+    return [row[-1] for row in rows]
+
+
+def inspect(vendor, plan, strict=False):
+    """
+    Problemas do plano: varredura completa de ``core_product`` e, com
+    ``strict``, ordenação que exige B-tree temporária / Sort.
+    """
+    problems = []
+    for line in plan:
+        if vendor == 'sqlite':
+            if line.split()[:2] == ['SCAN', TABLE] and 'INDEX' not in line:
+                problems.append(f'varredura completa ({line})')
+            if strict and 'USE TEMP B-TREE FOR ORDER BY' in line:
+                problems.append(f'ordenação sem índice ({line})')
+        else:
+            if f'Seq Scan on {TABLE}' in line:
+                problems.append(f'varredura completa ({line.strip()})')
+            if strict and line.strip().startswith('Sort'):
+                problems.append(f'ordenação sem índice ({line.strip()})')
+    return problems
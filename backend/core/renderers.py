@@ -0,0 +1,138 @@
+"""
+Renderers adicionais da API REST.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .columnar import columnar_collection
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele, FastJSONRenderer usa o json da biblioteca padrão
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # opcional: sem ele, os formatos MessagePack não são oferecidos
+    msgpack = None
+
+# datetime/date/time e dataclasses passam pelo encoder do DRF (ex.: UTC com 'Z')
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` com orjson, quando instalado, e os mesmos bytes de saída.
+
+    Tipos que o orjson não serializa sozinho (Decimal, datetime, lazy
+    strings, QuerySet...) passam pelo ``default`` do ``encoder_class`` do
+    DRF; U+2028/U+2029 continuam escapados. Recaem no ``JSONRenderer``
+    (biblioteca padrão): saída indentada (API navegável, ``; indent=``),
+    ``UNICODE_JSON``/``COMPACT_JSON`` desligados e o que o orjson recusa
+    (chaves não-string, inteiros acima de 64 bits, tipos desconhecidos).
+
+    Diferenças conhecidas: floats em notação científica (``1e+16`` sai
+    ``1e16``; ``1e-05`` sai ``0.00001``) e NaN/Infinity, que saem ``null``
+    em vez de erro. A API serializa Decimal como string
+    (``COERCE_DECIMAL_TO_STRING``), então preços não são afetados.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2' in ret:  # prefixo UTF-8 de U+2028/U+2029 (busca de um byte, barata)
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Coleções no formato colunar de ``core.columnar`` (``?format=columnar``).
+    """
+    media_type = 'application/vnd.volus.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar_collection(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack (``?format=msgpack``) com os mesmos dados do JSON: Decimal,
+    datetime e afins passam pelo ``default`` do encoder do DRF.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default)
+
+
+class ColumnarMessagePackRenderer(MessagePackRenderer):
+    """
+    Formato colunar em MessagePack (``?format=columnar-msgpack``).
+    """
+    media_type = 'application/vnd.volus.columnar+msgpack'
+    format = 'columnar-msgpack'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar_collection(data), accepted_media_type, renderer_context)
+
+
+# Formatos compactos oferecidos pelas coleções de produtos, além do JSON
+COLLECTION_RENDERER_CLASSES = [ColumnarJSONRenderer]
+if msgpack is not None:
+    COLLECTION_RENDERER_CLASSES += [MessagePackRenderer, ColumnarMessagePackRenderer]
+
+
+class StreamFormatRenderer(FastJSONRenderer):
+    """
+    Renderer usado apenas na negociação de conteúdo (``?format=`` ou Accept)
+    de endpoints que respondem em streaming. Respostas comuns que passem por
+    ele (ex.: erros de autenticação) são serializadas como JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return super().render(data, None, renderer_context)
+
+
+class CSVRenderer(StreamFormatRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(StreamFormatRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Formato texto de exposição do Prometheus (``/metrics``).
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Erros (ex.: 403) chegam como dicionário
+        return f'# {data.get("detail", data)}\n'.encode(self.charset)
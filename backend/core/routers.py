@@ -0,0 +1,178 @@
+"""
+Roteamento de leituras para a réplica (``DATABASE_REPLICA``).
+
+``ReplicaRoutingMiddleware`` (``core.middleware``) abre em uma
+``ContextVar`` o estado de roteamento da requisição. Leituras vão para a
+réplica apenas quando:
+
+- o método é seguro (GET, HEAD, OPTIONS);
+- a view está em ``REPLICA_READ_VIEWS`` (ou é subclasse de uma delas);
+- nada foi gravado na requisição até o momento;
+- o cliente não gravou nada nos últimos ``REPLICA_PIN_SECONDS`` segundos.
+
+Escritas sempre vão para o ``default``. Depois de uma escrita, o cliente
+(usuário autenticado) fica "preso" ao primário pela janela de
+``REPLICA_PIN_SECONDS`` (read-your-writes), registrada no cache
+``ROUTER_PIN_CACHE``. Esse cache precisa ser compartilhado entre os workers
+(Redis, Memcached, arquivo): com réplica configurada, um cache local do
+processo é recusado na inicialização (``check_pin_cache``). Fora de
+requisições (comandos, tarefas), tudo continua no ``default``.
+"""
+import base64
+import contextvars
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Backends cujo conteúdo não é visto pelos outros workers
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+_current = contextvars.ContextVar('read_routing', default=None)
+
+
+class ReadRouting:
+    """
+    Estado de roteamento de uma requisição.
+    """
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.use_replica = False
+        self.wrote = False
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def start_routing(clients):
+    routing = ReadRouting(clients)
+    return routing, _current.set(routing)
+
+
+def stop_routing(token):
+    _current.reset(token)
+
+
+def current_routing():
+    return _current.get()
+
+
+def client_keys(request):
+    """
+    Chaves do cliente para a janela de read-your-writes: só a identidade.
+
+    A identidade é o id do usuário no payload do JWT (estável entre
+    refreshes) ou o cookie de sessão. O token não é validado aqui: a chave só
+    decide o banco das leituras do próprio portador; a autenticação continua
+    nas views. O IP não entra: atrás de proxy ou NAT, uma escrita prenderia
+    todos os clientes ao primário. Requisições anônimas que criam a
+    identidade (registro) usam ``track_user``.
+    """
+    return (_identity(request),)
+
+
+def user_client(pk):
+    return f'user:{pk}'
+
+
+def track_user(user):
+    """
+    Inclui o usuário nas chaves do cliente da requisição atual, para que a
+    escrita dela prenda também as leituras feitas depois com o token novo
+    (ex.: registro seguido de ``/api/auth/me/``).
+    """
+    routing = _current.get()
+    if routing is not None:
+        routing.clients = (*routing.clients, user_client(user.pk))
+
+
+def _identity(request):
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if header.startswith('Bearer ') and header.count('.') == 2:
+        try:
+            payload = header.split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+            claim = settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')
+            return user_client(claims[claim])
+        except (ValueError, KeyError, TypeError):
+            pass
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        return f'session:{session}'
+    return None
+
+
+def _pin_key(client):
+    return 'replica-pin:' + hashlib.sha1(client.encode()).hexdigest()
+
+
+def pin_cache():
+    return caches[getattr(settings, 'ROUTER_PIN_CACHE', DEFAULT_CACHE_ALIAS)]
+
+
+def check_pin_cache():
+    """
+    Com réplica configurada, exige que ``ROUTER_PIN_CACHE`` seja um cache
+    compartilhado: num cache local, o pin gravado por um worker não vale nos
+    outros e o read-your-writes falha. Chamada em ``CoreConfig.ready``.
+    """
+    if not replica_enabled():
+        return
+    alias = getattr(settings, 'ROUTER_PIN_CACHE', DEFAULT_CACHE_ALIAS)
+    if alias not in settings.CACHES:
+        raise ImproperlyConfigured(f'ROUTER_PIN_CACHE: cache "{alias}" não está em CACHES.')
+    if isinstance(caches[alias], PROCESS_LOCAL_CACHES):
+        raise ImproperlyConfigured(
+            f'ROUTER_PIN_CACHE: o cache "{alias}" é local do processo; use um cache '
+            'compartilhado entre os workers (Redis, Memcached, arquivo) com DATABASE_REPLICA.'
+        )
+
+
+def is_pinned(clients):
+    keys = [_pin_key(client) for client in clients if client]
+    return bool(keys) and bool(pin_cache().get_many(keys))
+
+
+def pin_to_primary(clients):
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    keys = {_pin_key(client): 1 for client in clients if client}
+    if seconds and keys:
+        pin_cache().set_many(keys, seconds)
+
+
+class PrimaryReplicaRouter:
+    """
+    Leituras seguras na réplica; escritas e o restante no ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is not None and routing.use_replica and not routing.wrote:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            # Leituras seguintes desta requisição voltam ao primário
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe o schema do primário (replicação/sync_replica)
+        return db != REPLICA_ALIAS
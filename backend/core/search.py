@@ -0,0 +1,161 @@
+"""
+Busca textual de produtos (filtro ``q`` da API).
+
+O backend é plugável via ``PRODUCT_SEARCH_BACKEND`` (caminho pontuado da
+classe). Sem configuração, é escolhido conforme o banco:
+
+- SQLite: tabela virtual FTS5 ``core_product_fts`` (migração 0005), mantida
+  em sincronia com ``core_product`` por triggers;
+- PostgreSQL: ``tsvector``/``tsquery`` com índice GIN de expressão;
+- demais bancos: ``icontains`` em nome e código (comportamento original).
+
+Todos os backends fazem prefixo em cada termo do nome e prefixo/exato no
+código (ex.: ``ELE-12`` encontra ``ELE-120``). Backends com ``ranked = True``
+anotam ``search_rank`` (maior = mais relevante).
+"""
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Quebra o termo de busca em tokens alfanuméricos (minúsculos).
+    """
+    return TOKEN_RE.findall(text.lower())
+
+
+class IContainsSearchBackend:
+    """
+    Busca por substring (LIKE '%termo%') em nome e código. Não usa índice.
+    """
+    ranked = False
+
+    def search(self, queryset, text):
+        return queryset.filter(Q(name__icontains=text) | Q(code__icontains=text))
+
+
+class SQLiteFTSBackend:
+    """
+    Busca via FTS5 com ranking BM25 (código pesa mais que o nome).
+    """
+    ranked = True
+    table = 'core_product_fts'
+    name_weight = 1.0
+    code_weight = 10.0
+
+    def build_query(self, tokens):
+        name_terms = ' AND '.join(f'"{token}"*' for token in tokens)
+        code_phrase = ' '.join(tokens)
+        return f'({{name}} : ({name_terms})) OR ({{code}} : "{code_phrase}"*)'
+
+    def search(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return IContainsSearchBackend().search(queryset, text)
+
+        # Junção com a tabela FTS (core.models.ProductSearchEntry): o MATCH
+        # roda uma vez e cada resultado busca o produto pelo código. bm25()
+        # só é válido na mesma consulta do MATCH.
+        return queryset.filter(search_entry__isnull=False).alias(
+            search_match=RawSQL(
+                f'{self.table} MATCH %s', (self.build_query(tokens),),
+                output_field=BooleanField(),
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f'-bm25({self.table}, %s, %s)',
+                (self.name_weight, self.code_weight),
+                output_field=FloatField(),
+            )
+        )
+
+    @classmethod
+    def is_available(cls, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [cls.table]
+            )
+            return cursor.fetchone() is not None
+
+
+class PostgresSearchBackend:
+    """
+    Busca via tsvector/tsquery (config 'simple') com ts_rank.
+
+    A expressão do vetor é a mesma do índice GIN ``core_product_search_idx``.
+    """
+    ranked = True
+    vector_sql = (
+        "to_tsvector('simple', coalesce(\"core_product\".\"name\", '') || ' ' || "
+        "coalesce(\"core_product\".\"code\", ''))"
+    )
+
+    def search(self, queryset, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return IContainsSearchBackend().search(queryset, text)
+
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.alias(
+            search_match=RawSQL(
+                f"{self.vector_sql} @@ to_tsquery('simple', %s)", (tsquery,),
+                output_field=BooleanField(),
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({self.vector_sql}, to_tsquery('simple', %s))", (tsquery,),
+                output_field=FloatField(),
+            )
+        )
+
+
+_backends = {}
+
+
+def _backend_key(using):
+    # O banco por trás de um alias muda (ex.: banco de testes), e com ele a
+    # existência da tabela FTS; a detecção vale por banco, não por alias
+    connection = connections[using]
+    return (
+        using, connection.vendor, connection.settings_dict['NAME'],
+        getattr(settings, 'PRODUCT_SEARCH_BACKEND', None),
+    )
+
+
+def get_search_backend(using='default'):
+    """
+    Retorna (e guarda em cache) o backend de busca para o banco do alias.
+    """
+    key = _backend_key(using)
+    if key not in _backends:
+        _, vendor, _, path = key
+        connection = connections[using]
+        if path:
+            backend = import_string(path)()
+        elif vendor == 'sqlite' and SQLiteFTSBackend.is_available(connection):
+            backend = SQLiteFTSBackend()
+        elif vendor == 'postgresql':
+            backend = PostgresSearchBackend()
+        else:
+            backend = IContainsSearchBackend()
+        _backends[key] = backend
+    return _backends[key]
+
+
+async def aget_search_backend(using='default'):
+    """
+    Versão assíncrona de ``get_search_backend``: a detecção do backend
+    consulta o banco apenas na primeira chamada.
+    """
+    backend = _backends.get(_backend_key(using))
+    if backend is not None:
+        return backend
+    return await sync_to_async(get_search_backend)(using)
@@ -3,7 +3,7 @@ Serializers para a API REST.
 """
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Product
+from .models import INTEGER_MAX, Product, StockMovement, StockSettings
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -37,6 +37,27 @@ class ProductSerializer(serializers.ModelSerializer):
         instance.clean()
         return data
 
+    def update(self, instance, validated_data):
+        """
+        Grava apenas as colunas enviadas: um PATCH sem 'stock' não sobrescreve
+        o estoque somado pela compactação do razão (ver core.ledger).
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+    def to_representation(self, instance):
+        """
+        Com ``fields`` no contexto (``?fields=``/``?exclude=`` da view), a
+        saída traz só esses campos; a validação continua com todos.
+        """
+        data = super().to_representation(instance)
+        fields = self.context.get('fields')
+        if fields is not None:
+            data = {name: value for name, value in data.items() if name in fields}
+        return data
+
 
 class CategoryStructureSerializer(serializers.Serializer):
     """
@@ -113,13 +134,17 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create(
+        user = User(
             username=validated_data['username'],
             email=validated_data['email'],
             first_name=validated_data['first_name'],
             last_name=validated_data['last_name'],
         )
-        user.set_password(validated_data['password'])
+        # ``password_hash``: hash já calculado pela view (pool de hashing)
+        if 'password_hash' in validated_data:
+            user.password = validated_data['password_hash']
+        else:
+            user.set_password(validated_data['password'])
         user.save()
         return user
 
@@ -149,4 +174,87 @@ class ChangePasswordSerializer(serializers.Serializer):
             raise serializers.ValidationError({
                 'new_password_confirm': 'As senhas não coincidem.'
             })
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    """
+    Operação de ajuste de estoque em lote.
+
+    Identifica o produto por 'id' ou 'code' e informa exatamente um entre
+    'delta' (variação relativa) e 'set' (valor absoluto, >= 0).
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    code = serializers.CharField(required=False, max_length=10)
+    delta = serializers.IntegerField(required=False, min_value=-INTEGER_MAX, max_value=INTEGER_MAX)
+    set = serializers.IntegerField(required=False, min_value=0, max_value=INTEGER_MAX)
+
+    def validate(self, attrs):
+        if ('id' in attrs) == ('code' in attrs):
+            raise serializers.ValidationError('Informe exatamente um entre "id" e "code".')
+        if ('delta' in attrs) == ('set' in attrs):
+            raise serializers.ValidationError('Informe exatamente um entre "delta" e "set".')
+        return attrs
+
+
+class StockSettingsSerializer(serializers.ModelSerializer):
+    """
+    Faixas de estoque do usuário.
+
+    Só 'low_stock_max' e 'medium_stock_max' são editáveis; os mínimos de cada
+    faixa são derivados pelo model.
+    """
+
+    class Meta:
+        model = StockSettings
+        fields = [
+            'low_stock_min',
+            'low_stock_max',
+            'medium_stock_min',
+            'medium_stock_max',
+            'high_stock_min',
+            'high_stock_max',
+            'updated_at',
+        ]
+        read_only_fields = ['updated_at']
+
+    def validate(self, attrs):
+        low_max = attrs.get('low_stock_max', getattr(self.instance, 'low_stock_max', None))
+        medium_max = attrs.get('medium_stock_max', getattr(self.instance, 'medium_stock_max', None))
+        if low_max is not None and medium_max is not None and medium_max <= low_max:
+            raise serializers.ValidationError({
+                'medium_stock_max': 'O limite do estoque médio deve ser maior que o do estoque baixo.'
+            })
+        return attrs
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    """
+    Movimento do razão de estoque (inclusão e histórico).
+    """
+    reason_display = serializers.CharField(source='get_reason_display', read_only=True)
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            'id',
+            'delta',
+            'reason',
+            'reason_display',
+            'note',
+            'user',
+            'created_at',
+            'applied_at',
+        ]
+        read_only_fields = ['user', 'created_at', 'applied_at']
+        extra_kwargs = {'delta': {'min_value': -INTEGER_MAX, 'max_value': INTEGER_MAX}}
+
+    def validate_delta(self, value):
+        if value == 0:
+            raise serializers.ValidationError('A variação não pode ser zero.')
+        return value
+
+    def validate_reason(self, value):
+        if value == 'correction':
+            raise serializers.ValidationError('Correções são registradas pelas gravações de valor absoluto.')
+        return value
@@ -0,0 +1,58 @@
+"""
+Sinais do app core.
+
+Mantém a árvore de categorias em memória sincronizada com as escritas em
+``Product``. As alterações são aplicadas apenas após o commit da transação,
+para que um rollback não deixe a cópia em memória divergente do banco.
+
+Inicia as tarefas periódicas em processo (limpeza da blacklist,
+compactação do razão de estoque e gravação das métricas) na primeira
+requisição do worker.
+
+Também prepara cada nova conexão: PRAGMAs do SQLite (``core.db``) e a
+medição de consultas usada pelo perfil por requisição (``core.profiling``).
+"""
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .blacklist import start_periodic_pruning
+from .categories import category_tree
+from .db import apply_sqlite_pragmas
+from .ledger import start_periodic_compaction
+from .metrics import start_flusher
+from .models import Product
+from .profiling import install_query_recorder
+
+
+@receiver(post_save, sender=Product, dispatch_uid='core.category_tree.save')
+def update_category_tree(sender, instance, created, **kwargs):
+    pk, category, subcategory, name, updated_at = (
+        instance.pk, instance.category, instance.subcategory, instance.name, instance.updated_at
+    )
+    transaction.on_commit(
+        lambda: category_tree.upsert(pk, category, subcategory, name, updated_at, created=created)
+    )
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='core.category_tree.delete')
+def remove_from_category_tree(sender, instance, **kwargs):
+    pk, updated_at = instance.pk, instance.updated_at
+    transaction.on_commit(lambda: category_tree.remove(pk, updated_at))
+
+
+request_started.connect(start_periodic_pruning, dispatch_uid='core.blacklist.prune')
+request_started.connect(start_periodic_compaction, dispatch_uid='core.ledger.compaction')
+request_started.connect(start_flusher, dispatch_uid='core.metrics.flusher')
+
+
+@receiver(connection_created, dispatch_uid='core.db.sqlite_pragmas')
+def configure_sqlite(sender, connection, **kwargs):
+    apply_sqlite_pragmas(connection)
+
+
+@receiver(connection_created, dispatch_uid='core.profiling.queries')
+def record_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
@@ -0,0 +1,223 @@
+"""
+Ajuste de estoque em lote.
+
+As operações (``delta`` relativo ou ``set`` absoluto, por ``id`` ou ``code``)
+são consolidadas por produto e aplicadas em uma transação. Como em
+``core.ledger.record_movement``, os produtos são travados com ``lock_stock``
+e a regra ``0 <= estoque <= INTEGER_MAX`` é conferida contra o estoque atual
+(snapshot + movimentos pendentes), de modo que ajustes e movimentos
+concorrentes não deixam o estoque negativo. Deltas viram movimentos
+pendentes no razão; ``set`` grava o snapshot com um UPDATE baseado em
+``Case`` e substitui os pendentes.
+
+As operações de um mesmo produto valem juntas: se o resultado somado sair da
+faixa, nenhuma é aplicada. As que empurram o estoque para fora da faixa
+recebem o motivo (``insufficient_stock`` ou ``out_of_range``) e as demais do
+produto, ``aborted``.
+
+A classificação por faixas (baixo/médio/alto, limites de ``StockSettings``)
+também é feita no SQL, com ``Case``/``When`` sobre o estoque atual
+(``core.ledger.current_stock``).
+"""
+from django.db import transaction
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .db import begin_write
+from .ledger import live_stock, lock_stock, supersede_pending
+from .models import INTEGER_MAX, Product, StockMovement, StockSettings
+
+# Produtos por UPDATE (limita o tamanho do CASE e o número de parâmetros)
+UPDATE_CHUNK_SIZE = 2000
+
+STATUS_OK = 'ok'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_INSUFFICIENT = 'insufficient_stock'
+STATUS_OUT_OF_RANGE = 'out_of_range'
+STATUS_ABORTED = 'aborted'
+
+
+class StockAdjustmentAborted(Exception):
+    """
+    Lote abortado no modo tudo-ou-nada (transação desfeita).
+    """
+
+    def __init__(self, results):
+        super().__init__('Ajuste de estoque abortado.')
+        self.results = results
+
+
+def _chunks(items, size=UPDATE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _reject(operations, results, indexes, reason):
+    # Produto não alterado: o motivo vai para as operações que empurram o
+    # estoque para fora da faixa; as demais do produto ficam 'aborted'
+    sign = -1 if reason == STATUS_INSUFFICIENT else 1
+    for index in indexes:
+        blamed = operations[index].get('delta', 0) * sign > 0
+        results[index]['status'] = reason if blamed else STATUS_ABORTED
+
+
+def apply_stock_adjustments(operations, all_or_nothing=False, user=None):
+    """
+    Aplica operações já validadas (``StockAdjustmentSerializer``).
+
+    Considera os movimentos pendentes do razão (``core.ledger``): 'delta' é
+    conferido contra o estoque atual e 'set' substitui os pendentes.
+
+    Retorna uma lista de resultados na mesma ordem das operações. Com
+    ``all_or_nothing=True``, qualquer falha desfaz o lote inteiro e levanta
+    ``StockAdjustmentAborted``.
+    """
+    results = [{'index': index, 'status': STATUS_OK} for index in range(len(operations))]
+    ids = {op['id'] for op in operations if 'id' in op}
+    codes = {op['code'] for op in operations if 'code' in op}
+
+    with transaction.atomic():
+        # Lê e depois grava: o lock de escrita do SQLite vem antes da leitura
+        begin_write()
+        # 1) Resolver id/code em uma única consulta
+        found = Product.objects.filter(Q(id__in=ids) | Q(code__in=codes)).order_by().values_list('id', 'code')
+        ids_found = set()
+        id_by_code = {}
+        for pk, code in found:
+            ids_found.add(pk)
+            id_by_code[code] = pk
+
+        # 2) Consolidar por produto, na ordem do pedido: 'set' reinicia, 'delta' acumula
+        plans = {}  # pk -> [valor absoluto ou None, delta acumulado, índices]
+        for index, op in enumerate(operations):
+            pk = op['id'] if 'id' in op else id_by_code.get(op['code'])
+            results[index]['id'] = pk
+            if pk is None or pk not in ids_found:
+                results[index]['status'] = STATUS_NOT_FOUND
+                continue
+            plan = plans.setdefault(pk, [None, 0, []])
+            if 'set' in op:
+                plan[0], plan[1] = op['set'], 0
+            else:
+                plan[1] += op['delta']
+            plan[2].append(index)
+
+        # 3) Com os produtos travados (mesmo lock de record_movement), conferir
+        # a faixa contra o estoque atual: snapshot + movimentos pendentes
+        lock_stock(plans)
+        current = live_stock(plans)
+        absolute = []
+        relative = []
+        applied = set()
+        for pk, (base, delta, indexes) in plans.items():
+            value = (current[pk] if base is None else base) + delta
+            if value < 0:
+                _reject(operations, results, indexes, STATUS_INSUFFICIENT)
+            elif value > INTEGER_MAX:
+                _reject(operations, results, indexes, STATUS_OUT_OF_RANGE)
+            else:
+                (relative if base is None else absolute).append((pk, value))
+                applied.add(pk)
+
+        # 4) 'set' grava o snapshot (substituindo os pendentes); 'delta' vira
+        # movimento pendente no razão, um por operação
+        now = timezone.now()
+        supersede_pending(dict(absolute), user=user, now=now)
+        for chunk in _chunks(absolute):
+            Product.objects.filter(id__in=[pk for pk, _ in chunk]).update(
+                stock=Case(
+                    *[When(id=pk, then=Value(value)) for pk, value in chunk],
+                    output_field=IntegerField(),
+                ),
+                updated_at=now,
+            )
+        relative_ids = {pk for pk, _ in relative}
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                product_id=results[index]['id'], delta=op['delta'], reason='adjustment',
+                user_id=getattr(user, 'pk', None), created_at=now,
+            )
+            for index, op in enumerate(operations)
+            if results[index]['id'] in relative_ids and op['delta']
+        ], batch_size=UPDATE_CHUNK_SIZE)
+
+        # Estoque logo após cada operação, na ordem do pedido; produtos
+        # recusados mantêm o estoque atual
+        for pk, (_, _, indexes) in plans.items():
+            stock = current[pk]
+            for index in indexes:
+                if pk in applied:
+                    op = operations[index]
+                    stock = op['set'] if 'set' in op else stock + op['delta']
+                results[index]['stock'] = stock
+
+        if all_or_nothing and any(result['status'] != STATUS_OK for result in results):
+            for result in results:
+                if result['status'] == STATUS_OK:
+                    result['status'] = STATUS_ABORTED
+                result.pop('stock', None)
+            transaction.set_rollback(True)
+            raise StockAdjustmentAborted(results)
+
+    return results
+
+
+# Classificação por faixas de estoque ----------------------------------------
+
+STOCK_LEVELS = ('low', 'medium', 'high')
+
+
+def stock_settings_for(user):
+    """
+    Faixas do usuário; sem registro, uma instância não salva com os padrões.
+
+    Busca pelo id (funciona também com ``ClaimsUser``, sem carregar o User).
+    """
+    stock_settings = StockSettings.objects.filter(user_id=user.pk).first()
+    if stock_settings is None:
+        stock_settings = StockSettings(user_id=user.pk)
+    return stock_settings
+
+
+def stock_level_filters(stock_settings, field='stock'):
+    """
+    Intervalo de ``field`` (coluna ou anotação com o estoque) de cada faixa.
+    Faixas contíguas: baixo inclui o zero e alto não tem teto
+    (``high_stock_max`` é só informativo).
+    """
+    low_max = stock_settings.low_stock_max
+    medium_max = stock_settings.medium_stock_max
+    return {
+        'low': Q(**{f'{field}__lte': low_max}),
+        'medium': Q(**{f'{field}__gt': low_max, f'{field}__lte': medium_max}),
+        'high': Q(**{f'{field}__gt': medium_max}),
+    }
+
+
+def stock_level_case(stock_settings, field='stock'):
+    """
+    Expressão SQL com a faixa de cada produto ('low', 'medium' ou 'high'),
+    calculada sobre ``field`` (coluna ou anotação com o estoque).
+    """
+    return Case(
+        When(**{f'{field}__lte': stock_settings.low_stock_max}, then=Value('low')),
+        When(**{f'{field}__lte': stock_settings.medium_stock_max}, then=Value('medium')),
+        default=Value('high'),
+        output_field=CharField(),
+    )
+
+
+def count_stock_levels(queryset, stock_settings, field='stock'):
+    """
+    Quantidade de produtos por faixa de ``field``.
+
+    Um COUNT por intervalo: sobre a coluna ``stock``, cada um é respondido
+    pelo índice (``product_stock_id_idx`` ou ``product_cat_stock_idx``), sem
+    ler a tabela. Um único GROUP BY no CASE percorreria todas as linhas do
+    filtro.
+    """
+    queryset = queryset.order_by()
+    return {
+        level: queryset.filter(condition).count()
+        for level, condition in stock_level_filters(stock_settings, field).items()
+    }
@@ -0,0 +1,301 @@
+"""
+Catálogo sintético de produtos para testes de carga e planejamento de
+capacidade (``setup_demo --products N``).
+
+Os produtos seguem distribuições configuráveis:
+
+- categorias e subcategorias com pesos de Zipf (``skew``; 0 = uniforme),
+  então poucas subcategorias concentram a maior parte do catálogo;
+- preços log-normais em torno da mediana de cada categoria
+  (``price_sigma`` controla a cauda longa);
+- estoque com uma fração zerada e o restante exponencial;
+- ``created_at`` crescente ao longo de ``days`` dias.
+
+Os códigos seguem o formato ``ABC-123456`` (prefixo da categoria + letra de
+bloco, 5 dígitos sequenciais e um dígito verificador), respeitando o
+checksum de ``Product._validate_code_checksum``; a sequência continua a
+partir dos códigos sintéticos já gravados.
+
+A carga roda em uma única transação, em lotes gravados com
+``executemany``: ``bulk_create`` gasta a maior parte do tempo preparando
+cada valor no ORM e sobrescreveria as datas (``auto_now``/``auto_now_add``).
+No SQLite os valores já saem no formato gravado pelo Django e, quando a
+carga é maior que a tabela, os índices secundários e o trigger de inserção
+do FTS (``core_product_fts_ai``) são removidos durante a carga e recriados
+(com ``rebuild`` do FTS) uma única vez no final, na mesma transação.
+"""
+import datetime
+import math
+import random
+import re
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Max
+from django.db.models.functions import Substr
+
+from .categories import category_tree
+from .db import begin_write
+from .models import Product
+from .search import SQLiteFTSBackend
+
+BLOCK_SIZE = 100_000
+MAX_PRODUCTS = 26 * BLOCK_SIZE
+CODE_RE = r'^[A-Z]{3}-[0-9]{6}$'
+FIELDS = ('name', 'code', 'price', 'category', 'subcategory', 'stock', 'created_at', 'updated_at')
+
+# Prefixo do código, preço mediano e subcategorias (com substantivos dos nomes)
+CATEGORY_PROFILES = {
+    'eletronicos': {
+        'prefix': 'EL',
+        'median_price': 1200,
+        'subcategories': {
+            'Smartphones': ['Smartphone', 'Celular'],
+            'Acessórios': ['Fone', 'Carregador', 'Cabo', 'Capa', 'Mouse', 'Teclado'],
+            'Notebooks': ['Notebook', 'Ultrabook'],
+            'Tablets': ['Tablet'],
+            'Áudio': ['Caixa de Som', 'Soundbar', 'Headset'],
+            'Monitores': ['Monitor'],
+        },
+    },
+    'livros': {
+        'prefix': 'LI',
+        'median_price': 55,
+        'subcategories': {
+            'Ficção': ['Romance', 'Antologia', 'Novela'],
+            'Técnicos': ['Guia', 'Manual', 'Curso'],
+            'Não-Ficção': ['Biografia', 'Ensaio', 'Reportagem'],
+            'Infantis': ['Livro Ilustrado', 'Fábulas'],
+            'Clássicos': ['Edição Comentada', 'Coletânea'],
+        },
+    },
+    'roupas': {
+        'prefix': 'RO',
+        'median_price': 90,
+        'subcategories': {
+            'Masculino': ['Camiseta', 'Calça', 'Bermuda', 'Jaqueta'],
+            'Feminino': ['Vestido', 'Blusa', 'Saia', 'Calça'],
+            'Infantil': ['Conjunto', 'Pijama', 'Macacão'],
+            'Calçados': ['Tênis', 'Sandália', 'Bota'],
+            'Acessórios': ['Boné', 'Cinto', 'Mochila'],
+        },
+    },
+    'alimentos': {
+        'prefix': 'AL',
+        'median_price': 22,
+        'subcategories': {
+            'Bebidas': ['Café', 'Suco', 'Chá', 'Água de Coco'],
+            'Doces': ['Chocolate', 'Biscoito', 'Geleia'],
+            'Naturais': ['Granola', 'Castanhas', 'Mel'],
+            'Salgados': ['Amendoim', 'Chips', 'Torrada'],
+            'Mercearia': ['Arroz', 'Feijão', 'Azeite', 'Macarrão'],
+        },
+    },
+    'moveis': {
+        'prefix': 'MO',
+        'median_price': 850,
+        'subcategories': {
+            'Escritório': ['Cadeira', 'Mesa', 'Estante'],
+            'Sala': ['Sofá', 'Rack', 'Poltrona'],
+            'Quarto': ['Cama', 'Guarda-Roupa', 'Cômoda'],
+            'Cozinha': ['Armário', 'Banqueta', 'Mesa de Jantar'],
+        },
+    },
+}
+BRANDS = ['Aurora', 'Vértice', 'Nativa', 'Boreal', 'Prisma', 'Atlas', 'Lumen', 'Orion', 'Terra', 'Brisa']
+VARIANTS = ['Pro', 'Max', 'Lite', 'Plus', 'Essencial', 'Premium', 'Compacto', 'Clássico']
+# Dígitos verificadores possíveis para cada resto (soma dos dígitos % 3)
+CHECK_DIGITS = {0: (0, 3, 6, 9), 1: (2, 5, 8), 2: (1, 4, 7)}
+
+
+def zipf_weights(count, skew):
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def make_code(prefix, sequence, rng):
+    """
+    Código ``{prefix}{bloco}-{5 dígitos}{verificador}`` com soma dos dígitos
+    divisível por 3.
+    """
+    block, number = divmod(sequence, BLOCK_SIZE)
+    digits = f'{number:05d}'
+    check = rng.choice(CHECK_DIGITS[sum(map(int, digits)) % 3])
+    return f'{prefix}{chr(65 + block)}-{digits}{check}'
+
+
+def next_sequence(using='default'):
+    """
+    Próxima posição da sequência, após os códigos sintéticos já gravados.
+    """
+    # Bloco + dígitos vêm depois do prefixo e ordenam como a sequência
+    last = (
+        Product.objects.using(using).filter(code__regex=CODE_RE)
+        .aggregate(last=Max(Substr('code', 3)))['last']
+    )
+    if last is None:
+        return 0
+    block, digits = re.match(r'([A-Z])-(\d{5})', last).groups()
+    return (ord(block) - 65) * BLOCK_SIZE + int(digits) + 1
+
+
+class SyntheticCatalog:
+    """
+    Gera ``total`` produtos (tuplas na ordem de ``FIELDS``) em lotes, com a
+    sequência de códigos começando em ``first``.
+    """
+
+    def __init__(self, total, first=0, skew=1.0, price_sigma=0.8, out_of_stock=0.08,
+                 mean_stock=60, days=730, seed=None, now=None):
+        if first + total > MAX_PRODUCTS:
+            raise ValueError(f'A sequência de códigos comporta até {MAX_PRODUCTS} produtos sintéticos.')
+        self.total = total
+        self.first = first
+        self.rng = random.Random(seed)
+        self.price_sigma = price_sigma
+        self.out_of_stock = out_of_stock
+        self.mean_stock = mean_stock
+        self.now = (now or datetime.datetime.now(datetime.timezone.utc)).replace(tzinfo=None)
+        self.span = datetime.timedelta(days=days)
+
+        categories = list(CATEGORY_PROFILES.items())
+        self.pairs = []
+        weights = []
+        for category_weight, (category, profile) in zip(zipf_weights(len(categories), skew), categories):
+            subcategories = list(profile['subcategories'].items())
+            sub_weights = zipf_weights(len(subcategories), skew)
+            total = sum(sub_weights)
+            for sub_weight, (subcategory, nouns) in zip(sub_weights, subcategories):
+                self.pairs.append((category, subcategory, nouns, profile))
+                weights.append(category_weight * sub_weight / total)
+        self.cum_weights = []
+        running = 0.0
+        for weight in weights:
+            running += weight
+            self.cum_weights.append(running)
+
+    def batches(self, size):
+        """
+        Lotes de até ``size`` linhas. Datas são ``datetime`` ingênuos em UTC;
+        preços, ``Decimal``.
+        """
+        for start in range(0, self.total, size):
+            yield self.rows(start, min(size, self.total - start))
+
+    def rows(self, start, count):
+        rng = self.rng
+        pairs = rng.choices(self.pairs, cum_weights=self.cum_weights, k=count)
+        step = self.span / self.total
+        origin = self.now - self.span
+        rows = []
+        for offset, (category, subcategory, nouns, profile) in enumerate(pairs, start):
+            sequence = self.first + offset
+            price = max(0.99, rng.lognormvariate(math.log(profile['median_price']), self.price_sigma))
+            if rng.random() < self.out_of_stock:
+                stock = 0
+            else:
+                stock = int(rng.expovariate(1 / self.mean_stock)) + 1
+            created_at = origin + step * offset
+            updated_at = min(self.now, created_at + datetime.timedelta(days=rng.expovariate(1 / 30)))
+            rows.append((
+                f'{rng.choice(nouns)} {rng.choice(BRANDS)} {rng.choice(VARIANTS)} {sequence % 997 + 1}',
+                make_code(profile['prefix'], sequence, rng),
+                Decimal(f'{price:.2f}'),
+                category,
+                subcategory,
+                stock,
+                created_at,
+                updated_at,
+            ))
+        return rows
+
+
+@contextmanager
+def bulk_load(using='default', rows=0):
+    """
+    Transação ajustada para carga em massa de ``rows`` produtos (ver
+    docstring do módulo).
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    if connection.vendor != 'sqlite':
+        with transaction.atomic(using=using):
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL synchronous_commit = off')
+            yield
+        category_tree.invalidate()
+        return
+
+    table = Product._meta.db_table
+    trigger = f'{SQLiteFTSBackend.table}_ai'
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA cache_size = -262144')  # 256 MiB para os índices
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            begin_write(using)
+            # Cargas maiores que a tabela atual recriam os índices secundários
+            # e o FTS no final, em uma passada ordenada, em vez de atualizá-los
+            # linha a linha
+            deferred = []
+            if rows >= Product.objects.using(using).count():
+                cursor.execute(
+                    "SELECT name, type, sql FROM sqlite_master WHERE tbl_name = %s AND sql IS NOT NULL "
+                    "AND (type = 'index' OR (type = 'trigger' AND name = %s))",
+                    [table, trigger],
+                )
+                deferred = cursor.fetchall()
+            for name, kind, _ in deferred:
+                cursor.execute(f'DROP {kind.upper()} {quote(name)}')
+            yield
+            for _, _, sql in deferred:
+                cursor.execute(sql)
+            if any(kind == 'trigger' for _, kind, _ in deferred):
+                cursor.execute(
+                    f"INSERT INTO {SQLiteFTSBackend.table}({SQLiteFTSBackend.table}) VALUES ('rebuild')"
+                )
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {int(synchronous)}')
+            cursor.execute(f'PRAGMA cache_size = {int(cache_size)}')
+        # Inserções em massa não disparam os sinais que mantêm a árvore
+        category_tree.invalidate()
+
+
+def insert_rows(rows, using='default'):
+    """
+    Grava um lote de ``SyntheticCatalog.rows`` (dentro de ``bulk_load``).
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(Product._meta.db_table),
+        ', '.join(quote(Product._meta.get_field(name).column) for name in FIELDS),
+        ', '.join(['%s'] * len(FIELDS)),
+    )
+    if connection.vendor == 'sqlite':
+        # Mesmo resultado de adapt_decimalfield_value/adapt_datetimefield_value
+        # (UTC sem fuso), sem o custo por valor
+        adapt_price = adapt_moment = str
+    else:
+        price_field = Product._meta.get_field('price')
+
+        def adapt_price(value):
+            return connection.ops.adapt_decimalfield_value(
+                value, price_field.max_digits, price_field.decimal_places
+            )
+
+        def adapt_moment(value):
+            return connection.ops.adapt_datetimefield_value(value.replace(tzinfo=datetime.timezone.utc))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (name, code, adapt_price(price), category, subcategory, stock,
+             adapt_moment(created_at), adapt_moment(updated_at))
+            for name, code, price, category, subcategory, stock, created_at, updated_at in rows
+        ])
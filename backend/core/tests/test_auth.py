@@ -0,0 +1,64 @@
+"""
+Testes do registro com pool de hashing e dos limites de tentativas
+(core.hashing, core.throttling).
+"""
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+REGISTER = {
+    'username': 'novo',
+    'password': 'senha-segura-1',
+    'password_confirm': 'senha-segura-1',
+    'email': 'novo@example.com',
+    'first_name': 'Novo',
+    'last_name': 'Usuário',
+}
+
+
+class AuthTestCase(TestCase):
+    def setUp(self):
+        store_dir = tempfile.mkdtemp(prefix='volus-test-ratelimit-')
+        self.addCleanup(shutil.rmtree, store_dir, ignore_errors=True)
+        store = override_settings(AUTH_RATE_LIMIT_STORE=os.path.join(store_dir, 'ratelimit.sqlite3'))
+        store.enable()
+        self.addCleanup(store.disable)
+        self.client = APIClient(HTTP_HOST='localhost')
+
+
+@override_settings(AUTH_HASH_POOL={'workers': 1, 'max_queue': 2})
+class RegisterTests(AuthTestCase):
+    def test_user_is_saved_on_the_request_connection(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/auth/register/', REGISTER, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        # O INSERT sai pela conexão desta thread, não pela do pool
+        self.assertTrue(any(query['sql'].startswith('INSERT INTO "auth_user"') for query in queries))
+        user = get_user_model().objects.get(username='novo')
+        self.assertTrue(user.check_password('senha-segura-1'))
+
+
+class RateLimitTests(AuthTestCase):
+    def login(self, username):
+        return self.client.post(
+            '/api/auth/login/', {'username': username, 'password': 'errada-123'}, format='json'
+        ).status_code
+
+    @override_settings(AUTH_RATE_LIMITS={'ip': None, 'username': (1, 0.001)})
+    def test_none_disables_only_that_bucket(self):
+        self.assertNotEqual(self.login('alguem'), 429)
+        self.assertEqual(self.login('alguem'), 429)
+        # Sem bucket de IP: outros usuários do mesmo IP seguem liberados
+        for index in range(5):
+            self.assertNotEqual(self.login(f'outro-{index}'), 429)
+
+    @override_settings(AUTH_RATE_LIMITS={'ip': None, 'username': None})
+    def test_all_buckets_disabled(self):
+        for _ in range(3):
+            self.assertNotEqual(self.login('alguem'), 429)
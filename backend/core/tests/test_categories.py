@@ -0,0 +1,90 @@
+"""
+Testes da árvore de categorias em memória (core.categories).
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.categories import category_tree
+from core.models import Product
+
+
+def make_products(shape):
+    """
+    ``shape``: lista de (categoria, subcategoria, quantidade).
+    """
+    products = []
+    for category, subcategory, count in shape:
+        for index in range(count):
+            products.append(Product(
+                name=f'{subcategory} {index % 7}',
+                code=f'T{len(products):05d}',
+                price='10.00',
+                category=category,
+                subcategory=subcategory,
+            ))
+    Product.objects.bulk_create(products)
+
+
+# Mesma quantidade de produtos em 1 categoria/1 subcategoria e em 5x8
+FLAT = [('eletronicos', 'notebooks', 200)]
+NESTED = [
+    (category, f'{category}-{index}', 5)
+    for category in ('eletronicos', 'roupas', 'casa', 'livros', 'esportes')
+    for index in range(8)
+]
+
+
+class CategoryTreeQueryTests(TestCase):
+    def setUp(self):
+        category_tree.invalidate()
+        self.addCleanup(category_tree.invalidate)
+
+    def count_snapshot_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            category_tree.snapshot()
+        return len(queries)
+
+    def test_constant_queries_for_flat_and_nested_trees(self):
+        counts = {}
+        for label, shape in (('flat', FLAT), ('nested', NESTED)):
+            Product.objects.all().delete()
+            make_products(shape)
+            counts[label] = (self.count_snapshot_queries(), self.count_snapshot_queries())
+        # Reconstrução: versão + linhas; em dia: só a versão
+        self.assertEqual(counts, {'flat': (2, 1), 'nested': (2, 1)})
+
+    def test_endpoint_queries_do_not_depend_on_tree_shape(self):
+        for shape in (FLAT, NESTED):
+            Product.objects.all().delete()
+            make_products(shape)
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/categories/', HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200)
+            with self.assertNumQueries(1):
+                self.client.get('/api/categories/', HTTP_HOST='localhost')
+
+    def test_local_save_patches_tree_without_rebuild(self):
+        make_products(NESTED)
+        category_tree.snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                name='Novo', code='N00001', price='1.00', category='casa', subcategory='casa-novo'
+            )
+        with self.assertNumQueries(1):
+            categories = category_tree.get()
+        casa = next(category for category in categories if category['name'] == 'casa')
+        self.assertIn({'name': 'casa-novo', 'items': ['Novo']}, casa['subcategories'])
+
+    def test_write_without_signals_rebuilds(self):
+        make_products(FLAT)
+        _, etag = category_tree.snapshot()
+        # Como a escrita de outro processo: sem sinal local
+        Product.objects.filter(code='T00000').update(subcategory='tablets', updated_at=timezone.now())
+        self.assertEqual(self.count_snapshot_queries(), 2)
+        categories, new_etag = category_tree.snapshot()
+        self.assertNotEqual(etag, new_etag)
+        self.assertEqual(
+            [sub['name'] for sub in categories[0]['subcategories']], ['notebooks', 'tablets']
+        )
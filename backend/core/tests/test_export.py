@@ -0,0 +1,55 @@
+"""
+Testes da exportação em streaming (core.export).
+"""
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Product
+from core.tests.test_read_path import make_read_path_products, serializer_json
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_read_path_products(count=12)
+        cls.user = get_user_model().objects.create_user(username='exporta', password='x' * 12)
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def export(self, params):
+        response = self.client.get('/api/products/export/', {'ordering': 'created_at', **params})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def expected(self, fields=None):
+        return serializer_json(Product.objects.order_by('created_at'), fields)
+
+    def test_ndjson_matches_the_api(self):
+        lines = self.export({'format': 'ndjson'}).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.expected())
+
+    def test_fields_and_exclude(self):
+        for params, fields in (
+            ({'fields': 'price,id,stock'}, ['id', 'price', 'stock']),
+            ({'fields': 'category_display,updated_at'}, ['category_display', 'updated_at']),
+            ({'exclude': 'name,created_at'}, [
+                'id', 'code', 'price', 'category', 'category_display', 'subcategory', 'stock', 'updated_at',
+            ]),
+        ):
+            with self.subTest(params=params):
+                lines = self.export({'format': 'ndjson', **params}).splitlines()
+                self.assertEqual([json.loads(line) for line in lines], self.expected(fields))
+                rows = list(csv.reader(io.StringIO(self.export({'format': 'csv', **params}))))
+                self.assertEqual(rows[0], fields)
+                self.assertEqual(len(rows), 13)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/products/export/', {'format': 'csv', 'fields': 'id,senha'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,33 @@
+"""
+Testes do registro de métricas (core.metrics).
+"""
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import Client, TestCase
+from django.test.client import ClientHandler
+
+from core import metrics
+
+
+class MetricsRegistryTests(TestCase):
+    def test_store_lives_under_base_dir_per_database(self):
+        path = metrics.default_store_path()
+        self.assertEqual(os.path.dirname(path), os.path.join(settings.BASE_DIR, 'var'))
+        with mock.patch.dict(connections['default'].settings_dict, NAME='outro.sqlite3'):
+            self.assertNotEqual(metrics.default_store_path(), path)
+
+    def test_only_server_handlers_start_the_flusher(self):
+        with mock.patch.object(metrics.registry, 'start') as start:
+            metrics.start_flusher(sender=ClientHandler)
+            start.assert_not_called()
+            metrics.start_flusher(sender=WSGIHandler)
+            start.assert_called_once_with()
+
+    def test_test_client_requests_are_not_recorded(self):
+        Client(HTTP_HOST='localhost').get('/api/categories/')
+        self.assertFalse(metrics.registry.enabled)
+        self.assertEqual(metrics.registry._pending, {})
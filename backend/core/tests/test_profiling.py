@@ -0,0 +1,42 @@
+"""
+Testes do cabeçalho Server-Timing (core.middleware.ProfilingMiddleware).
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+PROFILING = {
+    'REQUEST_PROFILING': True,
+    'SERVER_TIMING_HEADER': True,
+    'SERVER_TIMING_ALLOWED_IPS': ['127.0.0.1'],
+    'SLOW_REQUEST_MS': None,
+    'SLOW_REQUEST_QUERIES': None,
+}
+
+
+@override_settings(**PROFILING)
+class ServerTimingTests(TestCase):
+    def get(self, path, remote_addr, user=None):
+        client = APIClient(HTTP_HOST='localhost', REMOTE_ADDR=remote_addr)
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get(path)
+
+    def test_allowed_ip_receives_header(self):
+        response = self.get('/api/categories/', '127.0.0.1')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_other_clients_do_not(self):
+        self.assertFalse(self.get('/api/categories/', '203.0.113.7').has_header('Server-Timing'))
+        user = get_user_model().objects.create_user(username='comum', password='x' * 12)
+        self.assertFalse(self.get('/api/products/', '203.0.113.7', user).has_header('Server-Timing'))
+
+    def test_staff_receives_header_from_any_ip(self):
+        staff = get_user_model().objects.create_user(username='equipe', password='x' * 12, is_staff=True)
+        response = self.get('/api/products/', '203.0.113.7', staff)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_disabled(self):
+        self.assertFalse(self.get('/api/categories/', '127.0.0.1').has_header('Server-Timing'))
@@ -0,0 +1,32 @@
+"""
+Testes dos planos de consulta da API de produtos (core.query_plans).
+"""
+from django.db import connection
+from django.test import TestCase
+
+from core.query_plans import SCENARIOS, SUPPORTED_VENDORS, capture_plans, explain, inspect
+from core.tests.test_categories import NESTED, make_products
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_products(NESTED)
+
+    def setUp(self):
+        if connection.vendor not in SUPPORTED_VENDORS:
+            self.skipTest(f'EXPLAIN não suportado em {connection.vendor}')
+
+    def test_product_queries_do_not_scan_the_table(self):
+        checked = set()
+        for label, sql, plan in capture_plans(connection):
+            checked.add(label)
+            with self.subTest(label, sql=sql):
+                self.assertEqual(inspect(connection.vendor, plan), [], '\n'.join(plan))
+        # Todo cenário precisa ter lido core_product (senão o teste não prova nada)
+        self.assertEqual(checked, {label for label, *_ in SCENARIOS})
+
+    def test_inspect_flags_full_scan(self):
+        sql = 'SELECT * FROM core_product WHERE price + 0 > %s'
+        plan = explain(connection, sql, [10])
+        self.assertTrue(inspect(connection.vendor, plan))
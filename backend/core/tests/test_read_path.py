@@ -0,0 +1,140 @@
+"""
+Testes do caminho de leitura via ``.values()`` (core.projections): a API
+precisa devolver exatamente o que o ``ProductSerializer`` devolveria.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Product
+from core.serializers import ProductSerializer
+from core.views import PRODUCT_VALUES
+
+PRICES = [Decimal('0.01'), Decimal('0.10'), Decimal('19.90'), Decimal('1234.50'), Decimal('99999999.99')]
+
+
+def make_read_path_products(count=40):
+    """
+    Produtos variados: preços extremos, subcategoria vazia, aspas e acentos
+    no nome, datas em volta do fim do horário de verão de 2018 (UTC-2/-3).
+    """
+    categories = [key for key, _ in Product.CATEGORIES]
+    Product.objects.bulk_create([
+        Product(
+            name=f'Produto {index} – ç/ã "aspas"',
+            code=f'RP{index:08d}',
+            price=PRICES[index % len(PRICES)],
+            category=categories[index % len(categories)],
+            subcategory='' if index % 7 == 0 else f'Sub {index % 13}',
+            stock=index % 50,
+        )
+        for index in range(count)
+    ])
+    # bulk_create aplica auto_now/auto_now_add; as datas vêm depois
+    base = datetime.datetime(2018, 2, 17, 23, 30, tzinfo=datetime.timezone.utc)
+    for index, pk in enumerate(Product.objects.order_by('code').values_list('pk', flat=True)):
+        moment = base + datetime.timedelta(hours=7 * index, microseconds=index % 1000)
+        Product.objects.filter(pk=pk).update(created_at=moment, updated_at=moment)
+
+
+def serializer_json(products, fields=None):
+    context = {} if fields is None else {'fields': fields}
+    data = ProductSerializer(products, many=True, context=context).data
+    return json.loads(JSONRenderer().render(data))
+
+
+class ProjectionParityTests(TestCase):
+    """``ValuesRepresentation`` gera o mesmo JSON, byte a byte, que o serializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_read_path_products()
+
+    def assertSameBytes(self, queryset, representation=PRODUCT_VALUES):
+        render = JSONRenderer().render
+        fields = None if representation is PRODUCT_VALUES else representation.field_names
+        context = {} if fields is None else {'fields': fields}
+        self.assertEqual(
+            render(representation.represent(representation.values(queryset))),
+            render(ProductSerializer(queryset, many=True, context=context).data),
+        )
+
+    def test_all_fields(self):
+        for queryset in (
+            Product.objects.order_by('id'),
+            Product.objects.order_by('price', 'id'),
+            Product.objects.filter(category='livros').order_by('id'),
+        ):
+            with self.subTest(str(queryset.query)):
+                self.assertSameBytes(queryset)
+
+    def test_subsets(self):
+        for fields in (['id', 'name', 'price'], ['category_display', 'created_at'], ['stock']):
+            with self.subTest(fields=fields):
+                self.assertSameBytes(Product.objects.order_by('id'), PRODUCT_VALUES.subset(fields))
+
+
+class ReadPathEndpointTests(TestCase):
+    """Listagem, detalhe e páginas de cursor da API contra o serializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_read_path_products()
+        cls.user = get_user_model().objects.create_user(username='read-path', password='x' * 12)
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def expected(self, items, fields=None):
+        # Mesmos produtos, na ordem devolvida pela API
+        products = Product.objects.in_bulk([item['id'] for item in items])
+        return serializer_json([products[item['id']] for item in items], fields)
+
+    def test_list(self):
+        for params in ({}, {'ordering': 'price'}, {'ordering': '-name', 'category': 'livros'}, {'count': 'false'}):
+            with self.subTest(params=params):
+                results = self.get('/api/products/', {'page_size': 100, **params})['results']
+                self.assertTrue(results)
+                self.assertEqual(results, self.expected(results))
+
+    def test_detail(self):
+        product = Product.objects.order_by('id').last()
+        data = self.get(f'/api/products/{product.pk}/')
+        self.assertEqual(data, serializer_json([product])[0])
+
+    def test_fields_and_exclude(self):
+        product = Product.objects.order_by('id').first()
+        for params, fields in (
+            ({'fields': 'id,price,created_at'}, ['id', 'price', 'created_at']),
+            ({'exclude': 'created_at,category_display'}, [
+                name for name in PRODUCT_VALUES.field_names if name not in ('created_at', 'category_display')
+            ]),
+        ):
+            with self.subTest(params=params):
+                results = self.get('/api/products/', params)['results']
+                self.assertEqual([list(item) for item in results[:1]], [fields])
+                expected = self.expected([{'id': item['id']} for item in results], fields)
+                self.assertEqual(results, expected)
+                detail = self.get(f'/api/products/{product.pk}/', params)
+                self.assertEqual(detail, serializer_json([product], fields)[0])
+
+    def test_cursor_pages(self):
+        url, params = '/api/products/', {'pagination': 'cursor', 'ordering': 'price', 'page_size': 7}
+        seen = []
+        while url:
+            page = self.get(url, params)
+            self.assertEqual(page['results'], self.expected(page['results']))
+            seen.extend(item['id'] for item in page['results'])
+            url, params = page['next'], None
+        self.assertEqual(seen, list(Product.objects.order_by('price', 'id').values_list('id', flat=True)))
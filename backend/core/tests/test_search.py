@@ -0,0 +1,47 @@
+"""
+Testes da busca textual de produtos (core.search).
+"""
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.models import Product
+from core.search import IContainsSearchBackend, SQLiteFTSBackend, get_search_backend
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index, (name, code) in enumerate((
+            ('Caneta azul', 'ELE-120'),
+            ('Caderno pautado', 'LIV-200'),
+            ('Caneta vermelha', 'LIV-310'),
+        )):
+            Product.objects.create(name=name, code=code, price='1.00', category='livros', stock=index)
+
+    def codes(self, text, queryset=None):
+        queryset = Product.objects.all() if queryset is None else queryset
+        found = get_search_backend(queryset.db).search(queryset, text)
+        return sorted(found.values_list('code', flat=True))
+
+    def test_prefix_on_names_and_codes(self):
+        self.assertEqual(self.codes('can'), ['ELE-120', 'LIV-310'])
+        self.assertEqual(self.codes('caneta verm'), ['LIV-310'])
+        self.assertEqual(self.codes('ELE-12'), ['ELE-120'])
+        self.assertEqual(self.codes('zzz'), [])
+
+    def test_combines_with_other_filters(self):
+        self.assertEqual(self.codes('caneta', Product.objects.filter(stock__gte=1)), ['LIV-310'])
+
+    @override_settings(PRODUCT_SEARCH_BACKEND=None)
+    def test_detection_follows_the_database(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 só no SQLite')
+        self.assertIsInstance(get_search_backend(), SQLiteFTSBackend)
+        # Outro banco atrás do mesmo alias (sem a tabela FTS) não herda o cache
+        settings_dict = {**connection.settings_dict, 'NAME': 'outro.sqlite3'}
+        with mock.patch.object(connection, 'settings_dict', settings_dict), \
+                mock.patch.object(SQLiteFTSBackend, 'is_available', return_value=False):
+            self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+        self.assertIsInstance(get_search_backend(), SQLiteFTSBackend)
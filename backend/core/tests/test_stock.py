@@ -0,0 +1,42 @@
+"""
+Testes do ajuste de estoque em lote (core.stock.apply_stock_adjustments).
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Product
+
+
+class StockBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Caneta', code='SB00001', price='2.50', category='livros', stock=10
+        )
+        cls.user = get_user_model().objects.create_user(username='estoque', password='x' * 12)
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def post(self, operations):
+        response = self.client.post('/api/products/stock/bulk/', operations, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(item['status'], item['stock']) for item in response.json()['results']]
+
+    def test_each_index_reports_its_own_stock(self):
+        results = self.post([
+            {'id': self.product.pk, 'delta': -2},
+            {'code': 'SB00001', 'delta': -3},
+            {'id': self.product.pk, 'set': 20},
+            {'id': self.product.pk, 'delta': 1},
+        ])
+        self.assertEqual(results, [('ok', 8), ('ok', 5), ('ok', 20), ('ok', 21)])
+
+    def test_rejected_product_reports_current_stock(self):
+        results = self.post([
+            {'id': self.product.pk, 'delta': -4},
+            {'id': self.product.pk, 'delta': -7},
+        ])
+        self.assertEqual(results, [('insufficient_stock', 10), ('insufficient_stock', 10)])
@@ -0,0 +1,174 @@
+"""
+Limite de tentativas (token bucket) nas rotas que calculam hash de senha.
+
+Cada tentativa de login, registro ou troca de senha consome uma ficha do
+bucket do IP e do usuário (nome informado ou usuário autenticado). Sem
+fichas, a requisição é recusada com 429 antes de qualquer hashing, o que
+impede que uma rajada de logins inválidos ocupe todos os workers.
+
+Os buckets ficam em um arquivo SQLite local (``AUTH_RATE_LIMIT_STORE``),
+compartilhado pelos workers da mesma máquina; cada consumo é uma transação
+``BEGIN IMMEDIATE`` curta. Limites em ``AUTH_RATE_LIMITS`` como
+``(rajada, fichas por minuto)`` por chave (``ip``, ``username``); ``None``
+em uma chave desativa só aquele bucket, e ``AUTH_RATE_LIMITS = None``
+desativa todos.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .hashing import auth_metrics
+
+DEFAULT_RATE_LIMITS = {
+    'ip': (30, 30),
+    'username': (10, 5),
+}
+
+
+class TokenBucketStore:
+    """
+    Buckets persistidos em SQLite (um arquivo por máquina).
+    """
+
+    # A cada N consumos, apaga buckets que já estariam cheios de novo
+    cleanup_every = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def consume(self, limits, now=None):
+        """
+        Consome uma ficha de cada bucket ``{chave: (rajada, por_minuto)}``.
+
+        Tudo ou nada: retorna ``(True, 0, None)`` ou ``(False, espera em
+        segundos, chave que bloqueou)``, sem consumir de nenhum bucket.
+        """
+        now = time.time() if now is None else now
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            states = {}
+            for key, (capacity, per_minute) in limits.items():
+                row = connection.execute(
+                    'SELECT tokens, updated FROM bucket WHERE key = ?', (key,)
+                ).fetchone()
+                rate = per_minute / 60.0
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                if tokens < 1:
+                    connection.execute('ROLLBACK')
+                    return False, (1 - tokens) / rate if rate else None, key
+                states[key] = tokens - 1
+            connection.executemany(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                [(key, tokens, now) for key, tokens in states.items()],
+            )
+            self._calls += 1
+            if self._calls % self.cleanup_every == 0:
+                horizon = max(
+                    capacity / (per_minute / 60.0) for capacity, per_minute in limits.values() if per_minute
+                )
+                connection.execute('DELETE FROM bucket WHERE updated < ?', (now - horizon,))
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        return True, 0, None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_bucket_store():
+    path = getattr(settings, 'AUTH_RATE_LIMIT_STORE', None) or os.path.join(
+        tempfile.gettempdir(), 'volus-auth-ratelimit.sqlite3'
+    )
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = TokenBucketStore(path)
+        return _stores[path]
+
+
+class PasswordRateThrottle(BaseThrottle):
+    """
+    Throttle DRF com token bucket por IP e por usuário.
+
+    Subclasses definem ``scope`` e ``get_username``.
+    """
+    scope = None
+
+    def get_username(self, request):
+        return None
+
+    def get_ident(self, request):
+        # X-Forwarded-For só é considerado com NUM_PROXIES configurado;
+        # do contrário o cliente escolheria o próprio bucket de IP
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR', '')
+        return super().get_ident(request)
+
+    def get_limits(self, request):
+        rates = {**DEFAULT_RATE_LIMITS, **getattr(settings, 'AUTH_RATE_LIMITS', {})}
+        limits = {}
+        if rates['ip'] is not None:
+            limits[f'{self.scope}:ip:{self.get_ident(request)}'] = rates['ip']
+        username = self.get_username(request)
+        if username and rates['username'] is not None:
+            limits[f'{self.scope}:username:{username.strip().lower()}'] = rates['username']
+        return limits
+
+    def allow_request(self, request, view):
+        if getattr(settings, 'AUTH_RATE_LIMITS', DEFAULT_RATE_LIMITS) is None:
+            return True
+        limits = self.get_limits(request)
+        if not limits:
+            return True
+        allowed, self.retry_after, key = get_bucket_store().consume(limits)
+        if not allowed:
+            auth_metrics.reject(f'rate_limit_{key.split(":")[1]}')
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginRateThrottle(PasswordRateThrottle):
+    scope = 'login'
+
+    def get_username(self, request):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        return username if isinstance(username, str) else None
+
+
+class RegisterRateThrottle(LoginRateThrottle):
+    scope = 'register'
+
+
+class PasswordChangeRateThrottle(PasswordRateThrottle):
+    scope = 'password'
+
+    def get_username(self, request):
+        return str(request.user.pk) if request.user and request.user.is_authenticated else None
@@ -1,10 +1,11 @@
 """
 URLs da API REST.
 """
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from . import async_views, views
 
 # Router para ViewSets (CRUD automático)
 router = DefaultRouter()
@@ -21,7 +22,36 @@ urlpatterns = [
     
     # Categorias (filtro cascata)
     path('api/categories/', views.CategoryListAPIView.as_view(), name='api_categories'),
+
+    # Faixas de estoque do usuário
+    path('api/stock/settings/', views.StockSettingsAPIView.as_view(), name='stock_settings'),
     
     # Produtos (ViewSet com router)
     path('api/', include(router.urls)),
+
+    # Métricas (formato Prometheus)
+    path('metrics', views.metrics_api, name='metrics'),
 ]
+
+# Leituras assíncronas (ver core.async_views): mesmas rotas, à frente do router;
+# os demais métodos seguem para as views síncronas
+async_read_urlpatterns = [
+    path('api/categories/', async_views.AsyncCategoryListView.as_view(
+        sync_view=views.CategoryListAPIView.as_view(),
+    ), name='api_categories'),
+    path('api/products/', async_views.AsyncProductListView.as_view(
+        sync_view=views.ProductViewSet.as_view({'get': 'list', 'post': 'create'}),
+    ), name='product-list'),
+    # pk numérico: /api/products/stats/, /export/ etc. seguem para o router
+    re_path(r'^api/products/(?P<pk>[0-9]+)/$', async_views.AsyncProductDetailView.as_view(
+        sync_view=views.ProductViewSet.as_view({
+            'get': 'retrieve',
+            'put': 'update',
+            'patch': 'partial_update',
+            'delete': 'destroy',
+        }),
+    ), name='product-detail'),
+]
+
+if getattr(settings, 'ASYNC_READ_API', False):
+    urlpatterns = async_read_urlpatterns + urlpatterns
@@ -1,31 +1,150 @@
 """
 Views da API REST com Django REST Framework.
 """
-from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import exceptions, filters, viewsets, status
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+    renderer_classes,
+    throttle_classes,
+)
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth.models import User
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
-from django.db.models import Q
-from collections import Counter
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    Q,
+    Sum,
+)
+from decimal import Decimal
 
-from .models import Product
+from .authentication import ClaimsUser, ProfileRefreshToken, load_user
+from .categories import category_tree
+from .conditional import (
+    collection_etag,
+    conditional_response,
+    make_etag,
+    row_validators,
+    set_validators,
+)
+from .db import begin_write
+from .export import export_response
+from .hashing import HashingOverloaded, run_hashing
+from .importers import ProductImporter, detect_format, iter_text_lines, read_csv, read_ndjson
+from .ledger import (
+    InsufficientStock,
+    apply_pending_stock,
+    current_stock,
+    last_pending_at,
+    ledger_version,
+    live_stock,
+    record_movement,
+    supersede_pending,
+    with_pending_stock,
+)
+from .models import Product, StockMovement
+from .pagination import ProductPagination
+from .parsers import CSVStreamParser, NDJSONStreamParser
+from .profiling import timing
+from .projections import ValuesRepresentation
+from .metrics import render_metrics
+from .renderers import COLLECTION_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer, PrometheusRenderer
+from .routers import track_user
+from .search import get_search_backend
 from .serializers import (
     ProductSerializer,
-    CategoryStructureSerializer,
     UserSerializer,
     UserRegisterSerializer,
     UserUpdateSerializer,
     ChangePasswordSerializer,
+    StockAdjustmentSerializer,
+    StockMovementSerializer,
+    StockSettingsSerializer,
+)
+from .stock import (
+    STOCK_LEVELS,
+    StockAdjustmentAborted,
+    apply_stock_adjustments,
+    count_stock_levels,
+    stock_level_case,
+    stock_level_filters,
+    stock_settings_for,
 )
+from .throttling import LoginRateThrottle, PasswordChangeRateThrottle, RegisterRateThrottle
+
+
+# Faixas de preço usadas no histograma de /api/products/stats/
+# (mesmos limites que o frontend usava nos relatórios)
+PRICE_RANGES = [
+    ('0-50', Q(price__lte=50)),
+    ('51-100', Q(price__gt=50, price__lte=100)),
+    ('101-200', Q(price__gt=100, price__lte=200)),
+    ('201-500', Q(price__gt=200, price__lte=500)),
+    ('500+', Q(price__gt=500)),
+]
+
+# Leitura rápida de list/retrieve com a mesma saída do ProductSerializer
+PRODUCT_VALUES = ValuesRepresentation(ProductSerializer)
+
+
+def product_rows(queryset, representation, *extra):
+    """
+    ``values()`` só com as colunas da representação (mais ``extra``). O
+    estoque exibido soma os movimentos pendentes (ver core.ledger); sem
+    ``stock`` na projeção, a subconsulta do razão nem entra na consulta.
+    """
+    rows = representation.values(queryset, *extra)
+    return with_pending_stock(rows) if 'stock' in representation.columns else rows
+
+
+def ordering_columns(queryset, view):
+    # id e campos da ordenação: o cursor da paginação lê os dois nas linhas
+    names = {field.name for field in queryset.model._meta.concrete_fields}
+    names |= set(getattr(view, 'cursor_annotations', ())) & set(queryset.query.annotations)
+    ordering = list(queryset.query.order_by) or list(view.ordering or [])
+    return ['id', *[term.lstrip('-') for term in ordering if isinstance(term, str) and term.lstrip('-') in names]]
+
+
+def _money(value):
+    """
+    Arredonda valores monetários agregados para duas casas decimais e devolve
+    string, como o DecimalField do ProductSerializer ("11278.10"). None passa
+    direto (agregação sem linhas).
+    """
+    if value is None:
+        return None
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+def _hashing_overloaded():
+    return Response(
+        {'error': 'Servidor ocupado. Tente novamente em instantes.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterRateThrottle])
 def register_api(request):
     """
     Endpoint de registro de novo usuário.
@@ -34,10 +153,17 @@ def register_api(request):
     """
     serializer = UserRegisterSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
+        # Só o hash vai para o pool; a gravação fica na conexão da requisição
+        try:
+            password_hash = run_hashing(make_password, serializer.validated_data['password'])
+        except HashingOverloaded:
+            return _hashing_overloaded()
+        user = serializer.save(password_hash=password_hash)
+        # Leituras seguintes (com o token novo) veem o usuário recém-criado
+        track_user(user)
         
         # Opcional: fazer login automático e retornar tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = ProfileRefreshToken.for_user(user)
         user_serializer = UserSerializer(user)
 
         return Response({
@@ -59,19 +185,114 @@ class ProductViewSet(viewsets.ModelViewSet):
     - GET /api/products/{id}/ - detalhe de um produto
     - PUT /api/products/{id}/ - atualizar produto
     - DELETE /api/products/{id}/ - deletar produto
+    - GET/POST /api/products/{id}/movements/ - razão de estoque do produto
+    - GET /api/products/stock-levels/ - faixas de estoque (contagens + lista por faixa)
     
     Filtros suportados:
-    - q: busca por nome ou código
+    - q: busca textual por nome (prefixo) ou código (exato/prefixo), ordenada por relevância
     - category: filtrar por categoria
     - subcategory: filtrar por subcategoria
     - ordering: ordenar por campo (ex: -created_at, price)
+
+    Paginação (ver core.pagination.ProductPagination):
+    - page / page_size: paginação numerada (page_size máx. 500)
+    - count=false: pula o COUNT(*) exato
+    - pagination=cursor: paginação keyset por (campo de ordenação, id); com q,
+      exige ordering (a relevância não serve de cursor)
+
+    Campos (listagem, detalhe, faixas de estoque e respostas de escrita):
+    - fields=id,name,stock: só esses campos (o SELECT lê só as colunas deles)
+    - exclude=price,created_at: todos menos esses
+
+    Formatos da listagem e da exportação (Accept ou ?format=, ver core.columnar):
+    - columnar: JSON colunar, categorias e subcategorias por dicionário
+    - msgpack / columnar-msgpack: MessagePack (com msgpack instalado)
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    pagination_class = ProductPagination
     search_fields = ['name', 'code']
     ordering_fields = ['created_at', 'price', 'name', 'stock']
     ordering = ['-created_at']
+    # Anotações aceitas como chave do cursor (ver ProductPagination)
+    cursor_annotations = ('live_stock',)
+    # Expressão do estoque atual da requisição (ver get_stock_expression)
+    stock_expression = None
+    # JSON continua o padrão; formatos compactos só na listagem
+    list_renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *COLLECTION_RENDERER_CLASSES]
+
+    def get_renderers(self):
+        if self.action == 'list':
+            return [renderer() for renderer in self.list_renderer_classes]
+        return super().get_renderers()
+
+    def get_representation(self):
+        """
+        ``PRODUCT_VALUES`` restrito por ``?fields=`` / ``?exclude=`` (nomes
+        separados por vírgula, validados contra os campos do serializer).
+        """
+        params = self.request.query_params
+        allowed = PRODUCT_VALUES.field_names
+        selected = allowed
+        for param in ('fields', 'exclude'):
+            names = [name.strip() for name in params.get(param, '').split(',') if name.strip()]
+            if not names:
+                continue
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                raise exceptions.ValidationError({
+                    param: f'Campos inválidos: {", ".join(unknown)}. Use entre: {", ".join(allowed)}.'
+                })
+            keep = param == 'fields'
+            selected = [name for name in selected if (name in names) == keep]
+        if not selected:
+            raise exceptions.ValidationError({'fields': 'Nenhum campo selecionado.'})
+        if selected == allowed:
+            return PRODUCT_VALUES
+        return PRODUCT_VALUES.subset(selected)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        representation = self.get_representation()
+        if representation is not PRODUCT_VALUES:
+            # Respostas de criação/edição com os mesmos campos (ver ProductSerializer)
+            context['fields'] = representation.field_names
+        return context
+
+    def get_stock_expression(self):
+        """
+        Estoque atual para ordenação (``core.ledger.current_stock``), uma
+        consulta por requisição; as views assíncronas o calculam antes.
+        """
+        if self.stock_expression is None:
+            self.stock_expression = current_stock()
+        return self.stock_expression
+
+    def filter_queryset(self, queryset):
+        """
+        ``ordering=stock`` ordena pelo estoque atual (snapshot + pendentes),
+        anotado como ``live_stock``: a mesma ordem do estoque exibido.
+        """
+        queryset = super().filter_queryset(queryset)
+        ordering = queryset.query.order_by
+        if not any(isinstance(term, str) and term.lstrip('-') == 'stock' for term in ordering):
+            return queryset
+        return queryset.annotate(live_stock=self.get_stock_expression()).order_by(*[
+            term.replace('stock', 'live_stock') if isinstance(term, str) and term.lstrip('-') == 'stock' else term
+            for term in ordering
+        ])
+
+    @staticmethod
+    def reads_stock(representation, queryset):
+        # Estoque exibido ou usado na ordem: a versão do razão entra no ETag
+        return 'stock' in representation.columns or 'live_stock' in queryset.query.annotations
+
+    @staticmethod
+    def fieldset_parts(representation):
+        # Parte extra dos ETags quando os campos são restritos
+        return [] if representation is PRODUCT_VALUES else [','.join(representation.field_names)]
     
     def get_queryset(self):
         """
@@ -79,12 +300,13 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
         
-        # Filtro de busca por nome ou código
+        # Filtro de busca por nome ou código (ver core.search)
         q = self.request.query_params.get('q', None)
         if q:
-            queryset = queryset.filter(
-                Q(name__icontains=q) | Q(code__icontains=q)
-            )
+            queryset = get_search_backend(queryset.db).search(queryset, q)
+            if 'search_rank' in queryset.query.annotations:
+                # Sem ?ordering explícito, ordena por relevância
+                self.ordering = ['-search_rank', '-created_at']
         
         # Filtro por categoria
         category = self.request.query_params.get('category', None)
@@ -97,27 +319,402 @@ class ProductViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(subcategory=subcategory)
         
         return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Listagem com ETag (contagem + última alteração do filtro):
+        If-None-Match conferindo responde 304 sem paginar nem serializar.
+        """
+        representation = self.get_representation()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Versão do razão só quando o estoque é exibido ou ordena a lista
+        parts = [ledger_version()] if self.reads_stock(representation, queryset) else []
+        etag = collection_etag(request, queryset, *parts, *self.fieldset_parts(representation))
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        # Leitura via values() + conversores pré-calculados (ver core.projections)
+        rows = product_rows(queryset, representation, *ordering_columns(queryset, self))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            with timing('serialize'):
+                data = representation.represent(apply_pending_stock(page))
+            response = self.get_paginated_response(data)
+        else:
+            rows = list(rows)
+            with timing('serialize'):
+                data = representation.represent(apply_pending_stock(rows))
+            response = Response(data)
+        return set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Detalhe com ETag/Last-Modified derivados de updated_at (ou do
+        movimento de estoque pendente mais recente).
+        """
+        representation = self.get_representation()
+        queryset = product_rows(self.filter_queryset(self.get_queryset()), representation, 'id', 'updated_at')
+        if 'stock' in representation.columns:
+            queryset = queryset.annotate(pending_at=last_pending_at())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, row)
+
+        modified = max(row['updated_at'], row.pop('pending_at', None) or row['updated_at'])
+        etag, last_modified = row_validators(
+            request, Product, row['id'], modified, *self.fieldset_parts(representation)
+        )
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        with timing('serialize'):
+            data = representation.represent_one(apply_pending_stock([row])[0])
+        return set_validators(Response(data), etag, last_modified)
     
+    def perform_update(self, serializer):
+        """
+        'stock' enviado é valor absoluto: substitui os movimentos pendentes
+        (ver core.ledger). Sem 'stock', a resposta traz o estoque atual.
+        """
+        stock = serializer.validated_data.get('stock')
+        with transaction.atomic():
+            begin_write()
+            if stock is not None:
+                supersede_pending({serializer.instance.pk: stock}, user=self.request.user)
+            serializer.save()
+        if stock is None:
+            serializer.instance.stock = live_stock([serializer.instance.pk])[serializer.instance.pk]
+
+    def perform_destroy(self, instance):
+        # A exclusão em cascata lê os movimentos antes de apagar (ver core.db)
+        with transaction.atomic():
+            begin_write()
+            instance.delete()
+
+    @action(detail=True, methods=['get', 'post'])
+    def movements(self, request, pk=None):
+        """
+        Endpoint extra: razão de estoque do produto.
+        GET /api/products/{id}/movements/ - histórico (mais recentes primeiro)
+        POST /api/products/{id}/movements/ - inclui um movimento
+
+        Corpo do POST: {"delta": -2, "reason": "sale", "note": "..."}. O
+        movimento fica pendente até a compactação, mas já entra no estoque
+        exibido. Baixas que deixariam o estoque negativo respondem 409.
+        """
+        product_id = get_object_or_404(self.get_queryset().values_list('id', flat=True), pk=pk)
+
+        if request.method == 'GET':
+            movements = StockMovement.objects.filter(product_id=product_id).order_by('-id')
+            page = self.paginate_queryset(movements)
+            if page is not None:
+                return self.get_paginated_response(StockMovementSerializer(page, many=True).data)
+            return Response(StockMovementSerializer(movements, many=True).data)
+
+        serializer = StockMovementSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            movement = record_movement(product_id, user=request.user, **serializer.validated_data)
+        except InsufficientStock as exc:
+            return Response(
+                {'error': 'Estoque insuficiente.', 'stock': exc.available},
+                status=status.HTTP_409_CONFLICT
+            )
+        data = StockMovementSerializer(movement).data
+        data['stock'] = live_stock([product_id])[product_id]
+        return Response(data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """
         Endpoint extra: agregar produtos por categoria.
         GET /api/products/by_category/
         """
-        products = self.get_queryset()
-        category_counter = Counter(products.values_list('category', flat=True))
+        products = self.get_queryset().order_by()
+        category_counts = products.values('category').annotate(
+            count=Count('id')
+        ).order_by('category')
         
         data = [
             {
-                'category': cat,
-                'category_display': dict(Product.CATEGORIES).get(cat, cat),
-                'count': count
+                'category': row['category'],
+                'category_display': dict(Product.CATEGORIES).get(row['category'], row['category']),
+                'count': row['count']
             }
-            for cat, count in category_counter.items()
+            for row in category_counts
         ]
         
         return Response(data)
 
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[CSVRenderer, NDJSONRenderer, *COLLECTION_RENDERER_CLASSES],
+    )
+    def export(self, request):
+        """
+        Endpoint extra: exportação em streaming do catálogo filtrado.
+        GET /api/products/export/?format=csv|ndjson|columnar|msgpack|columnar-msgpack
+
+        Aplica os mesmos filtros, ordenação e ?fields=/?exclude= da listagem
+        (sem paginação). O formato também pode ser negociado pelo header
+        Accept.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            request._request, queryset, request.accepted_renderer.format,
+            self.get_representation().field_names,
+        )
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[MultiPartParser, CSVStreamParser, NDJSONStreamParser],
+    )
+    def import_products(self, request):
+        """
+        Endpoint extra: importação em lote (upsert pelo código).
+        POST /api/products/import/
+
+        Aceita multipart com o campo "file" (.csv ou .ndjson) ou o corpo bruto
+        com Content-Type text/csv ou application/x-ndjson. O arquivo é lido em
+        streaming e gravado em lotes; a resposta traz os erros por linha.
+
+        Parâmetros opcionais:
+        - dry_run=true: apenas valida, sem gravar
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            stream = upload
+            file_format = detect_format(name=upload.name, content_type=upload.content_type)
+        else:
+            stream = request.data if hasattr(request.data, 'read') else None
+            file_format = detect_format(content_type=request.content_type)
+
+        if stream is None or file_format is None:
+            return Response(
+                {'error': 'Envie um arquivo CSV ou NDJSON (campo "file" ou corpo text/csv / application/x-ndjson).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        reader = read_csv if file_format == 'csv' else read_ndjson
+        dry_run = request.query_params.get('dry_run', '').lower() in ('true', '1', 'yes')
+        report = ProductImporter(dry_run=dry_run).run(reader(iter_text_lines(stream)))
+
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='stock/bulk')
+    def stock_bulk(self, request):
+        """
+        Endpoint extra: ajuste de estoque em lote.
+        POST /api/products/stock/bulk/
+
+        Corpo: lista de operações {"id" ou "code", "delta" ou "set"}, ou
+        {"operations": [...], "all_or_nothing": true}. Tudo é aplicado em uma
+        transação; a resposta traz o status de cada item (ok, not_found,
+        insufficient_stock, out_of_range, aborted) e o estoque logo após a
+        operação. As operações de um mesmo produto valem juntas (ver
+        core.stock).
+
+        Com all_or_nothing=true, qualquer falha desfaz o lote (HTTP 409).
+        """
+        payload = request.data
+        all_or_nothing = False
+        if isinstance(payload, dict):
+            all_or_nothing = bool(payload.get('all_or_nothing', False))
+            payload = payload.get('operations')
+        if not isinstance(payload, list) or not payload:
+            return Response(
+                {'error': 'Envie uma lista de operações não vazia.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = StockAdjustmentSerializer(data=payload, many=True)
+        if not serializer.is_valid():
+            return Response({'operations': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = apply_stock_adjustments(
+                serializer.validated_data, all_or_nothing=all_or_nothing, user=request.user
+            )
+        except StockAdjustmentAborted as exc:
+            return Response({'results': exc.results}, status=status.HTTP_409_CONFLICT)
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='stock-levels')
+    def stock_levels(self, request):
+        """
+        Endpoint extra: classificação do estoque pelas faixas do usuário.
+        GET /api/products/stock-levels/?level=low|medium|high
+
+        Retorna os limites, a contagem por faixa (um COUNT por intervalo de
+        estoque) e a lista paginada da faixa pedida (padrão: low), ordenada
+        por estoque e classificada no SQL (CASE/WHEN em stock_level). Tudo
+        usa o estoque atual (snapshot + pendentes, ver core.ledger). Aceita
+        os mesmos filtros da listagem (q, category, subcategory) e os modos
+        de paginação; sem pendentes, contagens e ordenação (stock, id) usam
+        os índices product_stock_id_idx / product_cat_stock_idx.
+        """
+        level = request.query_params.get('level', 'low')
+        if level not in STOCK_LEVELS:
+            return Response(
+                {'error': f'Faixa inválida. Use uma entre: {", ".join(STOCK_LEVELS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        representation = self.get_representation()
+        stock_settings = stock_settings_for(request.user)
+        # Contagens, faixa, ordem e rótulo sobre o mesmo estoque atual (com
+        # os movimentos pendentes); sem pendentes, é a coluna indexada
+        queryset = self.get_queryset().annotate(live_stock=current_stock())
+        counts = count_stock_levels(queryset, stock_settings, 'live_stock')
+
+        rows = product_rows(
+            queryset.filter(stock_level_filters(stock_settings, 'live_stock')[level])
+            .order_by('live_stock', 'id')
+            .annotate(stock_level=stock_level_case(stock_settings, 'live_stock')),
+            representation, 'stock_level', 'live_stock', 'id',
+        )
+        page = self.paginate_queryset(rows)
+        paginated = page is not None
+        if not paginated:
+            page = list(rows)
+        with timing('serialize'):
+            data = representation.represent(apply_pending_stock(page))
+        for item, row in zip(data, page):
+            item['stock_level'] = row['stock_level']
+
+        payload = {
+            'level': level,
+            'thresholds': StockSettingsSerializer(stock_settings).data,
+            'counts': counts,
+        }
+        if not paginated:
+            payload['results'] = data
+            return Response(payload)
+        response = self.get_paginated_response(data)
+        response.data = {**payload, **response.data}
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Endpoint extra: métricas do inventário calculadas no banco.
+        GET /api/products/stats/
+
+        Respeita os mesmos filtros da listagem (q, category, subcategory) e
+        executa um número fixo de consultas (agregações e GROUP BY), sem
+        trafegar as linhas de produto para o cliente. Totais e rankings de
+        estoque somam os movimentos pendentes do razão.
+
+        Parâmetros opcionais:
+        - top: quantidade de produtos no ranking por valor em estoque (padrão 10, máx. 100)
+        """
+        try:
+            top = min(max(int(request.query_params.get('top', 10)), 1), 100)
+        except ValueError:
+            top = 10
+
+        # Estoque atual (snapshot + pendentes, ver core.ledger.current_stock)
+        stock = current_stock()
+        products = self.get_queryset().order_by()
+        stock_value = ExpressionWrapper(
+            F('price') * stock,
+            output_field=DecimalField(max_digits=20, decimal_places=2),
+        )
+
+        # Totais e histograma de faixas de preço em uma única consulta
+        price_range_aggregates = {
+            f'range_{index}': Count('id', filter=range_filter)
+            for index, (_, range_filter) in enumerate(PRICE_RANGES)
+        }
+        totals = products.aggregate(
+            sku_count=Count('id'),
+            total_items=Sum(stock),
+            total_value=Sum(stock_value),
+            average_price=Avg('price'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            category_count=Count('category', distinct=True),
+            **price_range_aggregates,
+        )
+
+        sku_count = totals['sku_count']
+        total_items = totals['total_items'] or 0
+        total_value = totals['total_value'] or Decimal('0')
+
+        # Distribuição por categoria (GROUP BY)
+        category_labels = dict(Product.CATEGORIES)
+        categories = [
+            {
+                'category': row['category'],
+                'category_display': category_labels.get(row['category'], row['category']),
+                'count': row['count'],
+                'total_stock': row['total_stock'] or 0,
+                'total_value': _money(row['total_value'] or 0),
+                'percentage': round(row['count'] * 100 / sku_count, 1) if sku_count else 0,
+            }
+            for row in products.values('category').annotate(
+                count=Count('id'),
+                total_stock=Sum(stock),
+                total_value=Sum(stock_value),
+            ).order_by('category')
+        ]
+
+        price_ranges = [
+            {'label': label, 'count': totals[f'range_{index}']}
+            for index, (label, _) in enumerate(PRICE_RANGES)
+        ]
+
+        summary_fields = ('id', 'name', 'code', 'category', 'price', 'live_stock')
+        summaries = products.annotate(live_stock=stock)
+        top_products = [
+            self._stats_product(row)
+            for row in summaries.annotate(stock_value=stock_value)
+            .order_by('-stock_value', 'id')
+            .values(*summary_fields, 'stock_value')[:top]
+        ]
+
+        def first(*ordering):
+            row = summaries.order_by(*ordering).values(*summary_fields).first()
+            return self._stats_product(row) if row else None
+
+        return Response({
+            'sku_count': sku_count,
+            'total_items': total_items,
+            'total_value': _money(total_value),
+            'average_price': _money(totals['average_price'] or 0),
+            'average_item_price': _money(total_value / total_items if total_items else 0),
+            'min_price': _money(totals['min_price']),
+            'max_price': _money(totals['max_price']),
+            'category_count': totals['category_count'],
+            'categories': categories,
+            'price_ranges': price_ranges,
+            'top_products': top_products,
+            'most_expensive': first('-price', 'id'),
+            'cheapest': first('price', 'id'),
+            'highest_stock': first('-live_stock', 'id'),
+            'lowest_stock': first('live_stock', 'id'),
+        })
+
+    @staticmethod
+    def _stats_product(row):
+        """
+        Resumo de produto usado nas métricas (inclui rótulo da categoria),
+        com preço e valor em estoque como strings de duas casas.
+        """
+        row['category_display'] = dict(Product.CATEGORIES).get(row['category'], row['category'])
+        row['stock'] = row.pop('live_stock')
+        if 'stock_value' not in row:
+            row['stock_value'] = row['price'] * row['stock']
+        row['price'] = _money(row['price'])
+        row['stock_value'] = _money(row['stock_value'])
+        return row
+
 
 class CategoryListAPIView(APIView):
     """
@@ -129,38 +726,14 @@ class CategoryListAPIView(APIView):
     permission_classes = [AllowAny]  # Público para facilitar uso
     
     def get(self, request):
-        # Obter categorias únicas
-        categories = Product.objects.values_list('category', flat=True).distinct()
-        
-        # Construir estrutura hierárquica
-        category_data = []
-        for cat in categories:
-            # Obter subcategorias desta categoria
-            subcategories = Product.objects.filter(
-                category=cat
-            ).values_list('subcategory', flat=True).distinct()
-            
-            # Obter produtos por subcategoria
-            subcat_data = []
-            for subcat in subcategories:
-                if subcat:  # Ignorar vazios
-                    products = Product.objects.filter(
-                        category=cat,
-                        subcategory=subcat
-                    ).values_list('name', flat=True)
-                    
-                    subcat_data.append({
-                        'name': subcat,
-                        'items': list(products)
-                    })
-            
-            category_data.append({
-                'name': cat,
-                'display_name': dict(Product.CATEGORIES).get(cat, cat),
-                'subcategories': subcat_data
-            })
-        
-        return Response({'categories': category_data})
+        # Estrutura montada em uma única consulta e mantida em memória
+        # (atualizada incrementalmente pelos sinais de Product)
+        categories, version = category_tree.snapshot()
+        etag = make_etag(request, 'categories', version)
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(Response({'categories': categories}), etag)
 
 
 class UserProfileAPIView(APIView):
@@ -173,21 +746,50 @@ class UserProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
+        if isinstance(request.user, ClaimsUser):
+            # Autenticação sem banco: os dados já vêm serializados no token
+            return Response(request.user.profile)
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
     
     def put(self, request):
-        serializer = UserUpdateSerializer(request.user, data=request.data, partial=True)
+        user = load_user(request.user)
+        serializer = UserUpdateSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             # Retornar dados completos do usuário
-            user_serializer = UserSerializer(request.user)
+            user_serializer = UserSerializer(user)
             return Response(user_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class StockSettingsAPIView(APIView):
+    """
+    Endpoint para as faixas de estoque do usuário autenticado.
+
+    GET /api/stock/settings/ - retorna as faixas (padrões se nunca salvas)
+    PUT/PATCH /api/stock/settings/ - atualiza low_stock_max / medium_stock_max
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(StockSettingsSerializer(stock_settings_for(request.user)).data)
+
+    def put(self, request):
+        serializer = StockSettingsSerializer(
+            stock_settings_for(request.user), data=request.data, partial=True
+        )
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    patch = put
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login_api(request):
     """
     Endpoint de login que retorna JWT tokens.
@@ -205,7 +807,10 @@ def login_api(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    user = authenticate(username=username, password=password)
+    try:
+        user = run_hashing(authenticate, username=username, password=password)
+    except HashingOverloaded:
+        return _hashing_overloaded()
     
     if user is None:
         return Response(
@@ -214,7 +819,7 @@ def login_api(request):
         )
     
     # Gerar tokens JWT
-    refresh = RefreshToken.for_user(user)
+    refresh = ProfileRefreshToken.for_user(user)
     
     # Retornar tokens + dados do usuário
     user_serializer = UserSerializer(user)
@@ -260,6 +865,7 @@ class ChangePasswordAPIView(APIView):
     }
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [PasswordChangeRateThrottle]
     
     def post(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
@@ -267,12 +873,16 @@ class ChangePasswordAPIView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        user = request.user
+        user = load_user(request.user)
         old_password = serializer.validated_data['old_password']
         new_password = serializer.validated_data['new_password']
         
         # Verificar se a senha antiga está correta
-        if not user.check_password(old_password):
+        try:
+            password_ok = run_hashing(user.check_password, old_password)
+        except HashingOverloaded:
+            return _hashing_overloaded()
+        if not password_ok:
             return Response(
                 {'old_password': 'Senha atual incorreta.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -288,7 +898,26 @@ class ChangePasswordAPIView(APIView):
             )
         
         # Alterar a senha
-        user.set_password(new_password)
+        try:
+            run_hashing(user.set_password, new_password)
+        except HashingOverloaded:
+            return _hashing_overloaded()
         user.save()
         
         return Response({'message': 'Senha alterada com sucesso.'}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@renderer_classes([PrometheusRenderer])
+def metrics_api(request):
+    """
+    Métricas no formato do Prometheus (todos os workers da máquina).
+
+    GET /metrics (restrito aos IPs de METRICS_ALLOWED_IPS)
+    """
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', None)
+    if allowed is not None and request.META.get('REMOTE_ADDR') not in allowed:
+        raise exceptions.PermissionDenied()
+    return Response(render_metrics())
@@ -43,7 +43,8 @@ const formatCurrency = (value) =>
   }).format(value);
 
 const Dashboard = () => {
-  const [products, setProducts] = useState([]);
+  const [stats, setStats] = useState(null);
+  const [lowStockProducts, setLowStockProducts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [crazyMode, setCrazyMode] = useState(false);
   const [droppedCards, setDroppedCards] = useState([]);
@@ -58,32 +59,24 @@ const Dashboard = () => {
   }, []);
 
   useEffect(() => {
-    const fetchProducts = async () => {
+    const fetchData = async () => {
       try {
-        // Ajustado para buscar todos os produtos, não apenas a primeira página
-        const response = await productService.getProducts({ page_size: 500 });
-        setProducts(response.results || []);
-      } catch (error) {
-        console.error("Erro ao buscar produtos:", error);
-        // Fallback para dados estáticos em caso de erro na API
-        setProducts([
-          { id: 1, name: 'Produto A', category: 'Eletrônicos', price: 100, stock: 10 },
-          { id: 2, name: 'Produto B', category: 'Livros', price: 20, stock: 50 },
-          { id: 3, name: 'Produto C', category: 'Móveis', price: 50, stock: 20 },
-          { id: 4, name: 'Produto D', category: 'Roupas', price: 30, stock: 30 },
-          { id: 5, name: 'Produto E', category: 'Alimentos', price: 15, stock: 100 },
-          { id: 6, name: 'Produto F', category: 'Eletrônicos', price: 200, stock: 5 },
-          { id: 7, name: 'Produto G', category: 'Livros', price: 10, stock: 100 },
-          { id: 8, name: 'Produto H', category: 'Móveis', price: 70, stock: 15 },
-          { id: 9, name: 'Produto I', category: 'Roupas', price: 40, stock: 40 },
-          { id: 10, name: 'Produto J', category: 'Alimentos', price: 25, stock: 200 },
+        // Métricas agregadas no backend e só os 5 produtos com menor estoque
+        // (sem baixar o catálogo inteiro)
+        const [statsResponse, lowStockResponse] = await Promise.all([
+          productService.getProductStats({ top: 1 }),
+          productService.getProducts({ ordering: 'stock', page_size: 5, count: 'false' }),
         ]);
+        setStats(statsResponse);
+        setLowStockProducts(lowStockResponse.results || []);
+      } catch (error) {
+        console.error("Erro ao buscar métricas:", error);
       } finally {
         setLoading(false);
       }
     };
 
-    fetchProducts();
+    fetchData();
   }, []);
 
   const handleCardDrop = (cardId) => {
@@ -93,7 +86,7 @@ const Dashboard = () => {
   };
 
   const chartData = useMemo(() => {
-    if (!products.length) {
+    if (!stats) {
       return [
         { label: 'Eletrônicos', value: 14700 },
         { label: 'Livros', value: 11350 },
@@ -103,20 +96,14 @@ const Dashboard = () => {
       ];
     }
 
-    const categoryMap = products.reduce((acc, product) => {
-      const categoryName = product.category_display || product.category || 'Sem categoria';
-      const numericPrice = Number(product.price) || 0;
-      const units = Number(product.stock) || 0;
-      const value = numericPrice * units;
-      acc[categoryName] = (acc[categoryName] || 0) + value;
-      return acc;
-    }, {});
-
-    return Object.entries(categoryMap).map(([label, value]) => ({ label, value }));
-  }, [products]);
+    return stats.categories.map((cat) => ({
+      label: cat.category_display || 'Sem categoria',
+      value: Number(cat.total_value) || 0,
+    }));
+  }, [stats]);
 
   const metrics = useMemo(() => {
-    if (!products.length) {
+    if (!stats) {
       return {
         totalStockValue: 0,
         totalItemsInStock: 0,
@@ -125,23 +112,13 @@ const Dashboard = () => {
       };
     }
 
-    const totalStockValue = products.reduce((sum, product) => {
-      const numericPrice = Number(product.price) || 0;
-      const units = Number(product.stock) || 0;
-      return sum + numericPrice * units;
-    }, 0);
-
-    const totalItemsInStock = products.reduce((sum, product) => sum + (Number(product.stock) || 0), 0);
-    const skuCount = products.length;
-    const averageItemPrice = totalItemsInStock > 0 ? totalStockValue / totalItemsInStock : 0;
-
     return {
-      totalStockValue,
-      totalItemsInStock,
-      skuCount,
-      averageItemPrice,
+      totalStockValue: Number(stats.total_value) || 0,
+      totalItemsInStock: stats.total_items || 0,
+      skuCount: stats.sku_count || 0,
+      averageItemPrice: Number(stats.average_item_price) || 0,
     };
-  }, [products]);
+  }, [stats]);
 
   return (
     <div className="space-y-8">
@@ -225,7 +202,7 @@ const Dashboard = () => {
             </p>
           </div>
         </div>
-        <ProductStockChart products={products} loading={loading} />
+        <ProductStockChart products={lowStockProducts} loading={loading} />
       </div>
     </div>
   );
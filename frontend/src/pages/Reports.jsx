@@ -22,14 +22,15 @@ ChartJS.register(
 );
 
 const ReportsPage = () => {
-  const [products, setProducts] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await productService.getProducts({ page_size: 500 });
-        setProducts(response.results || []);
+        // Métricas agregadas no backend (sem baixar o catálogo inteiro)
+        const response = await productService.getProductStats({ top: 10 });
+        setStats(response);
       } catch (error) {
         console.error('Erro ao buscar dados:', error);
       } finally {
@@ -41,38 +42,22 @@ const ReportsPage = () => {
   }, []);
 
   const reportData = useMemo(() => {
-    if (loading || products.length === 0) {
+    if (loading || !stats || stats.sku_count === 0) {
       return {
         totalValue: 0,
+        skuCount: 0,
         categoryCount: 0,
         topProducts: [],
         categoryChartData: { labels: [], datasets: [] },
       };
     }
 
-    const totalValue = products.reduce((acc, p) => acc + (parseFloat(p.price) * p.stock), 0);
-    const categoryCount = new Set(products.map(p => p.category_display)).size;
-    
-    const topProducts = [...products]
-      .sort((a, b) => (parseFloat(b.price) * b.stock) - (parseFloat(a.price) * a.stock))
-      .slice(0, 10);
-
-    const categoryValues = products.reduce((acc, p) => {
-      const category = p.category_display || 'Outros';
-      const value = parseFloat(p.price) * p.stock;
-      acc[category] = (acc[category] || 0) + value;
-      return acc;
-    }, {});
-
-    const categoryLabels = Object.keys(categoryValues);
-    const categoryData = Object.values(categoryValues);
-
     const categoryChartData = {
-      labels: categoryLabels,
+      labels: stats.categories.map((cat) => cat.category_display || 'Outros'),
       datasets: [
         {
           label: 'Valor em Estoque por Categoria (R$)',
-          data: categoryData,
+          data: stats.categories.map((cat) => Number(cat.total_value)),
           backgroundColor: 'rgba(28, 204, 103, 0.6)',
           borderColor: 'rgba(28, 204, 103, 1)',
           borderWidth: 1,
@@ -80,8 +65,14 @@ const ReportsPage = () => {
       ],
     };
 
-    return { totalValue, categoryCount, topProducts, categoryChartData };
-  }, [products, loading]);
+    return {
+      totalValue: Number(stats.total_value),
+      skuCount: stats.sku_count,
+      categoryCount: stats.category_count,
+      topProducts: stats.top_products,
+      categoryChartData,
+    };
+  }, [stats, loading]);
 
   const formatCurrency = (value) => new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(value);
 
@@ -97,7 +88,7 @@ const ReportsPage = () => {
       {/* Métricas */}
       <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
         <MetricCard title="Valor Total em Estoque" value={formatCurrency(reportData.totalValue)} />
-        <MetricCard title="Total de Produtos" value={products.length.toLocaleString('pt-BR')} />
+        <MetricCard title="Total de Produtos" value={reportData.skuCount.toLocaleString('pt-BR')} />
         <MetricCard title="Categorias Únicas" value={reportData.categoryCount.toLocaleString('pt-BR')} />
       </div>
 
@@ -124,7 +115,7 @@ const ReportsPage = () => {
                 <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">{product.name}</td>
                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">{product.category_display}</td>
                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-700 text-right font-semibold">
-                  {formatCurrency(parseFloat(product.price) * product.stock)}
+                  {formatCurrency(product.stock_value)}
                 </td>
               </tr>
             ))}
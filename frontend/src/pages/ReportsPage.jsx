@@ -37,7 +37,7 @@ const Icons = {
 
 
 const ReportsPage = () => {
-  const [products, setProducts] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const { isDarkMode } = useTheme();
   const [crazyMode, setCrazyMode] = useState(false);
@@ -46,8 +46,9 @@ const ReportsPage = () => {
     setCrazyMode(isCrazyModeEnabled());
     const fetchData = async () => {
       try {
-        const response = await productService.getProducts({ page_size: 500 });
-        setProducts(response.results || []);
+        // Métricas agregadas no backend (sem baixar o catálogo inteiro)
+        const response = await productService.getProductStats();
+        setStats(response);
       } catch (error) {
         console.error('Erro ao buscar dados:', error);
       } finally {
@@ -59,7 +60,7 @@ const ReportsPage = () => {
   }, []);
 
   const reportData = useMemo(() => {
-    if (loading || products.length === 0) {
+    if (loading || !stats || stats.sku_count === 0) {
       return {
         mostExpensiveProduct: null,
         cheapestProduct: null,
@@ -70,59 +71,26 @@ const ReportsPage = () => {
       };
     }
 
-    const sortedByPrice = [...products].sort((a, b) => parseFloat(b.price) - parseFloat(a.price));
-    const mostExpensiveProduct = sortedByPrice[0];
-    const cheapestProduct = sortedByPrice[sortedByPrice.length - 1];
-
-    const sortedByStock = [...products].sort((a, b) => b.stock - a.stock);
-    const highestStockProduct = sortedByStock[0];
-    const lowestStockProduct = sortedByStock[sortedByStock.length - 1];
-
-    // Distribuição por categoria
-    const categoryCount = products.reduce((acc, p) => {
-      const cat = p.category_display || 'Outros';
-      acc[cat] = (acc[cat] || 0) + 1;
-      return acc;
-    }, {});
-
-    const categoriesDistribution = Object.entries(categoryCount).map(([name, count]) => ({
-      name,
-      count,
-      percentage: ((count / products.length) * 100).toFixed(1),
+    const categoriesDistribution = stats.categories.map((cat) => ({
+      name: cat.category_display || 'Outros',
+      count: cat.count,
+      percentage: Number(cat.percentage).toFixed(1),
     }));
 
-    // Faixas de preço
-    const priceRanges = {
-      '0-50': 0,
-      '51-100': 0,
-      '101-200': 0,
-      '201-500': 0,
-      '500+': 0,
-    };
-
-    products.forEach(p => {
-      const price = parseFloat(p.price);
-      if (price <= 50) priceRanges['0-50']++;
-      else if (price <= 100) priceRanges['51-100']++;
-      else if (price <= 200) priceRanges['101-200']++;
-      else if (price <= 500) priceRanges['201-500']++;
-      else priceRanges['500+']++;
-    });
-
     const priceRangesData = {
-      labels: Object.keys(priceRanges),
-      data: Object.values(priceRanges),
+      labels: stats.price_ranges.map((range) => range.label),
+      data: stats.price_ranges.map((range) => range.count),
     };
 
     return { 
-      mostExpensiveProduct,
-      cheapestProduct,
-      highestStockProduct,
-      lowestStockProduct,
+      mostExpensiveProduct: stats.most_expensive,
+      cheapestProduct: stats.cheapest,
+      highestStockProduct: stats.highest_stock,
+      lowestStockProduct: stats.lowest_stock,
       categoriesDistribution, 
       priceRanges: priceRangesData 
     };
-  }, [products, loading]);
+  }, [stats, loading]);
 
   const lineChartData = {
     labels: reportData.priceRanges.labels,
@@ -4,9 +4,24 @@ import { ToastContainer, toast } from 'react-toastify';
 import 'react-toastify/dist/ReactToastify.css';
 import { isCrazyModeEnabled } from '../utils/validation';
 
+// Faixas calculadas no backend (GET /api/products/stock-levels/)
+const LEVELS = {
+  low: { label: 'Baixo', color: 'bg-yellow-50 text-yellow-600' },
+  medium: { label: 'Médio', color: 'bg-blue-50 text-blue-600' },
+  high: { label: 'Alto', color: 'bg-emerald-50 text-volus-emerald' },
+};
+const PAGE_SIZE = 100;
+
 const StockControlPage = () => {
   const [products, setProducts] = useState([]);
+  const [level, setLevel] = useState('low');
+  const [counts, setCounts] = useState({ low: 0, medium: 0, high: 0 });
+  const [thresholds, setThresholds] = useState(null);
+  const [thresholdForm, setThresholdForm] = useState({ low_stock_max: '', medium_stock_max: '' });
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [editingId, setEditingId] = useState(null);
   const [editingValue, setEditingValue] = useState('');
   const [saving, setSaving] = useState(false);
@@ -16,28 +31,57 @@ const StockControlPage = () => {
     setCrazyMode(isCrazyModeEnabled());
   }, []);
 
-  // Carrega os produtos da API
-  const fetchProducts = async () => {
+  // Carrega contagens e a página da faixa (classificação feita no SQL)
+  const fetchLevels = async (selectedLevel = level, pageNumber = 1) => {
     try {
-      setLoading(true);
-      const response = await productService.getProducts({ page_size: 500 }); // Busca todos
-      setProducts(response.results || []);
+      if (pageNumber === 1) setLoading(true); else setLoadingMore(true);
+      const data = await productService.getStockLevels({
+        level: selectedLevel,
+        page: pageNumber,
+        page_size: PAGE_SIZE,
+        count: false,
+        // Só as colunas exibidas (o banco lê e envia menos dados)
+        fields: 'id,name,code,stock',
+      });
+      setProducts((current) => (pageNumber === 1 ? data.results : [...current, ...data.results]));
+      setCounts(data.counts);
+      setThresholds(data.thresholds);
+      setThresholdForm({
+        low_stock_max: data.thresholds.low_stock_max,
+        medium_stock_max: data.thresholds.medium_stock_max,
+      });
+      setPage(pageNumber);
+      setHasMore(Boolean(data.next));
     } catch (error) {
-      console.error('Erro ao buscar produtos:', error);
+      console.error('Erro ao buscar faixas de estoque:', error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
   useEffect(() => {
-    fetchProducts();
-  }, []);
+    fetchLevels(level, 1);
+  }, [level]);
 
-  const getStatus = (stock) => {
-    if (stock <= 0) return { label: 'Esgotado', color: 'bg-red-50 text-red-600' };
-    if (stock <= 5) return { label: 'Crítico', color: 'bg-yellow-50 text-yellow-600' };
-    if (stock <= 15) return { label: 'Aviso', color: 'bg-blue-50 text-blue-600' };
-    return { label: 'Normal', color: 'bg-emerald-50 text-volus-emerald' };
+  const getStatus = (product) => {
+    if (product.stock <= 0) return { label: 'Esgotado', color: 'bg-red-50 text-red-600' };
+    return LEVELS[product.stock_level] || LEVELS.high;
+  };
+
+  const handleSaveThresholds = async (event) => {
+    event.preventDefault();
+    try {
+      await productService.updateStockSettings({
+        low_stock_max: parseInt(thresholdForm.low_stock_max, 10),
+        medium_stock_max: parseInt(thresholdForm.medium_stock_max, 10),
+      });
+      toast.success('Faixas de estoque atualizadas!');
+      fetchLevels(level, 1);
+    } catch (error) {
+      const message = error.medium_stock_max?.[0] || error.low_stock_max?.[0] || 'Erro ao salvar faixas.';
+      toast.error(message);
+    }
   };
 
   const startEdit = (id, current) => {
@@ -58,14 +102,11 @@ const StockControlPage = () => {
       // Envia requisição PATCH para atualizar apenas o estoque
       await productService.patchProduct(id, { stock: newValue });
 
-      // Atualiza o estado local para refletir a mudança instantaneamente
-      setProducts(products.map(p => 
-        p.id === id ? { ...p, stock: newValue } : p
-      ));
-      
       setEditingId(null);
       setEditingValue('');
       toast.success('Estoque atualizado com sucesso!');
+      // Recarrega a faixa: o produto pode ter mudado de faixa
+      fetchLevels(level, 1);
     } catch (error) {
       alert('Erro ao atualizar estoque. Tente novamente.');
       console.error(error);
@@ -93,6 +134,48 @@ const StockControlPage = () => {
           </p>
         </div>
 
+        {/* Faixas de estoque */}
+        <div className="flex flex-wrap items-end gap-4">
+          <div className="flex gap-2">
+            {Object.entries(LEVELS).map(([key, info]) => (
+              <button
+                key={key}
+                onClick={() => setLevel(key)}
+                className={`px-4 py-2 rounded-xl text-sm font-semibold transition ${info.color} ${level === key ? 'ring-2 ring-volus-emerald/50' : 'opacity-70 hover:opacity-100'}`}
+              >
+                {info.label}: {counts[key].toLocaleString('pt-BR')}
+              </button>
+            ))}
+          </div>
+          {thresholds && (
+            <form onSubmit={handleSaveThresholds} className="flex items-end gap-2 text-sm text-volus-davys-gray dark:text-volus-dark-600">
+              <label className="flex flex-col">
+                Baixo até
+                <input
+                  type="number"
+                  min="0"
+                  value={thresholdForm.low_stock_max}
+                  onChange={(e) => setThresholdForm({ ...thresholdForm, low_stock_max: e.target.value })}
+                  className="w-24 px-2 py-1 border border-gray-300 bg-white dark:border-volus-dark-600 dark:bg-volus-dark-900 rounded text-center"
+                />
+              </label>
+              <label className="flex flex-col">
+                Médio até
+                <input
+                  type="number"
+                  min="1"
+                  value={thresholdForm.medium_stock_max}
+                  onChange={(e) => setThresholdForm({ ...thresholdForm, medium_stock_max: e.target.value })}
+                  className="w-24 px-2 py-1 border border-gray-300 bg-white dark:border-volus-dark-600 dark:bg-volus-dark-900 rounded text-center"
+                />
+              </label>
+              <button type="submit" className="px-3 py-1.5 text-xs font-medium text-white bg-volus-emerald hover:bg-volus-emerald/90 rounded transition">
+                Salvar faixas
+              </button>
+            </form>
+          )}
+        </div>
+
         {/* Stock Table */}
         <div className={`bg-white dark:bg-volus-dark-800 rounded-2xl shadow-card border border-white/60 dark:border-volus-dark-700 overflow-hidden ${crazyMode ? 'pulsating-card' : ''}`}>
           <div className="overflow-x-auto">
@@ -108,7 +191,7 @@ const StockControlPage = () => {
               </thead>
               <tbody>
                 {products.map((product) => {
-                  const status = getStatus(product.stock);
+                  const status = getStatus(product);
                   return (
                     <tr key={product.id} className="border-b border-gray-200 dark:border-volus-dark-700 hover:bg-gray-50 dark:hover:bg-volus-dark-700 transition">
                       <td className="px-6 py-4 text-sm font-mono text-volus-davys-gray dark:text-volus-dark-600">{product.code}</td>
@@ -165,6 +248,17 @@ const StockControlPage = () => {
               </tbody>
             </table>
           </div>
+          {hasMore && (
+            <div className="p-4 text-center">
+              <button
+                onClick={() => fetchLevels(level, page + 1)}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm font-medium text-volus-emerald hover:bg-emerald-50 dark:hover:bg-volus-emerald/10 rounded transition disabled:opacity-50"
+              >
+                {loadingMore ? 'Carregando...' : 'Carregar mais'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </>
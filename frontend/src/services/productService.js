@@ -1,20 +1,64 @@
 import api from './api';
+import { fromColumnarResponse } from '../utils/columnar';
 
 const productService = {
   /**
    * Buscar todos os produtos com filtros opcionais
+   * Pede o formato colunar (payload menor) e remonta os itens
    * @param {Object} params - Parâmetros de query (search, category, subcategory, ordering)
    * @returns {Promise<Object>} Lista de produtos paginada
    */
   async getProducts(params = {}) {
     try {
-      const response = await api.get('/api/products/', { params });
-      return response.data;
+      const response = await api.get('/api/products/', { params: { ...params, format: 'columnar' } });
+      return fromColumnarResponse(response.data);
     } catch (error) {
       throw error.response?.data || { detail: 'Erro ao buscar produtos' };
     }
   },
 
+  /**
+   * Buscar métricas agregadas do inventário (calculadas no backend)
+   * @param {Object} params - Filtros opcionais (q, category, subcategory, top)
+   * @returns {Promise<Object>}
+   */
+  async getProductStats(params = {}) {
+    try {
+      const response = await api.get('/api/products/stats/', { params });
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || { detail: 'Erro ao buscar métricas' };
+    }
+  },
+
+  /**
+   * Buscar a classificação do estoque pelas faixas do usuário
+   * @param {Object} params - level (low|medium|high), filtros e paginação
+   * @returns {Promise<Object>} Limites, contagem por faixa e lista paginada da faixa
+   */
+  async getStockLevels(params = {}) {
+    try {
+      const response = await api.get('/api/products/stock-levels/', { params });
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || { detail: 'Erro ao buscar faixas de estoque' };
+    }
+  },
+
+  /**
+   * Atualizar as faixas de estoque do usuário
+   * @param {Object} data - low_stock_max e/ou medium_stock_max
+   * @returns {Promise<Object>}
+   */
+  async updateStockSettings(data) {
+    try {
+      const response = await api.patch('/api/stock/settings/', data);
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || { detail: 'Erro ao salvar faixas de estoque' };
+    }
+  },
+
   /**
    * Buscar um produto específico por ID
    * @param {number} id - ID do produto
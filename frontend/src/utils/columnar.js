@@ -0,0 +1,42 @@
+/**
+ * Formato colunar das coleções de produtos (?format=columnar)
+ * Ver backend/core/columnar.py
+ */
+
+/**
+ * Remonta a lista de objetos a partir de um bloco colunar
+ * @param {Object} block - { fields, columns, dictionaries }
+ * @returns {Array<Object>} Itens no formato JSON padrão da API
+ */
+export const fromColumnar = ({ fields, columns, dictionaries }) => {
+  const values = fields.map((field) => {
+    const column = columns[field];
+    const dictionary = dictionaries[field];
+    return dictionary ? column.map((index) => dictionary[index]) : column;
+  });
+  const length = fields.length ? values[0].length : 0;
+  const items = new Array(length);
+  for (let row = 0; row < length; row += 1) {
+    const item = {};
+    for (let col = 0; col < fields.length; col += 1) {
+      item[fields[col]] = values[col][row];
+    }
+    items[row] = item;
+  }
+  return items;
+};
+
+/**
+ * Converte uma resposta colunar (lista ou página com `results`)
+ * @param {Object} data - Corpo da resposta colunar
+ * @returns {Object|Array} Mesmo formato da resposta JSON padrão
+ */
+export const fromColumnarResponse = (data) => {
+  if (data && data.results && data.results.columns) {
+    return { ...data, results: fromColumnar(data.results) };
+  }
+  if (data && data.columns) {
+    return fromColumnar(data);
+  }
+  return data;
+};